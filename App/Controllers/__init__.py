@@ -2,3 +2,6 @@ from .app_info_controller import app_info_blueprint
 from .data_collector_controller import data_collector_blueprint
 from .preprocessor_controller import preprocessing_blueprint
 from .predictor_controller import predictor_blueprint
+from .job_controller import jobs_blueprint
+from .pipeline_controller import pipeline_blueprint
+from .metrics_controller import metrics_blueprint
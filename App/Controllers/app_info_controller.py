@@ -11,6 +11,15 @@ def index():
 
 @app_info_blueprint.route('/health', methods=['GET'])
 def health():
-    is_health: bool = app_info_server.is_mongo_client_healthy()
-    status = 'pass' if is_health else 'fail'
-    return make_response(jsonify({'status': status}), 200)
+    return make_response(jsonify(app_info_server.get_health()), 200)
+
+
+@app_info_blueprint.route('/health/live', methods=['GET'])
+def health_live():
+    return make_response(jsonify(app_info_server.get_liveness()), 200)
+
+
+@app_info_blueprint.route('/health/ready', methods=['GET'])
+def health_ready():
+    health_status = app_info_server.get_health()
+    return make_response(jsonify(health_status), 200 if health_status['ready'] else 503)
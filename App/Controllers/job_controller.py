@@ -0,0 +1,65 @@
+import traceback
+from flask import Blueprint, jsonify, make_response, request
+from App.Server import job_server
+from App.Server.Jobs import JobStatus, JobFields
+from App.Util.constants import CATERING, KIND
+from App.Controllers.request_validators import validate_catering_in_payload_request
+
+jobs_blueprint = Blueprint('jobs', __name__, url_prefix='/jobs')
+
+
+@jobs_blueprint.route('', methods=['POST'])
+@validate_catering_in_payload_request
+def submit_job():
+    try:
+        kind = request.json.get(KIND)
+        catering = request.json.get(CATERING)
+        if kind is None:
+            return make_response(jsonify({'error': f"No '{KIND}' field was provided"}), 400)
+        job = job_server.submit_job(kind, catering)
+        return make_response(jsonify(job_server.job_to_status(job)), 202)
+    except Exception as e:
+        traceback.print_exc()
+        return make_response(jsonify({'error': str(e)}), 400)
+
+
+@jobs_blueprint.route('/<job_id>', methods=['GET'])
+def get_job_status(job_id: str):
+    try:
+        job = job_server.get_job(job_id)
+        if job is None:
+            return make_response(jsonify({'error': f"Job {job_id} not found"}), 404)
+        return make_response(jsonify(job_server.job_to_status(job)), 200)
+    except Exception as e:
+        traceback.print_exc()
+        return make_response(jsonify({'error': str(e)}), 400)
+
+
+@jobs_blueprint.route('/<job_id>/result', methods=['GET'])
+def get_job_result(job_id: str):
+    try:
+        job = job_server.get_job(job_id)
+        if job is None:
+            return make_response(jsonify({'error': f"Job {job_id} not found"}), 404)
+        status = job[JobFields.STATUS]
+        if status == JobStatus.SUCCEEDED:
+            return make_response(jsonify(job[JobFields.RESULT]), 200)
+        if status in JobStatus.FINISHED:
+            error = job[JobFields.ERROR] or f"Job {job_id} was {status}"
+            return make_response(jsonify({'error': error, 'status': status}), 409)
+        return make_response(jsonify(job_server.job_to_status(job)), 202)
+    except Exception as e:
+        traceback.print_exc()
+        return make_response(jsonify({'error': str(e)}), 400)
+
+
+@jobs_blueprint.route('/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id: str):
+    try:
+        job = job_server.cancel_job(job_id)
+        if job is None:
+            return make_response(jsonify({'error': f"Job {job_id} not found"}), 404)
+        return make_response(jsonify(job_server.job_to_status(job)), 200)
+    except Exception as e:
+        traceback.print_exc()
+        return make_response(jsonify({'error': str(e)}), 400)
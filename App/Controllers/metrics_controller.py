@@ -0,0 +1,64 @@
+import time
+from flask import Blueprint, Response, g, request
+from App.Util.constants import CATERING, CATERINGS
+from App.Util.metrics import get_metrics_registry, observe_request
+
+metrics_blueprint = Blueprint('metrics', __name__, url_prefix='')
+
+
+def get_request_catering() -> str:
+    """
+    Gets the caterings of the current request, from the `catering` field (payload or query) or from the catering
+    keys of the payload (i.e. the predictions of breakfast and lunch)
+
+    Returns:
+        str: Caterings joined by '+', 'none' if the request has no catering and 'invalid' for an unknown catering
+    """
+    payload = request.get_json(silent=True) if request.is_json else None
+    payload = payload if isinstance(payload, dict) else dict()
+    catering = payload.get(CATERING, request.args.get(CATERING))
+    if catering is not None:
+        return catering if catering in CATERINGS else 'invalid'
+    caterings = [catering for catering in CATERINGS if catering in payload]
+    return '+'.join(caterings) if len(caterings) > 0 else 'none'
+
+
+@metrics_blueprint.before_app_request
+def start_request_timer():
+    g.metrics_start = time.perf_counter()
+
+
+@metrics_blueprint.after_app_request
+def record_request(response):
+    record_request_metrics(response.status_code)
+    return response
+
+
+@metrics_blueprint.teardown_app_request
+def record_failed_request(error):
+    # The requests that raised an unhandled exception are not seen by `after_app_request`
+    if error is not None:
+        record_request_metrics(500)
+
+
+def record_request_metrics(status_code: int) -> None:
+    """
+    Records the metrics of the current request, only once
+
+    Args:
+        status_code (int): Status code of the response
+
+    Returns:
+        None
+    """
+    start = g.pop('metrics_start', None)
+    if start is None:
+        return
+    # The route rule instead of the path, so the identifiers on the path do not create new series
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    observe_request(route, request.method, get_request_catering(), status_code, time.perf_counter() - start)
+
+
+@metrics_blueprint.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(get_metrics_registry().render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,22 @@
+import traceback
+from flask import Blueprint, jsonify, make_response, request
+from App.Server import pipeline_server, job_server
+from App.Util.constants import FORCE, ASYNC
+
+pipeline_blueprint = Blueprint('pipeline', __name__, url_prefix='/pipeline')
+
+
+@pipeline_blueprint.route('/run', methods=['POST'])
+def run_pipeline():
+    try:
+        payload = request.get_json(silent=True) or dict()
+        force = bool(payload.get(FORCE, False))
+        if payload.get(ASYNC, False):
+            job = job_server.submit_pipeline_job(force)
+            return make_response(jsonify(job_server.job_to_status(job)), 202)
+        response = pipeline_server.run_pipeline(force)
+        status_code = 400 if pipeline_server.is_pipeline_failed(response) else 200
+        return make_response(jsonify(response), status_code)
+    except Exception as e:
+        traceback.print_exc()
+        return make_response(jsonify({'error': str(e)}), 400)
@@ -1,10 +1,15 @@
+import asyncio
 import traceback
 from typing import Dict, List
 from flask import Blueprint, jsonify, make_response, request
 from App.Controllers.request_validators import validate_catering_in_payload_request
-from App.Util.constants import CATERING, BREAKFAST, LUNCH
+from App.Controllers.request_profiling import profile_request
+from App.Util.constants import CATERING, BREAKFAST, LUNCH, VERSION, ASYNC
 from App.Server import dataset_creator_server
 from App.Server import predictor_server
+from App.Server import job_server
+from App.Server.job_server import JobKinds
+from App.Server import artifact_server
 
 predictor_blueprint = Blueprint('prediction', __name__, url_prefix='/prediction')
 
@@ -14,16 +19,10 @@ predictor_blueprint = Blueprint('prediction', __name__, url_prefix='/prediction'
 def get_train_model_performance():
     try:
         catering: List[Dict] = request.json.get(CATERING)
-        time_elapsed, model_name, model, cross_val_r2_mean_train, cross_val_r2_std_train, r2_valid = \
-            predictor_server.evaluate_train_model_performance(catering)
-        response = {
-            "time": f"{round(time_elapsed, 4)} sec",
-            "catering": catering,
-            "model_name": model_name,
-            "cross_val_r2_mean_train": cross_val_r2_mean_train,
-            "cross_val_r2_std_train": cross_val_r2_std_train,
-            "r2_valid": r2_valid
-        }
+        if request.json.get(ASYNC, False):
+            job = job_server.submit_job(JobKinds.TRAIN_PERFORMANCE, catering)
+            return make_response(jsonify(job_server.job_to_status(job)), 202)
+        response = job_server.run_train_performance(catering)
         return make_response(jsonify(response), 200)
     except Exception as e:
         traceback.print_exc()
@@ -35,11 +34,10 @@ def get_train_model_performance():
 def build_regression_model():
     try:
         catering: List[Dict] = request.json.get(CATERING)
-        time_elapsed = predictor_server.build_prediction_model(catering)
-        response = {
-            "time": f"{round(time_elapsed, 4)} sec",
-            "catering": catering,
-        }
+        if request.json.get(ASYNC, False):
+            job = job_server.submit_job(JobKinds.PREDICTION_MODEL, catering)
+            return make_response(jsonify(job_server.job_to_status(job)), 202)
+        response = job_server.run_prediction_model_build(catering)
         return make_response(jsonify(response), 200)
     except Exception as e:
         traceback.print_exc()
@@ -51,10 +49,37 @@ def build_regression_model():
 def create_dataset():
     try:
         catering = request.json.get(CATERING)
-        time_elapsed = dataset_creator_server.build_training_dataset(catering)
+        if request.json.get(ASYNC, False):
+            job = job_server.submit_job(JobKinds.TRAIN_DATASET, catering)
+            return make_response(jsonify(job_server.job_to_status(job)), 202)
+        response = job_server.run_train_dataset_build(catering)
+        return make_response(jsonify(response), 200)
+    except Exception as e:
+        traceback.print_exc()
+        return make_response(jsonify({'error': str(e)}), 400)
+
+
+@predictor_blueprint.route('/model/versions', methods=['POST'])
+@validate_catering_in_payload_request
+def get_model_versions():
+    try:
+        catering = request.json.get(CATERING)
+        response = artifact_server.get_versions(catering)
+        return make_response(jsonify(response), 200)
+    except Exception as e:
+        traceback.print_exc()
+        return make_response(jsonify({'error': str(e)}), 400)
+
+
+@predictor_blueprint.route('/model/rollback', methods=['POST'])
+@validate_catering_in_payload_request
+def rollback_model():
+    try:
+        catering = request.json.get(CATERING)
+        version = artifact_server.rollback_models(catering, request.json.get(VERSION))
         response = {
-            "saved": "ok",
-            "time": f"{round(time_elapsed, 4)} sec",
+            "catering": catering,
+            "current": version
         }
         return make_response(jsonify(response), 200)
     except Exception as e:
@@ -63,6 +88,7 @@ def create_dataset():
 
 
 @predictor_blueprint.route('/transform/test-data', methods=['POST'])
+@profile_request
 def transform_test_data():
     try:
         breakfast_data = request.json.get(BREAKFAST)
@@ -83,18 +109,21 @@ def transform_test_data():
 
 
 @predictor_blueprint.route('/predict', methods=['POST'])
-def predict():
+@profile_request
+async def predict():
     try:
         breakfast_data = request.json.get(BREAKFAST)
         lunch_data = request.json.get(LUNCH)
         response_dict = dict()
 
-        if breakfast_data is not None:
-            response_dict[BREAKFAST] = predictor_server.predict(BREAKFAST, breakfast_data)
-        if lunch_data is not None:
-            response_dict[LUNCH] = predictor_server.predict(LUNCH, lunch_data)
         if breakfast_data is None and lunch_data is None:
             return make_response(jsonify({'error': f"Missing {BREAKFAST} or {LUNCH}  fields in the request"}), 400)
+        raw_data_by_catering = {catering: raw_data for catering, raw_data in
+                                ((BREAKFAST, breakfast_data), (LUNCH, lunch_data)) if raw_data is not None}
+        # Breakfast and lunch predictions overlap their I/O
+        predictions = await asyncio.gather(*[predictor_server.predict_async(catering, raw_data)
+                                             for catering, raw_data in raw_data_by_catering.items()])
+        response_dict.update(zip(raw_data_by_catering.keys(), predictions))
 
         return make_response(jsonify(response_dict), 200)
     except Exception as e:
@@ -1,7 +1,8 @@
 import traceback
 from flask import Blueprint, jsonify, make_response, request
-from App.Server import preprocessor_server
-from App.Util.constants import CATERING
+from App.Server import preprocessor_server, job_server
+from App.Server.job_server import JobKinds
+from App.Util.constants import CATERING, ASYNC
 from App.Controllers.request_validators import validate_catering_in_payload_request
 
 preprocessing_blueprint = Blueprint('preprocessing', __name__, url_prefix='/preprocessing')
@@ -12,11 +13,10 @@ preprocessing_blueprint = Blueprint('preprocessing', __name__, url_prefix='/prep
 def build_menu_bow():
     try:
         catering = request.json.get(CATERING)
-        time_elapsed, features = preprocessor_server.build_menus_bow_model(catering)
-        response = {
-            "time": f"{round(time_elapsed, 4)} sec",
-            "features": features
-        }
+        if request.json.get(ASYNC, False):
+            job = job_server.submit_job(JobKinds.MENU_BOW, catering)
+            return make_response(jsonify(job_server.job_to_status(job)), 202)
+        response = job_server.run_menu_bow_build(catering)
         return make_response(jsonify(response), 200)
     except Exception as e:
         traceback.print_exc()
@@ -0,0 +1,45 @@
+import hmac
+import asyncio
+from flask import current_app, jsonify, make_response, request
+from App.Util.helpers import str_to_bool
+from App.Util.request_profiler import RequestProfile
+from config import PROFILE_ADMIN_TOKEN
+
+PROFILE_TOKEN_HEADER = 'X-Profile-Token'
+PROFILE_TOKEN_PARAM = 'profile_token'
+PROFILE_MEMORY_HEADER = 'X-Profile-Memory'
+PROFILE_MEMORY_PARAM = 'profile_memory'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+
+
+def profile_request(func):
+    """
+    Profiles the requests of an endpoint that send the admin token on the `X-Profile-Token` header (or the
+    `profile_token` query parameter), the profile is saved on PROFILE_PATH and its id is returned on the `X-Profile-Id`
+    header. The memory allocated by the request is saved too with `X-Profile-Memory: true` (or `profile_memory=true`).
+    The other requests only pay for the lookup of the header
+    """
+    def wrapper(*args, **kwargs):
+        token = request.headers.get(PROFILE_TOKEN_HEADER, request.args.get(PROFILE_TOKEN_PARAM))
+        if token is None:
+            return current_app.ensure_sync(func)(*args, **kwargs)
+        if PROFILE_ADMIN_TOKEN is None:
+            return make_response(jsonify({'error': "The request profiling is disabled."}), 403)
+        if not hmac.compare_digest(token.encode('utf-8'), PROFILE_ADMIN_TOKEN.encode('utf-8')):
+            return make_response(jsonify({'error': "Invalid profile token."}), 403)
+
+        memory = str_to_bool(request.headers.get(PROFILE_MEMORY_HEADER,
+                                                 request.args.get(PROFILE_MEMORY_PARAM, 'false')))
+        profile = RequestProfile(request.endpoint, memory)
+        # The async views run on the event loop of another thread, profiled on its own
+        view = profile.wrap_async(func) if asyncio.iscoroutinefunction(func) else func
+        try:
+            with profile.activate(), profile.profile_thread():
+                response = make_response(current_app.ensure_sync(view)(*args, **kwargs))
+        finally:
+            report = profile.save()
+        response.headers[PROFILE_ID_HEADER] = report['id']
+        return response
+
+    wrapper.__name__ = func.__name__
+    return wrapper
@@ -1,8 +1,34 @@
-import os
-from typing import Dict, List
-from flask import jsonify, make_response, request
+import tempfile
+from io import BytesIO
+from typing import IO, Dict, List, Optional
+from flask import Request, current_app, jsonify, make_response, request
+from werkzeug.exceptions import RequestEntityTooLarge
 from App.Util.constants import BREAKFAST, LUNCH, FILE, MENU, CATERING
-from config.uploading_config import MENUS_ALLOWED_EXTENSIONS, UPLOAD_FOLDER, REGISTERS_ALLOWED_EXTENSIONS
+from config.uploading_config import MENUS_ALLOWED_EXTENSIONS, REGISTERS_ALLOWED_EXTENSIONS, MAX_FILE_LENGTH, \
+    UPLOAD_SPOOL_MAX_SIZE
+
+
+class UploadRequest(Request):
+    """
+    Request that keeps the uploaded files in memory, they are only spilled to a temporary file when the request is
+    bigger than UPLOAD_SPOOL_MAX_SIZE. The form-data requests are limited to MAX_FILE_LENGTH while they are streamed
+    """
+
+    @property
+    def max_content_length(self) -> Optional[int]:
+        if self.mimetype == 'multipart/form-data':
+            return MAX_FILE_LENGTH
+        return super().max_content_length
+
+    def _get_file_stream(self, total_content_length: Optional[int], content_type: Optional[str],
+                         filename: Optional[str] = None, content_length: Optional[int] = None) -> IO[bytes]:
+        if total_content_length is not None and total_content_length <= UPLOAD_SPOOL_MAX_SIZE:
+            return BytesIO()
+        return tempfile.TemporaryFile('wb+')
+
+
+def handle_request_entity_too_large(e: RequestEntityTooLarge):
+    return jsonify({'error': f"The request is bigger than the limit of {MAX_FILE_LENGTH} bytes."}), 413
 
 
 def validate_catering_in_payload_request(func):
@@ -15,7 +41,7 @@ def validate_catering_in_payload_request(func):
             if catering not in caterings_opts:
                 return jsonify(
                     {'error': f"'{catering}' is an invalid catering. Catering options: {caterings_opts}"}), 400
-            return func()
+            return current_app.ensure_sync(func)()
         except AttributeError:
             return jsonify({'error': f"No '{CATERING}' field was provided"}), 400
 
@@ -36,9 +62,7 @@ def validate_upload_file_request(func):
             if not is_allowed_file(file.filename, extensions):
                 allowed_extensions = ' or '.join(extensions).lower()
                 return jsonify({'error': f"Please upload a valid file with {allowed_extensions} extension."}), 400
-            if not os.path.exists(UPLOAD_FOLDER):
-                os.makedirs(UPLOAD_FOLDER)
-            return func()
+            return current_app.ensure_sync(func)()
         except AttributeError:
             return jsonify({'error': f"No '{FILE}' field was provided in the form-data request."}), 400
 
@@ -54,7 +78,7 @@ def validate_insert_data_payload_request(func):
             return make_response(jsonify({'error': f"No '{BREAKFAST}' field was provided in the request."}), 400)
         if lunch is None:
             return make_response(jsonify({'error': f"No '{LUNCH}' field was provided in the request."}), 400)
-        return func()
+        return current_app.ensure_sync(func)()
 
     wrapper.__name__ = func.__name__
     return wrapper
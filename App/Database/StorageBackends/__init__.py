@@ -0,0 +1,2 @@
+from .abstract_backend import AbstractStorageBackend
+from .document_query import match_document, run_pipeline
@@ -0,0 +1,164 @@
+import numpy
+from typing import Dict, Iterable, List, Optional
+from App.Database.StorageBackends.columnar import documents_to_columns
+
+
+class AbstractStorageBackend:
+    """
+    Storage backend parent class that defines the document operations used by the data access layer. Every backend
+    stores schemaless documents identified by an `_id` field and grouped by collection name.
+
+    Args:
+        None
+
+    Attributes:
+        name (str): Backend name
+    """
+    name: str = 'abstract'
+
+    def health(self) -> Dict:
+        """
+        Gets information about the storage service, raising an exception if it is not reachable
+
+        Returns:
+            Dict: Storage service information
+        """
+        raise NotImplementedError
+
+    def find(self, collection_name: str, query: Optional[Dict] = None) -> Iterable[Dict]:
+        """
+        Gets the documents that match a query
+
+        Args:
+            collection_name (str): Collection to search the documents
+            query (Optional[Dict]): Mongo-like filter query, all the documents are returned if it is empty
+
+        Returns:
+            Iterable[Dict]: Documents found
+        """
+        raise NotImplementedError
+
+    def find_one(self, collection_name: str, query: Dict) -> Optional[Dict]:
+        """
+        Gets the first document that matches a query
+
+        Args:
+            collection_name (str): Collection to search the document
+            query (Dict): Mongo-like filter query
+
+        Returns:
+            Optional[Dict]: Document found or None
+        """
+        for document in self.find(collection_name, query):
+            return document
+        return None
+
+    def find_columns(self, collection_name: str, query: Optional[Dict] = None) -> Dict[str, numpy.ndarray]:
+        """
+        Gets the documents that match a query as NumPy columns (bulk read mode)
+
+        Args:
+            collection_name (str): Collection to search the documents
+            query (Optional[Dict]): Mongo-like filter query, all the documents are returned if it is empty
+
+        Returns:
+            Dict[str, numpy.ndarray]: Field name and values of every document (None if the field is missing)
+        """
+        return documents_to_columns(self.find(collection_name, query))
+
+    def insert_one(self, collection_name: str, document: Dict) -> None:
+        """
+        Inserts a new document into a collection
+
+        Args:
+            collection_name (str): Collection to save the document
+            document (Dict): Document to save
+
+        Returns:
+            None
+        """
+        self.insert_many(collection_name, [document])
+
+    def insert_many(self, collection_name: str, documents: Iterable[Dict]) -> None:
+        """
+        Inserts many documents into a collection
+
+        Args:
+            collection_name (str): Collection to save the documents
+            documents (Iterable[Dict]): Documents to save
+
+        Returns:
+            None
+        """
+        raise NotImplementedError
+
+    def update_one(self, collection_name: str, query: Dict, updates: Dict, upsert: bool = False) -> None:
+        """
+        Sets the given fields on the first document that matches a query
+
+        Args:
+            collection_name (str): Collection to search the document
+            query (Dict): Mongo-like filter query
+            updates (Dict): Fields to set on the document
+            upsert (bool): True for creating a new document if there is no document matching the query
+
+        Returns:
+            None
+        """
+        raise NotImplementedError
+
+    def delete_one(self, collection_name: str, query: Dict) -> None:
+        """
+        Removes the first document that matches a query
+
+        Args:
+            collection_name (str): Collection to search the document
+            query (Dict): Mongo-like filter query
+
+        Returns:
+            None
+        """
+        raise NotImplementedError
+
+    def delete_many(self, collection_name: str, query: Dict) -> None:
+        """
+        Removes all the documents that match a query
+
+        Args:
+            collection_name (str): Collection to search the documents
+            query (Dict): Mongo-like filter query, all the documents are removed if it is empty
+
+        Returns:
+            None
+        """
+        raise NotImplementedError
+
+    def replace_many(self, collection_name: str, query: Dict, documents: Iterable[Dict]) -> None:
+        """
+        Removes all the documents that match a query and inserts the new ones in one bulk operation
+
+        Args:
+            collection_name (str): Collection to replace the documents
+            query (Dict): Mongo-like filter query of the documents to remove
+            documents (Iterable[Dict]): Documents to save
+
+        Returns:
+            None
+        """
+        self.delete_many(collection_name, query)
+        documents = list(documents)
+        if documents:
+            self.insert_many(collection_name, documents)
+
+    def aggregate(self, collection_name: str, pipeline: List[Dict]) -> Iterable[Dict]:
+        """
+        Runs an aggregation pipeline over a collection
+
+        Args:
+            collection_name (str): Collection to aggregate
+            pipeline (List[Dict]): Mongo-like aggregation stages
+
+        Returns:
+            Iterable[Dict]: Aggregation result documents
+        """
+        raise NotImplementedError
@@ -0,0 +1,81 @@
+from operator import itemgetter
+from typing import Dict, Iterable, List, Sequence
+import numpy
+
+# Python types of the values of a column that has a typed NumPy dtype
+TYPED_KINDS = [({bool}, numpy.bool_), ({int}, numpy.int64), ({int, float}, numpy.float64), ({float}, numpy.float64)]
+# Python types of the values that NumPy would turn into nested arrays
+NESTED_TYPES = (list, tuple, dict)
+
+
+def values_to_column(values: Sequence) -> numpy.ndarray:
+    """
+    Converts the values of a field to a NumPy column: int64, float64 or bool if all of them have that type (and none
+    is missing), object otherwise
+
+    Args:
+        values (Sequence): Value of every row (None if it is missing)
+
+    Returns:
+        numpy.ndarray: Column values
+    """
+    types = set(map(type, values))
+    for kind_types, dtype in TYPED_KINDS:
+        if types == kind_types:
+            try:
+                return numpy.array(values, dtype=dtype)
+            except OverflowError:
+                break
+    column = numpy.empty(len(values), dtype=object)
+    if any(issubclass(value_type, NESTED_TYPES) for value_type in types):
+        for idx, value in enumerate(values):
+            column[idx] = value
+    else:
+        column[:] = values
+    return column
+
+
+def documents_to_columns(documents: Iterable[Dict]) -> Dict[str, numpy.ndarray]:
+    """
+    Transforms decoded documents to NumPy columns. The documents are transposed with C loops (`itemgetter` and `zip`)
+    when all of them have the same fields, which is the usual case of the datasets
+
+    Args:
+        documents (Iterable[Dict]): Documents
+
+    Returns:
+        Dict[str, numpy.ndarray]: Column name and values, the columns keep the order of appearance
+    """
+    documents = documents if isinstance(documents, list) else list(documents)
+    if len(documents) == 0:
+        return dict()
+    first_fields = documents[0].keys()
+    if all(document.keys() == first_fields for document in documents):
+        fields: List[str] = list(first_fields)
+        if len(fields) == 1:
+            return {fields[0]: values_to_column([document[fields[0]] for document in documents])}
+        rows = list(map(itemgetter(*fields), documents))
+        return {field: values_to_column(values) for field, values in zip(fields, zip(*rows))}
+    # The missing fields of a document are None
+    fields = list(dict.fromkeys(field for document in documents for field in document))
+    return {field: values_to_column([document.get(field) for document in documents]) for field in fields}
+
+
+def raw_bson_to_columns(raw_batches: Iterable[bytes]) -> Dict[str, numpy.ndarray]:
+    """
+    Decodes batches of raw BSON documents (as returned by `find_raw_batches`) into NumPy columns. Every batch is
+    decoded at once by the C extension of `bson`, and the documents are transposed to columns without building a
+    DataFrame from the dictionaries
+
+    Args:
+        raw_batches (Iterable[bytes]): Batches of concatenated raw BSON documents
+
+    Returns:
+        Dict[str, numpy.ndarray]: Column name and values, the columns keep the order of appearance
+    """
+    import bson
+
+    documents: List[Dict] = list()
+    for data in raw_batches:
+        documents.extend(bson.decode_all(data))
+    return documents_to_columns(documents)
@@ -0,0 +1,240 @@
+from collections import OrderedDict
+from functools import cmp_to_key
+from typing import Any, Callable, Dict, Iterable, List
+
+MISSING = object()
+
+
+def get_field(document: Dict, field: str) -> Any:
+    """
+    Gets a field value from a document, supporting dotted paths for nested documents
+
+    Args:
+        document (Dict): Document to read
+        field (str): Field name or dotted path
+
+    Returns:
+        Any: Field value or MISSING if the field does not exist
+    """
+    value = document
+    for key in field.split('.'):
+        if not isinstance(value, dict) or key not in value:
+            return MISSING
+        value = value[key]
+    return value
+
+
+def compare_values(left: Any, right: Any) -> int:
+    """
+    Compares two values following a simplified Mongo ordering (missing/None < numbers < strings < others)
+
+    Args:
+        left (Any): First value
+        right (Any): Second value
+
+    Returns:
+        int: Negative, zero or positive number as the usual comparison functions
+    """
+
+    def rank(value: Any) -> int:
+        if value is MISSING or value is None:
+            return 0
+        if isinstance(value, (bool, int, float)):
+            return 1
+        if isinstance(value, str):
+            return 2
+        return 3
+
+    left_rank, right_rank = rank(left), rank(right)
+    if left_rank != right_rank or left_rank in (0, 3):
+        return left_rank - right_rank
+    return (left > right) - (left < right)
+
+
+def _match_operator(value: Any, operator: str, operand: Any) -> bool:
+    """
+    Evaluates a single query operator against a field value
+
+    Args:
+        value (Any): Field value (or MISSING)
+        operator (str): Query operator, i.e. '$in'
+        operand (Any): Operator argument
+
+    Returns:
+        bool: True if the value satisfies the operator
+
+    Raises:
+        Exception: If the operator is not supported
+    """
+    present = value is not MISSING
+    if operator == '$eq':
+        return (value if present else None) == operand
+    if operator == '$ne':
+        return (value if present else None) != operand
+    if operator == '$in':
+        return (value if present else None) in operand
+    if operator == '$nin':
+        return (value if present else None) not in operand
+    if operator == '$exists':
+        return present == bool(operand)
+    if operator in ('$gt', '$gte', '$lt', '$lte'):
+        if not present or value is None or isinstance(value, str) != isinstance(operand, str):
+            return False
+        comparison = compare_values(value, operand)
+        return {'$gt': comparison > 0, '$gte': comparison >= 0, '$lt': comparison < 0,
+                '$lte': comparison <= 0}[operator]
+    raise Exception(f"Unsupported query operator '{operator}'")
+
+
+def match_document(document: Dict, query: Dict) -> bool:
+    """
+    Checks if a document satisfies a Mongo-like filter query. Supported operators: $and, $or, $eq, $ne, $in, $nin,
+    $exists, $gt, $gte, $lt and $lte
+
+    Args:
+        document (Dict): Document to check
+        query (Dict): Filter query
+
+    Returns:
+        bool: True if the document matches the query
+    """
+    for field, condition in (query or {}).items():
+        if field == '$and':
+            if not all(match_document(document, sub_query) for sub_query in condition):
+                return False
+            continue
+        if field == '$or':
+            if not any(match_document(document, sub_query) for sub_query in condition):
+                return False
+            continue
+        value = get_field(document, field)
+        if isinstance(condition, dict) and condition and all(key.startswith('$') for key in condition):
+            if not all(_match_operator(value, operator, operand) for operator, operand in condition.items()):
+                return False
+        elif (value if value is not MISSING else None) != condition:
+            return False
+    return True
+
+
+def _evaluate_expression(document: Dict, expression: Any) -> Any:
+    """
+    Evaluates a field path ('$field') or a constant inside an aggregation stage
+
+    Args:
+        document (Dict): Document to read
+        expression (Any): '$field' reference or constant value
+
+    Returns:
+        Any: Evaluated value (None if the field does not exist)
+    """
+    if isinstance(expression, str) and expression.startswith('$'):
+        value = get_field(document, expression[1:])
+        return None if value is MISSING else value
+    if isinstance(expression, dict):
+        return {key: _evaluate_expression(document, sub_expression) for key, sub_expression in expression.items()}
+    return expression
+
+
+def _group(documents: Iterable[Dict], stage: Dict) -> List[Dict]:
+    """
+    Groups documents as the $group aggregation stage. Supported accumulators: $sum, $avg, $min, $max, $first, $last,
+    $push and $addToSet
+
+    Args:
+        documents (Iterable[Dict]): Documents to group
+        stage (Dict): $group stage specification
+
+    Returns:
+        List[Dict]: One document per group
+    """
+    groups: Dict[str, Dict] = OrderedDict()
+    accumulators = {field: spec for field, spec in stage.items() if field != '_id'}
+    for document in documents:
+        group_id = _evaluate_expression(document, stage['_id'])
+        key = repr(group_id)
+        if key not in groups:
+            groups[key] = {'_id': group_id, **{field: [] for field in accumulators}}
+        for field, spec in accumulators.items():
+            (operator, expression), = spec.items()
+            groups[key][field].append(_evaluate_expression(document, expression))
+
+    reducers: Dict[str, Callable[[List], Any]] = {
+        '$sum': lambda values: sum(value for value in values if isinstance(value, (int, float))),
+        '$avg': lambda values: (lambda numbers: sum(numbers) / len(numbers) if numbers else None)(
+            [value for value in values if isinstance(value, (int, float))]),
+        '$min': lambda values: min((value for value in values if value is not None), default=None),
+        '$max': lambda values: max((value for value in values if value is not None), default=None),
+        '$first': lambda values: values[0] if values else None,
+        '$last': lambda values: values[-1] if values else None,
+        '$push': lambda values: values,
+        '$addToSet': lambda values: [value for idx, value in enumerate(values) if value not in values[:idx]],
+    }
+    results: List[Dict] = []
+    for group in groups.values():
+        result = {'_id': group['_id']}
+        for field, spec in accumulators.items():
+            operator = next(iter(spec))
+            if operator not in reducers:
+                raise Exception(f"Unsupported accumulator '{operator}'")
+            result[field] = reducers[operator](group[field])
+        results.append(result)
+    return results
+
+
+def _project(document: Dict, projection: Dict) -> Dict:
+    """
+    Projects a document as the $project aggregation stage (inclusion or exclusion of fields)
+
+    Args:
+        document (Dict): Document to project
+        projection (Dict): Fields to include (1/True) or to exclude (0/False)
+
+    Returns:
+        Dict: Projected document
+    """
+    include = {field for field, flag in projection.items() if flag and field != '_id'}
+    if include:
+        projected = {field: document[field] for field in include if field in document}
+        if projection.get('_id', True) and '_id' in document:
+            projected = {'_id': document['_id'], **projected}
+        return projected
+    return {field: value for field, value in document.items() if projection.get(field, True)}
+
+
+def run_pipeline(documents: Iterable[Dict], pipeline: List[Dict]) -> List[Dict]:
+    """
+    Runs a Mongo-like aggregation pipeline over documents. Supported stages: $match, $project, $sort, $skip, $limit,
+    $count and $group
+
+    Args:
+        documents (Iterable[Dict]): Input documents
+        pipeline (List[Dict]): Aggregation stages
+
+    Returns:
+        List[Dict]: Aggregation result documents
+
+    Raises:
+        Exception: If a stage is not supported
+    """
+    results: List[Dict] = list(documents)
+    for stage in pipeline:
+        (operator, spec), = stage.items()
+        if operator == '$match':
+            results = [document for document in results if match_document(document, spec)]
+        elif operator == '$project':
+            results = [_project(document, spec) for document in results]
+        elif operator == '$sort':
+            for field, direction in reversed(list(spec.items())):
+                results.sort(key=cmp_to_key(lambda a, b: compare_values(get_field(a, field), get_field(b, field))),
+                             reverse=direction < 0)
+        elif operator == '$skip':
+            results = results[spec:]
+        elif operator == '$limit':
+            results = results[:spec]
+        elif operator == '$count':
+            results = [{spec: len(results)}] if results else []
+        elif operator == '$group':
+            results = _group(results, spec)
+        else:
+            raise Exception(f"Unsupported aggregation stage '{operator}'")
+    return results
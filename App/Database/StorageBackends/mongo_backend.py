@@ -0,0 +1,92 @@
+import numpy
+import pymongo
+from typing import Dict, Iterable, List, Optional
+from pymongo import MongoClient, DeleteMany, InsertOne
+from pymongo.collection import Collection
+from App.Database.StorageBackends.abstract_backend import AbstractStorageBackend
+from App.Database.StorageBackends.columnar import raw_bson_to_columns
+
+
+class MongoBackend(AbstractStorageBackend):
+    """
+    Storage backend that keeps the documents on a MongoDB server
+
+    Args:
+        str_connection (str): Mongo connection string
+        db_name (str): Database name
+        raw_batch_size (int): Number of documents per raw batch on the bulk read mode
+
+    Attributes:
+        str_connection (str): Mongo connection string
+        db_name (str): Database name
+        raw_batch_size (int): Number of documents per raw batch on the bulk read mode
+        __client (MongoClient): Client shared by all the operations, created on the first use
+    """
+    name: str = 'mongo'
+
+    def __init__(self, str_connection: str, db_name: str, raw_batch_size: int = 1000):
+        self.str_connection = str_connection
+        self.db_name = db_name
+        self.raw_batch_size = raw_batch_size
+        self.__client: Optional[MongoClient] = None
+
+    def get_client(self) -> MongoClient:
+        """
+        Gets a MongoClient instance for connecting with the database
+
+        Returns:
+            MongoClient: Instance for connecting with the database
+        """
+        if self.__client is None:
+            self.__client = pymongo.MongoClient(self.str_connection)
+        return self.__client
+
+    def get_collection(self, collection_name: str) -> Collection:
+        """
+        Gets a Database collection
+
+        Args:
+            collection_name (str): Collection name
+
+        Returns:
+            Collection: Database collection
+        """
+        return self.get_client()[self.db_name][collection_name]
+
+    def health(self) -> Dict:
+        return self.get_client().server_info()
+
+    def find(self, collection_name: str, query: Optional[Dict] = None) -> Iterable[Dict]:
+        return self.get_collection(collection_name).find(query or {})
+
+    def find_one(self, collection_name: str, query: Dict) -> Optional[Dict]:
+        return self.get_collection(collection_name).find_one(query)
+
+    def find_columns(self, collection_name: str, query: Optional[Dict] = None) -> Dict[str, numpy.ndarray]:
+        # The documents arrive as raw BSON batches, decoded by the C extension of bson and transposed to columns
+        raw_batches = self.get_collection(collection_name).find_raw_batches(query or {},
+                                                                             batch_size=self.raw_batch_size)
+        return raw_bson_to_columns(raw_batches)
+
+    def insert_one(self, collection_name: str, document: Dict) -> None:
+        self.get_collection(collection_name).insert_one(document)
+
+    def insert_many(self, collection_name: str, documents: Iterable[Dict]) -> None:
+        self.get_collection(collection_name).insert_many(documents)
+
+    def update_one(self, collection_name: str, query: Dict, updates: Dict, upsert: bool = False) -> None:
+        self.get_collection(collection_name).update_one(query, {'$set': updates}, upsert)
+
+    def delete_one(self, collection_name: str, query: Dict) -> None:
+        self.get_collection(collection_name).delete_one(query)
+
+    def delete_many(self, collection_name: str, query: Dict) -> None:
+        self.get_collection(collection_name).delete_many(query)
+
+    def replace_many(self, collection_name: str, query: Dict, documents: Iterable[Dict]) -> None:
+        # Ordered bulk write: the delete is applied before the inserts, all of them sent in the fewest round trips
+        requests = [DeleteMany(query), *[InsertOne(document) for document in documents]]
+        self.get_collection(collection_name).bulk_write(requests, ordered=True)
+
+    def aggregate(self, collection_name: str, pipeline: List[Dict]) -> Iterable[Dict]:
+        return self.get_collection(collection_name).aggregate(pipeline)
@@ -0,0 +1,264 @@
+import os
+import json
+import uuid
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from App.Database.StorageBackends.abstract_backend import AbstractStorageBackend
+from App.Database.StorageBackends.document_query import match_document, run_pipeline
+
+ID = '_id'
+# Fields queried by the data access layer (i.e. the menus and registers by date), indexed on every table
+INDEXED_FIELDS = ['date']
+
+
+def get_field_column(field: str) -> str:
+    """
+    Gets the name of the generated column of an indexed field
+
+    Args:
+        field (str): Indexed field
+
+    Returns:
+        str: Column name
+    """
+    return f'field_{field}'
+
+
+def is_sql_value(value: Any) -> bool:
+    """
+    Checks if a value is compared by SQLite as Python does with the values extracted from the JSON documents
+
+    Args:
+        value (Any): Value of a query
+
+    Returns:
+        bool: True for strings and numbers (not booleans)
+    """
+    return isinstance(value, (str, int, float)) and not isinstance(value, bool)
+
+
+class SQLiteBackend(AbstractStorageBackend):
+    """
+    Embedded storage backend that keeps every collection as a SQLite table of JSON documents, so the whole pipeline
+    can run on a single machine without an external database service
+
+    Args:
+        db_path (str): Path of the SQLite database file
+
+    Attributes:
+        db_path (str): Path of the SQLite database file
+        __local (threading.local): Connection per thread (sqlite3 connections can not be shared between threads)
+        __known_tables (set): Tables already created
+        __tables_lock (threading.Lock): Lock used while creating the tables
+    """
+    name: str = 'sqlite'
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.__local = threading.local()
+        self.__known_tables = set()
+        self.__tables_lock = threading.Lock()
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.isdir(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+
+    def __get_connection(self) -> sqlite3.Connection:
+        """
+        Gets the connection of the current thread, opening it on the first use
+
+        Returns:
+            sqlite3.Connection: SQLite connection
+        """
+        connection = getattr(self.__local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self.__local.connection = connection
+        return connection
+
+    def __get_table(self, collection_name: str) -> str:
+        """
+        Gets the quoted table name of a collection, creating the table (and the indexes of the queried fields) if it
+        does not exist
+
+        Args:
+            collection_name (str): Collection name
+
+        Returns:
+            str: Quoted table name
+        """
+        table = '"' + collection_name.replace('"', '""') + '"'
+        if collection_name not in self.__known_tables:
+            with self.__tables_lock:
+                with self.__get_connection() as connection:
+                    connection.execute(f'CREATE TABLE IF NOT EXISTS {table} (id TEXT PRIMARY KEY, document TEXT)')
+                    columns = {row[1] for row in connection.execute(f'PRAGMA table_xinfo({table})')}
+                    for field in INDEXED_FIELDS:
+                        column = get_field_column(field)
+                        if column not in columns:
+                            # Virtual column, computed from the document when it is read (by the index too)
+                            connection.execute(f'ALTER TABLE {table} ADD COLUMN {column} GENERATED ALWAYS AS '
+                                               f"(json_extract(document, '$.{field}')) VIRTUAL")
+                        index = '"' + f'{collection_name}_{column}'.replace('"', '""') + '"'
+                        connection.execute(f'CREATE INDEX IF NOT EXISTS {index} ON {table} ({column})')
+                self.__known_tables.add(collection_name)
+        return table
+
+    @staticmethod
+    def __encode_id(id_document) -> str:
+        return json.dumps(id_document)
+
+    def __get_sql_filter(self, query: Dict) -> Tuple[List[str], List, bool]:
+        """
+        Translates the conditions of a query on the primary key and on the indexed fields (equality and `$in`) to SQL
+
+        Args:
+            query (Dict): Mongo-like filter query
+
+        Returns:
+            List[str]: SQL conditions
+            List: Parameters of the conditions
+            bool: True if every condition of the query was translated
+        """
+        conditions: List[str] = list()
+        parameters: List = list()
+        is_complete = True
+        for field, value in query.items():
+            if field == ID:
+                column, encode = 'id', self.__encode_id
+            elif field in INDEXED_FIELDS:
+                column, encode = get_field_column(field), lambda field_value: field_value
+            else:
+                is_complete = False
+                continue
+            if isinstance(value, dict) and list(value.keys()) == ['$in'] and \
+                    all(is_sql_value(item) or field == ID for item in value['$in']):
+                values = list(value['$in'])
+                if len(values) == 0:
+                    conditions.append('0')
+                else:
+                    conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+                    parameters += [encode(item) for item in values]
+            elif not isinstance(value, dict) and (is_sql_value(value) or field == ID):
+                conditions.append(f'{column} = ?')
+                parameters.append(encode(value))
+            else:
+                is_complete = False
+        return conditions, parameters, is_complete
+
+    def __iter_documents(self, collection_name: str, query: Optional[Dict] = None, limit: Optional[int] = None) \
+            -> Iterator[Dict]:
+        """
+        Iterates over the documents that match a query. The conditions on the primary key and on the indexed fields
+        (and the limit, if they are the whole query) are run by SQLite, the rest of the query is checked on the read
+        documents
+
+        Args:
+            collection_name (str): Collection name
+            query (Optional[Dict]): Mongo-like filter query
+            limit (Optional[int]): Maximum number of documents
+
+        Returns:
+            Iterator[Dict]: Documents found
+        """
+        table = self.__get_table(collection_name)
+        query = query or {}
+        conditions, parameters, is_complete = self.__get_sql_filter(query)
+        sql = f'SELECT document FROM {table}'
+        if len(conditions) > 0:
+            sql += f" WHERE {' AND '.join(conditions)}"
+        sql += ' ORDER BY rowid'
+        if is_complete and limit is not None:
+            sql += f' LIMIT {int(limit)}'
+        cursor = self.__get_connection().execute(sql, parameters)
+        try:
+            found = 0
+            for row in cursor:
+                document = json.loads(row[0])
+                if is_complete or match_document(document, query):
+                    yield document
+                    found += 1
+                    if limit is not None and found >= limit:
+                        return
+        finally:
+            cursor.close()
+
+    def health(self) -> Dict:
+        version = self.__get_connection().execute('SELECT sqlite_version()').fetchone()[0]
+        return {'backend': self.name, 'version': version, 'path': self.db_path}
+
+    def find(self, collection_name: str, query: Optional[Dict] = None) -> Iterable[Dict]:
+        return self.__iter_documents(collection_name, query)
+
+    def find_one(self, collection_name: str, query: Dict) -> Optional[Dict]:
+        # Read to the end, so the cursor is closed before the caller writes
+        documents = list(self.__iter_documents(collection_name, query, limit=1))
+        return documents[0] if len(documents) > 0 else None
+
+    def __encode_rows(self, documents: Iterable[Dict]) -> List[tuple]:
+        """
+        Encodes documents as table rows, giving an `_id` to the documents without one
+
+        Args:
+            documents (Iterable[Dict]): Documents to encode
+
+        Returns:
+            List[tuple]: Encoded id and JSON document of every document
+        """
+        rows = []
+        for document in documents:
+            if ID not in document:
+                document[ID] = uuid.uuid4().hex
+            rows.append((self.__encode_id(document[ID]), json.dumps(document)))
+        return rows
+
+    def insert_many(self, collection_name: str, documents: Iterable[Dict]) -> None:
+        table = self.__get_table(collection_name)
+        rows = self.__encode_rows(documents)
+        with self.__get_connection() as connection:
+            connection.executemany(f'INSERT INTO {table} (id, document) VALUES (?, ?)', rows)
+
+    def replace_many(self, collection_name: str, query: Dict, documents: Iterable[Dict]) -> None:
+        table = self.__get_table(collection_name)
+        rows = self.__encode_rows(documents)
+        ids = [(self.__encode_id(document[ID]),) for document in self.__iter_documents(collection_name, query)]
+        # The delete and the inserts are committed in the same transaction
+        with self.__get_connection() as connection:
+            connection.executemany(f'DELETE FROM {table} WHERE id = ?', ids)
+            connection.executemany(f'INSERT INTO {table} (id, document) VALUES (?, ?)', rows)
+
+    def update_one(self, collection_name: str, query: Dict, updates: Dict, upsert: bool = False) -> None:
+        table = self.__get_table(collection_name)
+        document = self.find_one(collection_name, query)
+        with self.__get_connection() as connection:
+            if document is not None:
+                document.update(updates)
+                connection.execute(f'UPDATE {table} SET document = ? WHERE id = ?',
+                                   (json.dumps(document), self.__encode_id(document[ID])))
+            elif upsert:
+                new_document = {field: value for field, value in query.items()
+                                if not field.startswith('$') and not isinstance(value, dict)}
+                new_document.update(updates)
+                new_document.setdefault(ID, uuid.uuid4().hex)
+                connection.execute(f'INSERT INTO {table} (id, document) VALUES (?, ?)',
+                                   (self.__encode_id(new_document[ID]), json.dumps(new_document)))
+
+    def __delete(self, collection_name: str, query: Dict, limit: Optional[int]) -> None:
+        table = self.__get_table(collection_name)
+        with self.__get_connection() as connection:
+            if not query and limit is None:
+                connection.execute(f'DELETE FROM {table}')
+                return
+            ids = [self.__encode_id(document[ID]) for document in self.__iter_documents(collection_name, query, limit)]
+            connection.executemany(f'DELETE FROM {table} WHERE id = ?', [(id_document,) for id_document in ids])
+
+    def delete_one(self, collection_name: str, query: Dict) -> None:
+        self.__delete(collection_name, query, 1)
+
+    def delete_many(self, collection_name: str, query: Dict) -> None:
+        self.__delete(collection_name, query, None)
+
+    def aggregate(self, collection_name: str, pipeline: List[Dict]) -> Iterable[Dict]:
+        return run_pipeline(self.__iter_documents(collection_name), pipeline)
@@ -1,2 +1,4 @@
 import App.Database.db
 import App.Database.db_server
+import App.Database.async_db_server
+import App.Database.menu_cache
@@ -0,0 +1,165 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+from App.Models import Menu
+from App.Util.request_profiler import get_active_profile
+from App.Database import db_server
+from config import DB_IO_WORKERS
+
+_db_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """
+    Gets the thread pool shared by the process to run the blocking storage calls
+
+    Returns:
+        ThreadPoolExecutor: Thread pool for the storage calls
+    """
+    global _db_executor
+    if _db_executor is None:
+        _db_executor = ThreadPoolExecutor(max_workers=DB_IO_WORKERS, thread_name_prefix='db-io')
+    return _db_executor
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """
+    Runs a blocking function on the storage thread pool without blocking the running event loop. The storage thread
+    is profiled too if the request is profiled (see `RequestProfile`)
+
+    Args:
+        func (Callable): Blocking function
+        *args: Positional arguments of the function
+        **kwargs: Keyword arguments of the function
+
+    Returns:
+        Any: Value returned by the function
+    """
+    loop = asyncio.get_running_loop()
+    profile = get_active_profile()
+    if profile is not None:
+        func = profile.wrap(func)
+    return await loop.run_in_executor(get_db_executor(), partial(func, *args, **kwargs))
+
+
+async def delete_dataset_db(catering: str) -> None:
+    """
+    Removes all the documents in a given catering dataset collection
+
+    Args:
+        catering (str): A valid catering
+
+    Returns:
+        None
+    """
+    await run_blocking(db_server.delete_dataset_db, catering)
+
+
+async def save_menus_db(catering: str, menus: List[Menu], dates: Iterable[str]) -> None:
+    """
+    Inserts menu documents in a given catering collection
+
+    Args:
+        catering (str): A valid catering
+        menus (List[Menu]): List of menu instances to save in the db
+        dates (Iterable[str]): List of dates related to the given menus
+
+    Returns:
+        None
+    """
+    await run_blocking(db_server.save_menus_db, catering, menus, list(dates))
+
+
+async def save_registers_db(catering: str, registers: Iterable[Dict], dates: Iterable[str]) -> None:
+    """
+    Inserts register documents in a given catering collection
+
+    Args:
+        catering (str): A valid catering
+        registers (Iterable[Dict]): Register documents to save in the db
+        dates (Iterable[str]): List of dates related to the given registers
+
+    Returns:
+        None
+    """
+    await run_blocking(db_server.save_registers_db, catering, registers, list(dates))
+
+
+async def save_dataset_db(catering: str, dataset: List[Dict[str, Union[str, int]]]) -> None:
+    """
+    Inserts dataset records in a given catering collection
+
+    Args:
+        catering (str): A valid catering
+        dataset (List[Dict[str, Union[str, int]]]): List of dataset records to save in the db
+
+    Returns:
+        None
+    """
+    await run_blocking(db_server.save_dataset_db, catering, dataset)
+
+
+async def get_list_menu_docs(catering: str) -> List[Dict]:
+    """
+    Gets a list of all menu documents from the given catering collection
+
+    Args:
+        catering (str): A valid catering
+
+    Returns:
+        List[Dict]: List of menu documents from the db
+    """
+    return await run_blocking(db_server.get_list_menu_docs, catering)
+
+
+async def get_list_register_docs(catering: str) -> List[Dict]:
+    """
+    Gets a list of all register documents from the given catering collection
+
+    Args:
+        catering (str): A valid catering
+
+    Returns:
+        List[Dict]: List of register documents from the db
+    """
+    return await run_blocking(db_server.get_list_register_docs, catering)
+
+
+async def get_dataset_docs(catering: str) -> List[Dict]:
+    """
+    Gets a list all dataset records from the given catering collection
+
+    Args:
+        catering (string): A valid catering
+
+    Returns:
+        List[Dict]: List of dataset records from the db
+    """
+    return await run_blocking(db_server.get_dataset_docs, catering)
+
+
+async def get_fingerprints(keys: List[str]) -> Dict[str, str]:
+    """
+    Gets the stored content fingerprints of the given keys
+
+    Args:
+        keys (List[str]): Fingerprint keys (uploaded files or per-date blocks)
+
+    Returns:
+        Dict[str, str]: SHA-256 by key, only for the keys found
+    """
+    return await run_blocking(db_server.get_fingerprints, keys)
+
+
+async def save_fingerprints(fingerprints: Dict[str, str]) -> None:
+    """
+    Saves content fingerprints, replacing the previous ones with the same keys
+
+    Args:
+        fingerprints (Dict[str, str]): SHA-256 by key
+
+    Returns:
+        None
+    """
+    await run_blocking(db_server.save_fingerprints, fingerprints)
@@ -1,57 +1,77 @@
-import pymongo
-from typing import Dict, List
-from pymongo import MongoClient
-from pymongo.collection import Collection
-from pymongo.cursor import Cursor
-from config import MONGO_STR_CONNECTION, MONGO_DB_NAME
+import numpy
+from typing import Dict, Iterable, List
+from App.Database.StorageBackends import AbstractStorageBackend
+from config import MONGO_STR_CONNECTION, MONGO_DB_NAME, STORAGE_BACKEND, SQLITE_DB_PATH, StorageBackendNames, \
+    BULK_READ_BATCH_SIZE
 
 
-class MongoManager:
-    __client = None
+def create_storage_backend(backend_name: str) -> AbstractStorageBackend:
+    """
+    Creates a storage backend instance given its name. The backend modules are imported here so the driver of an
+    unused backend is never loaded
+
+    Args:
+        backend_name (str): Backend name, see `StorageBackendNames`
+
+    Returns:
+        AbstractStorageBackend: Storage backend instance
+
+    Raises:
+        Exception: If an invalid backend name is given
+    """
+    if backend_name == StorageBackendNames.MONGO:
+        from App.Database.StorageBackends.mongo_backend import MongoBackend
+        return MongoBackend(MONGO_STR_CONNECTION, MONGO_DB_NAME, BULK_READ_BATCH_SIZE)
+    if backend_name == StorageBackendNames.SQLITE:
+        from App.Database.StorageBackends.sqlite_backend import SQLiteBackend
+        return SQLiteBackend(SQLITE_DB_PATH)
+    valid_backends = [StorageBackendNames.MONGO, StorageBackendNames.SQLITE]
+    raise Exception(f"Invalid storage backend '{backend_name}'. Valid storage backends: {valid_backends}")
+
+
+class StorageManager:
+    __backend: AbstractStorageBackend = None
 
     @staticmethod
-    def get_client() -> MongoClient:
+    def get_backend() -> AbstractStorageBackend:
         """
-        Gets a MongoClient instance for connecting with the sample_data base
+        Gets the storage backend configured by `STORAGE_BACKEND`, the instance is shared by the whole process
 
         Args:
             None
 
         Returns:
-            MongoClient: Instance for connecting with the sample_data base
+            AbstractStorageBackend: Storage backend instance
         """
-        if not MongoManager.__client:
-            __client = pymongo.MongoClient(MONGO_STR_CONNECTION)
-        return __client
+        if StorageManager.__backend is None:
+            StorageManager.__backend = create_storage_backend(STORAGE_BACKEND)
+        return StorageManager.__backend
 
     @staticmethod
-    def get_collection(collection_name: str) -> Collection:
+    def set_backend(backend: AbstractStorageBackend) -> None:
         """
-        Gets a Database collection
+        Replaces the storage backend used by the process, i.e. for benchmarks against a local database
 
         Args:
-            collection_name (str): Collection name
+            backend (AbstractStorageBackend): Storage backend instance
 
         Returns:
-            Collection: Database collection
+            None
         """
-        client = MongoManager.get_client()
-        db = client[MONGO_DB_NAME]
-        return db[collection_name]
+        StorageManager.__backend = backend
 
 
-def client_health() -> MongoClient:
+def client_health() -> Dict:
     """
-    Gets a MongoClient instance with the server information
+    Gets the storage service information
 
     Args:
         None
 
     Returns:
-        MongoClient: Connectivity server information
+        Dict: Connectivity server information
     """
-    client = MongoManager.get_client()
-    return client.server_info()
+    return StorageManager.get_backend().health()
 
 
 def find_one_by_id(id_document: str, collection_name: str) -> Dict:
@@ -68,14 +88,13 @@ def find_one_by_id(id_document: str, collection_name: str) -> Dict:
     Returns:
         Dict: Mongo document
     """
-    collection = MongoManager.get_collection(collection_name)
-    document = collection.find_one({'_id': id_document})
+    document = StorageManager.get_backend().find_one(collection_name, {'_id': id_document})
     if not document:
         raise Exception(f'Game {id_document} not found on "{collection_name}" collection')
     return document
 
 
-def find_all(collection_name: str) -> Cursor:
+def find_all(collection_name: str) -> Iterable[Dict]:
     """
     Gets all the documents from a collection
 
@@ -83,11 +102,50 @@ def find_all(collection_name: str) -> Cursor:
         collection_name (str): Collection to search the element
 
     Returns:
-        Cursor: Mongo cursor
+        Iterable[Dict]: Documents cursor
+    """
+    return StorageManager.get_backend().find(collection_name, {})
+
+
+def find_many(query: Dict, collection_name: str) -> Iterable[Dict]:
+    """
+    Gets the documents that match a query from a collection
+
+    Args:
+        query (Dict): Mongo-like filter query
+        collection_name (str): Collection to search the elements
+
+    Returns:
+        Iterable[Dict]: Documents cursor
+    """
+    return StorageManager.get_backend().find(collection_name, query)
+
+
+def find_all_columns(collection_name: str) -> Dict[str, numpy.ndarray]:
+    """
+    Gets all the documents from a collection as NumPy columns (bulk read mode)
+
+    Args:
+        collection_name (str): Collection to search the elements
+
+    Returns:
+        Dict[str, numpy.ndarray]: Field name and values of every document
+    """
+    return StorageManager.get_backend().find_columns(collection_name, {})
+
+
+def aggregate(pipeline: List[Dict], collection_name: str) -> Iterable[Dict]:
+    """
+    Runs an aggregation pipeline over a collection
+
+    Args:
+        pipeline (List[Dict]): Mongo-like aggregation stages
+        collection_name (str): Collection to aggregate
+
+    Returns:
+        Iterable[Dict]: Aggregation result documents
     """
-    collection = MongoManager.get_collection(collection_name)
-    cursor = collection.find({})
-    return cursor
+    return StorageManager.get_backend().aggregate(collection_name, pipeline)
 
 
 def add_one(document: Dict, collection_name: str) -> None:
@@ -101,8 +159,7 @@ def add_one(document: Dict, collection_name: str) -> None:
     Returns:
         None
     """
-    collection = MongoManager.get_collection(collection_name)
-    collection.insert_one(document)
+    StorageManager.get_backend().insert_one(collection_name, document)
 
 
 def add_many(documents: List[Dict], collection_name: str) -> None:
@@ -116,8 +173,7 @@ def add_many(documents: List[Dict], collection_name: str) -> None:
     Returns:
         None
     """
-    collection = MongoManager.get_collection(collection_name)
-    collection.insert_many(documents)
+    StorageManager.get_backend().insert_many(collection_name, documents)
 
 
 def update_one_by_id(id_document: str, dict_updates: Dict, collection_name: str, upsert: bool = False) -> None:
@@ -133,10 +189,8 @@ def update_one_by_id(id_document: str, dict_updates: Dict, collection_name: str,
     Returns:
         None
     """
-    collection = MongoManager.get_collection(collection_name)
     query = {'_id': id_document}
-    updates = {'$set': dict_updates}
-    collection.update_one(query, updates, upsert)
+    StorageManager.get_backend().update_one(collection_name, query, dict_updates, upsert)
 
 
 def delete_one(search_field: str, search_value: str, collection_name: str) -> None:
@@ -151,8 +205,7 @@ def delete_one(search_field: str, search_value: str, collection_name: str) -> No
     Returns:
         None
     """
-    collection = MongoManager.get_collection(collection_name)
-    collection.delete_one({search_field: search_value})
+    StorageManager.get_backend().delete_one(collection_name, {search_field: search_value})
 
 
 def delete_many(search_field: str, search_value: str, collection_name: str) -> None:
@@ -167,8 +220,22 @@ def delete_many(search_field: str, search_value: str, collection_name: str) -> N
     Returns:
         None
     """
-    collection = MongoManager.get_collection(collection_name)
-    collection.delete_many({search_field: search_value})
+    StorageManager.get_backend().delete_many(collection_name, {search_field: search_value})
+
+
+def replace_many(query: Dict, documents: Iterable[Dict], collection_name: str) -> None:
+    """
+    Removes the documents that match a query and inserts the new ones in one bulk operation
+
+    Args:
+        query (Dict): Mongo-like filter query of the documents to remove
+        documents (Iterable[Dict]): Documents to save
+        collection_name (str): Collection to replace the documents
+
+    Returns:
+        None
+    """
+    StorageManager.get_backend().replace_many(collection_name, query, documents)
 
 
 def delete_all(collection_name: str) -> None:
@@ -181,5 +248,4 @@ def delete_all(collection_name: str) -> None:
     Returns:
         None
     """
-    collection = MongoManager.get_collection(collection_name)
-    collection.delete_many({})
+    StorageManager.get_backend().delete_many(collection_name, {})
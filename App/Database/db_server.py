@@ -1,8 +1,11 @@
-from typing import List, Union, Dict
-from App.Models import Menu, BreakfastRegister, LunchRegister
+import numpy
+from typing import Iterable, List, Optional, Union, Dict
+from App.Models import Menu
 from App.Util.helpers import to_dict
 from App.Database import db, collection_manager
+from config import MongoCollections
 from App.Util.constants import MenuFields, RegisterFields
+from App.Util.metrics import time_stage
 
 
 def delete_dataset_db(catering: str) -> None:
@@ -33,20 +36,17 @@ def save_menus_db(catering: str, menus: List[Menu], dates: List[str]) -> None:
     """
     collection_name: str = collection_manager.get_menu_collection(catering)
 
-    # dropping the documents with same date in order to avoid issues
-    for date in dates:
-        db.delete_many(MenuFields.DATE, date, collection_name)
-    db.add_many(to_dict(menus), collection_name)
+    # dropping the documents with same date in order to avoid issues, in the same bulk write as the inserts
+    db.replace_many({MenuFields.DATE: {'$in': list(dates)}}, to_dict(menus), collection_name)
 
 
-def save_registers_db(catering: str, registers: List[Union[BreakfastRegister, LunchRegister]],
-                      dates: List[str]) -> None:
+def save_registers_db(catering: str, registers: Iterable[Dict], dates: List[str]) -> None:
     """
     Inserts register documents in a given catering collection
 
     Args:
         catering (str): A valid catering
-        registers (List[Union[BreakfastRegister, LunchRegister]]): List of register instances to save in the db
+        registers (Iterable[Dict]): Register documents to save in the db
         dates (List[str]): List of dates related to the given menus
 
     Returns:
@@ -54,10 +54,8 @@ def save_registers_db(catering: str, registers: List[Union[BreakfastRegister, Lu
     """
     collection_name: str = collection_manager.get_register_collection(catering)
 
-    # dropping the documents with same date in order to avoid issues
-    for date in dates:
-        db.delete_many(RegisterFields.DATE, date, collection_name)
-    db.add_many(to_dict(registers), collection_name)
+    # dropping the documents with same date in order to avoid issues, in the same bulk write as the inserts
+    db.replace_many({RegisterFields.DATE: {'$in': list(dates)}}, registers, collection_name)
 
 
 def save_dataset_db(catering: str, dataset: List[Dict[str, Union[str, int]]]) -> None:
@@ -87,7 +85,24 @@ def get_list_menu_docs(catering: str) -> List[Dict]:
         List[Dict]: List of menu documents from the db
     """
     collection_name: str = collection_manager.get_menu_collection(catering)
-    return [document for document in db.find_all(collection_name)]
+    with time_stage('db_read_menus', catering):
+        return [document for document in db.find_all(collection_name)]
+
+
+def get_menu_docs_by_dates(catering: str, dates: List[str]) -> List[Dict]:
+    """
+    Gets the menu documents of the given dates from the given catering collection
+
+    Args:
+        catering (str): A valid catering
+        dates (List[str]): Dates of the menus
+
+    Returns:
+        List[Dict]: List of menu documents from the db
+    """
+    collection_name: str = collection_manager.get_menu_collection(catering)
+    with time_stage('db_read_menus', catering):
+        return [document for document in db.find_many({MenuFields.DATE: {'$in': list(dates)}}, collection_name)]
 
 
 def get_list_register_docs(catering: str) -> List[Dict]:
@@ -101,7 +116,8 @@ def get_list_register_docs(catering: str) -> List[Dict]:
         List[Dict]: List of register documents from the db
     """
     collection_name: str = collection_manager.get_register_collection(catering)
-    return [document for document in db.find_all(collection_name)]
+    with time_stage('db_read_registers', catering):
+        return [document for document in db.find_all(collection_name)]
 
 
 def get_dataset_docs(catering: str) -> List[Dict]:
@@ -115,4 +131,119 @@ def get_dataset_docs(catering: str) -> List[Dict]:
         List[Dict]: List of dataset records from the db
     """
     collection_name: str = collection_manager.get_dataset_collection(catering)
-    return [document for document in db.find_all(collection_name)]
+    with time_stage('db_read_dataset', catering):
+        return [document for document in db.find_all(collection_name)]
+
+
+def has_dataset_docs(catering: str) -> bool:
+    """
+    Checks if the training dataset of a given catering has any document
+
+    Args:
+        catering (string): A valid catering
+
+    Returns:
+        bool: True if the dataset is not empty
+    """
+    collection_name: str = collection_manager.get_dataset_collection(catering)
+    return next(iter(db.find_many({}, collection_name)), None) is not None
+
+
+def get_register_columns(catering: str) -> Dict[str, numpy.ndarray]:
+    """
+    Gets all register documents from the given catering collection as NumPy columns (bulk read mode)
+
+    Args:
+        catering (str): A valid catering
+
+    Returns:
+        Dict[str, numpy.ndarray]: Register field names and their values
+    """
+    collection_name: str = collection_manager.get_register_collection(catering)
+    with time_stage('db_read_registers', catering):
+        return db.find_all_columns(collection_name)
+
+
+def get_dataset_columns(catering: str) -> Dict[str, numpy.ndarray]:
+    """
+    Gets all dataset records from the given catering collection as NumPy columns (bulk read mode)
+
+    Args:
+        catering (string): A valid catering
+
+    Returns:
+        Dict[str, numpy.ndarray]: Dataset field names and their values
+    """
+    collection_name: str = collection_manager.get_dataset_collection(catering)
+    with time_stage('db_read_dataset', catering):
+        return db.find_all_columns(collection_name)
+
+
+def get_fingerprints(keys: List[str]) -> Dict[str, str]:
+    """
+    Gets the stored content fingerprints of the given keys
+
+    Args:
+        keys (List[str]): Fingerprint keys (uploaded files or per-date blocks)
+
+    Returns:
+        Dict[str, str]: SHA-256 by key, only for the keys found
+    """
+    documents = db.find_many({'_id': {'$in': list(keys)}}, MongoCollections.FINGERPRINTS)
+    return {document['_id']: document['sha256'] for document in documents}
+
+
+def save_fingerprints(fingerprints: Dict[str, str]) -> None:
+    """
+    Saves content fingerprints, replacing the previous ones with the same keys
+
+    Args:
+        fingerprints (Dict[str, str]): SHA-256 by key
+
+    Returns:
+        None
+    """
+    if not fingerprints:
+        return
+    documents = [{'_id': key, 'sha256': sha256} for key, sha256 in fingerprints.items()]
+    db.replace_many({'_id': {'$in': list(fingerprints.keys())}}, documents, MongoCollections.FINGERPRINTS)
+
+
+def save_job(job: Dict) -> None:
+    """
+    Saves a new background job record
+
+    Args:
+        job (Dict): Job record, its identifier is on the `_id` field
+
+    Returns:
+        None
+    """
+    db.add_one(job, MongoCollections.JOBS)
+
+
+def update_job(job_id: str, updates: Dict) -> None:
+    """
+    Sets the given fields on a background job record
+
+    Args:
+        job_id (str): Job identifier
+        updates (Dict): Fields to set on the record
+
+    Returns:
+        None
+    """
+    db.update_one_by_id(job_id, updates, MongoCollections.JOBS)
+
+
+def get_job(job_id: str) -> Optional[Dict]:
+    """
+    Gets a background job record
+
+    Args:
+        job_id (str): Job identifier
+
+    Returns:
+        Optional[Dict]: Job record, None if it was not found
+    """
+    return next(iter(db.find_many({'_id': job_id}, MongoCollections.JOBS)), None)
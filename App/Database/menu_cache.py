@@ -0,0 +1,139 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from App.Database import db_server
+from App.Util.constants import MenuFields
+from config import MENU_CACHE_MAX_DATES, MENU_CACHE_TTL
+
+
+class MenuCache:
+    """
+    Read-through cache of the menu documents of a catering, keyed by date. Only the dates that are not cached are
+    fetched from the db, the least recently used dates are evicted when the cache is full and every entry expires
+    after a TTL (other processes may have inserted newer menus)
+
+    Args:
+        catering (str): A valid catering
+        max_dates (int): Maximum number of dates to keep
+        ttl (float): Seconds to keep an entry
+
+    Attributes:
+        catering (str): A valid catering
+        max_dates (int): Maximum number of dates to keep
+        ttl (float): Seconds to keep an entry
+        __entries (OrderedDict[str, Tuple[float, Optional[Dict]]]): Load time and menu document (None if there is no
+            menu for the date) by date, ordered from the least to the most recently used
+        __generation (int): Counter increased on every invalidation, to discard the fetches that raced with it
+        __lock (threading.Lock): Lock for the entries
+    """
+
+    def __init__(self, catering: str, max_dates: int, ttl: float):
+        self.catering = catering
+        self.max_dates = max_dates
+        self.ttl = ttl
+        self.__entries: 'OrderedDict[str, Tuple[float, Optional[Dict]]]' = OrderedDict()
+        self.__generation = 0
+        self.__lock = threading.Lock()
+
+    def get_menus(self, dates: Iterable[str]) -> List[Dict]:
+        """
+        Gets the menu documents of the given dates
+
+        Args:
+            dates (Iterable[str]): Dates of the menus
+
+        Returns:
+            List[Dict]: Menu documents found, in the same order as the dates
+        """
+        dates = list(dict.fromkeys(dates))
+        now = time.time()
+        menus: Dict[str, Optional[Dict]] = dict()
+        with self.__lock:
+            generation = self.__generation
+            for date in dates:
+                entry = self.__entries.get(date)
+                if entry is not None and now - entry[0] <= self.ttl:
+                    self.__entries.move_to_end(date)
+                    menus[date] = entry[1]
+
+        missing_dates = [date for date in dates if date not in menus]
+        if missing_dates:
+            fetched: Dict[str, Optional[Dict]] = dict.fromkeys(missing_dates)
+            for document in db_server.get_menu_docs_by_dates(self.catering, missing_dates):
+                fetched[document[MenuFields.DATE]] = document
+            menus.update(fetched)
+            with self.__lock:
+                if generation == self.__generation:
+                    for date, document in fetched.items():
+                        self.__entries[date] = (now, document)
+                        self.__entries.move_to_end(date)
+                    while len(self.__entries) > self.max_dates:
+                        self.__entries.popitem(last=False)
+        return [menus[date] for date in dates if menus[date] is not None]
+
+    def invalidate(self, dates: Optional[Iterable[str]] = None) -> None:
+        """
+        Removes the given dates from the cache
+
+        Args:
+            dates (Optional[Iterable[str]]): Dates to remove, the whole cache is cleared if it is None
+
+        Returns:
+            None
+        """
+        with self.__lock:
+            self.__generation += 1
+            if dates is None:
+                self.__entries.clear()
+                return
+            for date in dates:
+                self.__entries.pop(date, None)
+
+
+_caches: Dict[str, MenuCache] = dict()
+_caches_lock = threading.Lock()
+
+
+def get_menu_cache(catering: str) -> MenuCache:
+    """
+    Gets the menu cache of a catering, creating it on the first use
+
+    Args:
+        catering (str): A valid catering
+
+    Returns:
+        MenuCache: Menu cache of the catering
+    """
+    with _caches_lock:
+        if catering not in _caches:
+            _caches[catering] = MenuCache(catering, MENU_CACHE_MAX_DATES, MENU_CACHE_TTL)
+        return _caches[catering]
+
+
+def get_menus_by_dates(catering: str, dates: Iterable[str]) -> List[Dict]:
+    """
+    Gets the menu documents of the given dates through the catering cache
+
+    Args:
+        catering (str): A valid catering
+        dates (Iterable[str]): Dates of the menus
+
+    Returns:
+        List[Dict]: Menu documents found
+    """
+    return get_menu_cache(catering).get_menus(dates)
+
+
+def invalidate_menus(catering: str, dates: Optional[Iterable[str]] = None) -> None:
+    """
+    Removes the given dates from the catering cache, it must be called every time menus are saved
+
+    Args:
+        catering (str): A valid catering
+        dates (Optional[Iterable[str]]): Dates to remove, the whole cache is cleared if it is None
+
+    Returns:
+        None
+    """
+    get_menu_cache(catering).invalidate(dates)
@@ -1,2 +1,2 @@
 from .menu import Menu
-from .register import AbstractRegister, LunchRegister, BreakfastRegister
+from .register_batch import RegisterBatch
@@ -1,7 +1,10 @@
+from typing import Dict
 from App.Util.helpers import str_to_timestamp
 
 
 class Menu:
+    __slots__ = ('_id', 'date', 'day', 'is_service_day', 'regular', 'light', 'vegan', 'vegetarian')
+
     def __init__(self, date: str, day: str, is_service_day: str, regular: str, light: str, vegan: str, vegetarian: str):
         self._id = int(str_to_timestamp(date))
         self.date = date
@@ -11,3 +14,12 @@ class Menu:
         self.light = light
         self.vegan = vegan
         self.vegetarian = vegetarian
+
+    def to_dict(self) -> Dict:
+        """
+        Converts the menu to a document
+
+        Returns:
+            Dict: Menu document
+        """
+        return {field: getattr(self, field) for field in self.__slots__}
@@ -0,0 +1,204 @@
+import json
+from array import array
+from collections import Counter
+from typing import Dict, Iterator, List, Optional
+import numpy
+import pandas
+from App.Util import DIETS
+from App.Util.constants import RegisterFields
+from App.Util.helpers import str_to_timestamp
+
+# Diet code of the registers without diet
+NO_DIET = -1
+# Documents serialized per JSON chunk
+JSON_CHUNK_SIZE = 1000
+
+
+def pack_bits(values: pandas.Series) -> bytearray:
+    """
+    Packs a column of booleans in a bitmap (8 values per byte)
+
+    Args:
+        values (pandas.Series): Boolean values
+
+    Returns:
+        bytearray: Bitmap, the value i is the bit (i % 8) of the byte (i // 8)
+    """
+    return bytearray(numpy.packbits(values.to_numpy(dtype=bool), bitorder='little').tobytes())
+
+
+def unpack_bits(bitmap: bytearray, count: int) -> List[bool]:
+    """
+    Unpacks a bitmap to a list of booleans
+
+    Args:
+        bitmap (bytearray): Bitmap built by `pack_bits`
+        count (int): Number of values
+
+    Returns:
+        List[bool]: Boolean values
+    """
+    bits = numpy.unpackbits(numpy.frombuffer(bitmap, dtype=numpy.uint8), count=count, bitorder='little')
+    return bits.astype(bool).tolist()
+
+
+class RegisterBatch:
+    """
+    Registers of a catering stored by column in compact typed arrays: every distinct person and date is kept once and
+    each register only stores their codes, the booleans as bitmaps and the diet as its index on DIETS. The documents
+    are built lazily, one by one, when they are iterated
+
+    Args:
+        persons (List): Distinct person names
+        person_codes (array): Index on persons of every register
+        dates (List[str]): Distinct dates
+        date_codes (array): Index on dates of every register
+        requests (bytearray): Request bitmap
+        attends (bytearray): Attend bitmap
+        diet_codes (array): Index on DIETS of every register (NO_DIET if the register has no diet)
+        extras (Optional[bytearray]): Extra meals bitmap, only for lunch registers
+
+    Attributes:
+        persons (List): Distinct person names
+        person_codes (array): Index on persons of every register
+        dates (List[str]): Distinct dates
+        date_codes (array): Index on dates of every register
+        requests (bytearray): Request bitmap
+        attends (bytearray): Attend bitmap
+        diet_codes (array): Index on DIETS of every register (NO_DIET if the register has no diet)
+        extras (Optional[bytearray]): Extra meals bitmap, only for lunch registers
+        timestamps (array): Timestamp of every distinct date
+    """
+    __slots__ = ('persons', 'person_codes', 'dates', 'date_codes', 'requests', 'attends', 'diet_codes', 'extras',
+                 'timestamps')
+
+    def __init__(self, persons: List, person_codes: array, dates: List[str], date_codes: array, requests: bytearray,
+                 attends: bytearray, diet_codes: array, extras: Optional[bytearray] = None):
+        self.persons = persons
+        self.person_codes = person_codes
+        self.dates = dates
+        self.date_codes = date_codes
+        self.requests = requests
+        self.attends = attends
+        self.diet_codes = diet_codes
+        self.extras = extras
+        # Only one timestamp conversion per day instead of one per register
+        self.timestamps = array('q', [str_to_timestamp(date) for date in dates])
+
+    @classmethod
+    def from_frame(cls, df: pandas.DataFrame, with_extra: bool) -> 'RegisterBatch':
+        """
+        Builds a batch from a registers dataframe, validating the diets by column
+
+        Args:
+            df (pandas.DataFrame): Registers dataframe with the person, date, request, attend and diet columns (and
+                extra for lunch registers)
+            with_extra (bool): Keep the extra field (lunch registers)
+
+        Returns:
+            RegisterBatch: Batch of registers
+
+        Raises:
+            Exception: If there is an invalid diet
+        """
+        diets = df[RegisterFields.DIET]
+        invalid_diets = diets[diets.notna() & ~diets.isin(['', *DIETS])]
+        if len(invalid_diets) > 0:
+            raise Exception(f"'{invalid_diets.iloc[0]}' is an invalid diet. Please use a valid diet: {DIETS}.")
+        diet_codes = diets.map({diet: code for code, diet in enumerate(DIETS)}).fillna(NO_DIET).astype(int)
+
+        person_codes, persons = pandas.factorize(df[RegisterFields.PERSON])
+        date_codes, dates = pandas.factorize(df[RegisterFields.DATE])
+        return cls(persons=persons.tolist(), person_codes=array('l', person_codes.tolist()), dates=dates.tolist(),
+                   date_codes=array('l', date_codes.tolist()), requests=pack_bits(df[RegisterFields.REQUEST]),
+                   attends=pack_bits(df[RegisterFields.ATTEND]), diet_codes=array('b', diet_codes.tolist()),
+                   extras=pack_bits(df[RegisterFields.EXTRA]) if with_extra else None)
+
+    def __len__(self) -> int:
+        return len(self.person_codes)
+
+    def get_dates(self) -> List[str]:
+        """
+        Gets the distinct dates of the registers
+
+        Returns:
+            List[str]: Dates
+        """
+        return list(self.dates)
+
+    def count_by_date(self) -> Dict[str, int]:
+        """
+        Counts the registers of every date
+
+        Returns:
+            Dict[str, int]: Number of registers by date
+        """
+        return {self.dates[date_code]: count for date_code, count in Counter(self.date_codes).items()}
+
+    def iter_documents(self) -> Iterator[Dict]:
+        """
+        Builds the register documents lazily, they are the same as the ones of `to_dict` over the register instances
+
+        Returns:
+            Iterator[Dict]: Register documents ready to insert
+        """
+        count = len(self)
+        person_keys = [str(person).strip().replace(' ', '_') for person in self.persons]
+        diets = [*DIETS, None]  # NO_DIET (-1) is the last one
+        requests = unpack_bits(self.requests, count)
+        attends = unpack_bits(self.attends, count)
+        extras = unpack_bits(self.extras, count) if self.extras is not None else None
+        for idx, (person_code, date_code, diet_code) in enumerate(zip(self.person_codes, self.date_codes,
+                                                                      self.diet_codes)):
+            document = {
+                '_id': f"{self.timestamps[date_code]}-{person_keys[person_code]}",
+                RegisterFields.PERSON: self.persons[person_code],
+                RegisterFields.DATE: self.dates[date_code],
+                RegisterFields.REQUEST: requests[idx],
+                RegisterFields.ATTEND: attends[idx],
+                RegisterFields.DIET: diets[diet_code]
+            }
+            if extras is not None:
+                document[RegisterFields.EXTRA] = extras[idx]
+            yield document
+
+    def iter_json(self) -> Iterator[str]:
+        """
+        Serializes the register documents lazily as a JSON array, in chunks of JSON_CHUNK_SIZE documents
+
+        Returns:
+            Iterator[str]: Chunks of the JSON array
+        """
+        chunk: List[str] = []
+        separator = '['
+        for document in self.iter_documents():
+            chunk.append(json.dumps(document))
+            if len(chunk) == JSON_CHUNK_SIZE:
+                yield separator + ', '.join(chunk)
+                separator, chunk = ', ', []
+        if chunk:
+            yield separator + ', '.join(chunk)
+            separator = ', '
+        yield '[]' if separator == '[' else ']'
+
+
+def iter_batches_json(batches: Dict[str, RegisterBatch], extra: Optional[Dict] = None) -> Iterator[str]:
+    """
+    Serializes register batches by catering lazily as a JSON object
+
+    Args:
+        batches (Dict[str, RegisterBatch]): Register batches by catering
+        extra (Optional[Dict]): Other members of the object, serialized after the batches
+
+    Returns:
+        Iterator[str]: Chunks of the JSON object
+    """
+    separator = '{'
+    for catering, batch in batches.items():
+        yield f"{separator}{json.dumps(catering)}: "
+        yield from batch.iter_json()
+        separator = ', '
+    for key, value in (extra or dict()).items():
+        yield f"{separator}{json.dumps(key)}: {json.dumps(value)}"
+        separator = ', '
+    yield '}' if separator == ', ' else '{}'
@@ -0,0 +1,230 @@
+import os
+import json
+import time
+import uuid
+import shutil
+from typing import Any, Dict, List, Optional
+from termcolor import cprint
+from App.Util.helpers import save_object_to_pkl_file
+
+COLOR = 'yellow'
+MANIFEST_FILE = 'manifest.json'
+VERSIONS_FOLDER = 'versions'
+
+
+class ArtifactNames:
+    BOW = 'bow.pkl'
+    MODEL = 'model.pkl'
+
+
+class Pointers:
+    # Version served to the predictions, it always has a BoW model and the prediction model trained with it
+    CURRENT = 'current'
+    # Newest BoW model, used by the next training dataset build
+    LATEST = 'latest'
+    # Version of the BoW model used by the last training dataset build
+    DATASET = 'dataset'
+
+
+class ArtifactStore:
+    """
+    Versioned store of the BoW and prediction models of every catering. Every version is a folder that never changes
+    once it is published: it is written on a temporary folder and then renamed, and the pointers to the versions are
+    files replaced atomically, so a reader always gets a complete BoW model and the prediction model trained with it.
+
+    Layout of a catering folder:
+        versions/<version>/bow.pkl, model.pkl and manifest.json
+        current.json, latest.json and dataset.json (pointers, see `Pointers`)
+
+    Args:
+        root_path (str): Folder of the artifacts of all the caterings
+        versions_kept (int): Number of complete versions (with a prediction model) kept for rollbacks
+
+    Attributes:
+        root_path (str): Folder of the artifacts of all the caterings
+        versions_kept (int): Number of complete versions (with a prediction model) kept for rollbacks
+    """
+
+    def __init__(self, root_path: str, versions_kept: int):
+        self.root_path = root_path
+        self.versions_kept = versions_kept
+
+    def get_catering_path(self, catering: str) -> str:
+        return os.path.join(self.root_path, catering)
+
+    def get_version_path(self, catering: str, version: str) -> str:
+        return os.path.join(self.get_catering_path(catering), VERSIONS_FOLDER, version)
+
+    def get_artifact_path(self, catering: str, version: str, name: str) -> str:
+        return os.path.join(self.get_version_path(catering, version), name)
+
+    def read_pointer(self, catering: str, pointer: str) -> Optional[str]:
+        """
+        Gets the version referenced by a pointer
+
+        Args:
+            catering (str): A valid catering
+            pointer (str): Pointer name, see `Pointers`
+
+        Returns:
+            Optional[str]: Version, None if the pointer was never written
+        """
+        try:
+            with open(os.path.join(self.get_catering_path(catering), f'{pointer}.json')) as f:
+                return json.load(f)['version']
+        except FileNotFoundError:
+            return None
+
+    def write_pointer(self, catering: str, pointer: str, version: str) -> None:
+        """
+        Points a pointer to a version, replacing the pointer file atomically
+
+        Args:
+            catering (str): A valid catering
+            pointer (str): Pointer name, see `Pointers`
+            version (str): Version
+
+        Returns:
+            None
+        """
+        pointer_path = os.path.join(self.get_catering_path(catering), f'{pointer}.json')
+        temp_path = f'{pointer_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump({'version': version, 'updated_at': time.time()}, f)
+        os.replace(temp_path, pointer_path)
+
+    def read_manifest(self, catering: str, version: str) -> Dict:
+        """
+        Gets the manifest of a version
+
+        Args:
+            catering (str): A valid catering
+            version (str): Version
+
+        Returns:
+            Dict: Manifest of the version
+
+        Raises:
+            Exception: If the version does not exist
+        """
+        manifest_path = self.get_artifact_path(catering, version, MANIFEST_FILE)
+        if not os.path.isfile(manifest_path):
+            raise Exception(f"Version '{version}' of the {catering} models does not exist.")
+        with open(manifest_path) as f:
+            return json.load(f)
+
+    def create_version(self, catering: str, objects: Dict[str, Any], linked_files: Dict[str, str],
+                       manifest: Dict) -> str:
+        """
+        Publishes a new version with the given artifacts
+
+        Args:
+            catering (str): A valid catering
+            objects (Dict[str, Any]): Objects to save on the version by artifact name
+            linked_files (Dict[str, str]): Existing files to add to the version by artifact name, they are hard
+                linked (or copied if it is not possible) since the versions never change
+            manifest (Dict): Information about the version to save on its manifest
+
+        Returns:
+            str: New version
+        """
+        version = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        versions_path = os.path.join(self.get_catering_path(catering), VERSIONS_FOLDER)
+        temp_path = os.path.join(versions_path, f'.{version}.tmp')
+        os.makedirs(temp_path)
+        try:
+            for name, obj in objects.items():
+                save_object_to_pkl_file(obj, os.path.join(temp_path, name))
+            for name, source_path in linked_files.items():
+                try:
+                    os.link(source_path, os.path.join(temp_path, name))
+                except OSError:
+                    shutil.copy2(source_path, os.path.join(temp_path, name))
+            manifest = {**manifest, 'version': version, 'catering': catering, 'created_at': time.time(),
+                        'artifacts': sorted([*objects.keys(), *linked_files.keys()])}
+            with open(os.path.join(temp_path, MANIFEST_FILE), 'w') as f:
+                json.dump(manifest, f, indent=2, default=str)
+            # Published with an atomic rename, a reader never sees a partial version
+            os.rename(temp_path, os.path.join(versions_path, version))
+        except Exception as e:
+            shutil.rmtree(temp_path, ignore_errors=True)
+            raise e
+        cprint(f"Published version {version} of the {catering} models with {manifest['artifacts']}", COLOR)
+        return version
+
+    def list_versions(self, catering: str) -> List[Dict]:
+        """
+        Gets the manifests of the versions of a catering, from the newest to the oldest. The versions without
+        manifest are skipped
+
+        Args:
+            catering (str): A valid catering
+
+        Returns:
+            List[Dict]: Manifests of the versions
+        """
+        versions_path = os.path.join(self.get_catering_path(catering), VERSIONS_FOLDER)
+        if not os.path.isdir(versions_path):
+            return []
+        manifests: List[Dict] = []
+        for version in os.listdir(versions_path):
+            if version.startswith('.'):
+                continue
+            try:
+                with open(self.get_artifact_path(catering, version, MANIFEST_FILE)) as f:
+                    manifests.append(json.load(f))
+            except FileNotFoundError:
+                # A version without manifest (i.e. removed while it is listed) is not a version to serve
+                continue
+        return sorted(manifests, key=lambda manifest: manifest['created_at'], reverse=True)
+
+    def prune(self, catering: str) -> None:
+        """
+        Removes the versions that are not referenced by any pointer, keeping the newest `versions_kept` complete
+        versions for rollbacks
+
+        Args:
+            catering (str): A valid catering
+
+        Returns:
+            None
+        """
+        referenced = {self.read_pointer(catering, pointer) for pointer in (Pointers.CURRENT, Pointers.LATEST,
+                                                                          Pointers.DATASET)}
+        complete = [manifest['version'] for manifest in self.list_versions(catering)
+                    if ArtifactNames.MODEL in manifest['artifacts']]
+        kept = referenced | set(complete[:self.versions_kept])
+        for manifest in self.list_versions(catering):
+            if manifest['version'] not in kept:
+                shutil.rmtree(self.get_version_path(catering, manifest['version']), ignore_errors=True)
+                cprint(f"Removed version {manifest['version']} of the {catering} models", COLOR)
+
+    def rollback(self, catering: str, version: Optional[str] = None) -> str:
+        """
+        Serves a previous complete version
+
+        Args:
+            catering (str): A valid catering
+            version (Optional[str]): Version to serve, the complete version published before the current one if it
+                is None
+
+        Returns:
+            str: Version served
+
+        Raises:
+            Exception: If the version does not exist or has no prediction model
+        """
+        current = self.read_pointer(catering, Pointers.CURRENT)
+        complete = [manifest for manifest in self.list_versions(catering)
+                    if ArtifactNames.MODEL in manifest['artifacts']]
+        if version is None:
+            current_idx = next((idx for idx, manifest in enumerate(complete) if manifest['version'] == current), None)
+            previous = complete[current_idx + 1:] if current_idx is not None else []
+            if len(previous) == 0:
+                raise Exception(f"There is no previous version of the {catering} models to roll back to.")
+            version = previous[0]['version']
+        elif ArtifactNames.MODEL not in self.read_manifest(catering, version)['artifacts']:
+            raise Exception(f"Version '{version}' of the {catering} models has no prediction model.")
+        self.write_pointer(catering, Pointers.CURRENT, version)
+        cprint(f"Serving version {version} of the {catering} models (it was {current})", COLOR)
+        return version
@@ -1,26 +1,36 @@
 import pandas
-from typing import Dict, List
-from App.Util.constants import CATERINGS, NUM_DAYS_SERVICE, NO_SERVICE_TAGS, MenuFields
+from typing import IO, Dict, List, Union
+from App.Util.constants import CATERINGS, DIETS, NO_SERVICE_TAGS, MenuFields
 from App.Models import Menu
 
+# Value of the catering column on the header row of every week block (the row above it contains the dates)
+EVENT_TAG = 'event'
+BLOCK = 'block'
+POSITION = 'position'
+CATERING = 'catering'
+DIET = 'diet'
+DISH = 'dish'
+NO_SERVICE = 'no_service'
+
 
 class MenuTransformer:
     """
-    MenuTransformer class to extract menus from raw text
+    MenuTransformer class to extract menus from raw text. The file can contain many week blocks, each of them made by
+    a row with the dates, a header row (Event, Diet, day names) and a row for every catering and diet
 
     Args:
-        full_path_file (str): Full path of the file to extract the sample_data
+        file (Union[str, IO[bytes]]): Path or binary file object to extract the sample_data
         catering_col_idx (int): Catering index column
         diet_col_idx (int): Diet index column
 
     Attributes:
-        full_path_file (str): Full path of the file to extract the sample_data
+        file (Union[str, IO[bytes]]): Path or binary file object to extract the sample_data
         catering_col_idx (int): Catering index column
         diet_col_idx (int): Diet index column
     """
 
-    def __init__(self, full_path_file: str, catering_col_idx: int = 0, diet_col_idx: int = 1):
-        self.full_path_file = full_path_file
+    def __init__(self, file: Union[str, IO[bytes]], catering_col_idx: int = 0, diet_col_idx: int = 1):
+        self.file = file
         self.catering_col_idx = catering_col_idx
         self.diet_col_idx = diet_col_idx
 
@@ -34,41 +44,73 @@ class MenuTransformer:
         Returns:
             Dict[str, List[Menu]]: Dictionary containing the sample_data extracted by catering
         """
-        df = pandas.read_csv(self.full_path_file, sep=separator)
-        menus: Dict[str, List[Menu]] = {catering: self.__get_menus_by_catering(df, catering) for catering in CATERINGS}
+        df = pandas.read_csv(self.file, sep=separator, header=None, dtype=str)
+        df_menus = self.__get_menus_frame(df)
+        menus: Dict[str, List[Menu]] = {
+            catering: self.__frame_to_menus(df_menus[df_menus[CATERING] == catering]) for catering in CATERINGS}
         return menus
 
-    def __get_menus_by_catering(self, df: pandas.DataFrame, catering: str) -> List[Menu]:
+    def __get_menus_frame(self, df: pandas.DataFrame) -> pandas.DataFrame:
+        """
+        Reshapes the raw sample_data to one row per catering and day, with a column per diet
+
+        Args:
+            df (pandas.DataFrame): Raw sample_data without header
+
+        Returns:
+            pandas.DataFrame: Catering, date, day, is_service_day and the dish of every diet, sorted as in the file
+        """
+        caterings = df.iloc[:, self.catering_col_idx].str.strip().str.lower()
+        is_header = caterings == EVENT_TAG
+        if not is_header.any():
+            raise IndexError("No header row was found on the menu file.")
+        day_cols = df.columns[max(self.catering_col_idx, self.diet_col_idx) + 1:]
+
+        # Every header row starts a week block, the dates are on the row above it
+        blocks = is_header.cumsum()
+        header_idx = df.index[is_header]
+        header_blocks = {BLOCK: blocks[header_idx].tolist()}
+        df_days = df.loc[header_idx, day_cols].assign(**header_blocks)
+        df_dates = df.loc[header_idx - 1, day_cols].assign(**header_blocks)
+        df_calendar = df_days.melt(id_vars=BLOCK, var_name=POSITION, value_name=MenuFields.DAY).merge(
+            df_dates.melt(id_vars=BLOCK, var_name=POSITION, value_name=MenuFields.DATE), on=[BLOCK, POSITION])
+        df_calendar = df_calendar.dropna(subset=[MenuFields.DATE])
+        df_calendar[MenuFields.DATE] = df_calendar[MenuFields.DATE].str.strip()
+        df_calendar[MenuFields.DAY] = df_calendar[MenuFields.DAY].str.strip().str.lower()
+
+        # One row per catering, diet and day, normalizing whole columns at once
+        is_record = caterings.isin(CATERINGS) & (blocks > 0)
+        df_records = df.loc[is_record, day_cols].assign(**{
+            BLOCK: blocks[is_record], CATERING: caterings[is_record],
+            DIET: df.loc[is_record].iloc[:, self.diet_col_idx].str.strip().str.lower()})
+        df_records = df_records.melt(id_vars=[BLOCK, CATERING, DIET], var_name=POSITION, value_name=DISH)
+        df_records = df_records.merge(df_calendar, on=[BLOCK, POSITION], how='inner')
+        df_records[DISH] = df_records[DISH].str.strip().str.lower()
+        df_records[NO_SERVICE] = df_records[DISH].isin(NO_SERVICE_TAGS)
+        df_records[DISH] = df_records[DISH].where(df_records[DISH].notna() & ~df_records[NO_SERVICE], None)
+
+        # A day is a service day unless every diet of the menu has a no-service tag
+        keys = [CATERING, BLOCK, POSITION, MenuFields.DATE, MenuFields.DAY]
+        df_records = df_records[df_records[DIET].isin(DIETS)].drop_duplicates(subset=[*keys, DIET], keep='last')
+        is_service_day = (~df_records.groupby(keys)[NO_SERVICE].all()).rename(MenuFields.IS_SERVICE_DAY)
+        df_menus = df_records.pivot(index=keys, columns=DIET, values=DISH).reindex(columns=DIETS)
+        df_menus = df_menus.join(is_service_day).reset_index().sort_values(by=[BLOCK, POSITION], kind='stable')
+        return df_menus.astype(object).where(df_menus.notna(), None)
+
+    @staticmethod
+    def __frame_to_menus(df: pandas.DataFrame) -> List[Menu]:
         """
-        Transforms the raw sample_data to a list of Menus
+        Transforms the reshaped sample_data of a catering to a list of Menus
 
         Args:
-            df (pandas.DataFrame): Raw sample_data
-            catering (str): Catering to extract the sample_data
+            df (pandas.DataFrame): Reshaped sample_data of a catering
 
         Returns:
             List[Menu]: List of menus
         """
-        days_columns = df.columns[-NUM_DAYS_SERVICE:].tolist()
-        same_catering_diet_indexes = df.index[df.iloc[:, self.catering_col_idx].str.lower() == catering].tolist()
-
-        records_catering: List[Menu] = []
-        for day_column in days_columns:
-            record: Dict[str, str] = dict()
-            record[MenuFields.DATE] = df.loc[0, day_column]
-            record[MenuFields.DAY] = day_column.lower()
-
-            for row_idx in same_catering_diet_indexes:
-                diet: str = df.iloc[row_idx, self.diet_col_idx].strip().lower()
-                dish: str = df.loc[row_idx, day_column].strip().lower()
-
-                record[MenuFields.IS_SERVICE_DAY] = dish not in NO_SERVICE_TAGS
-                record[diet] = dish if record[MenuFields.IS_SERVICE_DAY] else None
-
-            menu_catering = Menu(date=record[MenuFields.DATE], day=record[MenuFields.DAY],
-                                 is_service_day=record[MenuFields.IS_SERVICE_DAY],
-                                 regular=record[MenuFields.REGULAR], light=record[MenuFields.LIGHT],
-                                 vegan=record[MenuFields.VEGAN],
-                                 vegetarian=record[MenuFields.VEGETARIAN])
-            records_catering.append(menu_catering)
-        return records_catering
+        fields = [MenuFields.DATE, MenuFields.DAY, MenuFields.IS_SERVICE_DAY, MenuFields.REGULAR, MenuFields.LIGHT,
+                  MenuFields.VEGAN, MenuFields.VEGETARIAN]
+        return [Menu(date=date, day=day, is_service_day=is_service_day, regular=regular, light=light, vegan=vegan,
+                     vegetarian=vegetarian)
+                for date, day, is_service_day, regular, light, vegan, vegetarian in
+                zip(*[df[field].tolist() for field in fields])]
@@ -1,59 +1,327 @@
+import os
+import shutil
 import pandas
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from termcolor import cprint
-from typing import Dict, List
-from App.Util.constants import NO_SERVICE_TAGS, EXTRA_TAG, COLOR_BREAKFAST, COLOR_LUNCH, DIETS, BREAKFAST, LUNCH, \
+from typing import IO, Dict, List, Optional, Tuple, Union
+from App.Util.constants import NO_SERVICE_TAGS, EXTRA_TAG, COLOR_BREAKFAST, DIETS, BREAKFAST, LUNCH, \
     RegisterFields
-from App.Models import BreakfastRegister, LunchRegister, AbstractRegister
+from App.Models import RegisterBatch
 from App.Util.helpers import datetime_to_str
 
 INDEX_START = 1
+# Levels of the sheet diagnostics and their log colors
+REPORT_WARNING = 'warning'
+REPORT_SKIPPED = 'skipped'
+REPORT_COLORS = {REPORT_WARNING: 'yellow', REPORT_SKIPPED: 'red'}
 
+_sheet_pool: Optional[ProcessPoolExecutor] = None
+_sheet_pool_workers = 0
+_sheet_pool_lock = threading.Lock()
 
-def df_to_breakfast_register(df: pandas.DataFrame) -> List[BreakfastRegister]:
+
+def df_to_register_batch(df: pandas.DataFrame, with_extra: bool) -> RegisterBatch:
     """
-    Transforms a dataframe to a list of breakfast registers
+    Transforms a dataframe to a batch of registers, computing the ids, timestamps and diet validation by column
+    instead of building a register instance per row
 
     Args:
-        df (pandas.DataFrame): Registers dataframe to transform to a list of breakfast registers
+        df (pandas.DataFrame): Registers dataframe to transform
+        with_extra (bool): Keep the extra field (lunch registers)
 
     Returns:
-        List[BreakfastRegister]: List of registers
+        RegisterBatch: Batch of registers
+
+    Raises:
+        Exception: If there is an invalid diet
     """
-    return [
-        BreakfastRegister(date=row[RegisterFields.DATE], person=row[RegisterFields.PERSON],
-                          request=row[RegisterFields.REQUEST], attend=row[RegisterFields.ATTEND],
-                          diet=row[RegisterFields.DIET])
-        for _, row in df.iterrows()]
+    return RegisterBatch.from_frame(df, with_extra)
 
 
-def df_to_lunch_register(df: pandas.DataFrame) -> List[LunchRegister]:
+def remove_extra_tag(diet: str) -> str:
     """
-    Transforms a dataframe to a list of lunch registers
+    Keeps the fist word given a text, i.e. "regular + extras" -> "regular"
 
     Args:
-        df (pandas.DataFrame): Registers dataframe to transform to a list of lunch registers
+        diet (str): Text to keep the first word
 
     Returns:
-        List[LunchRegister]: List of registers
+        str: First word
     """
-    return [
-        LunchRegister(date=row[RegisterFields.DATE], person=row[RegisterFields.PERSON],
-                      request=row[RegisterFields.REQUEST], attend=row[RegisterFields.ATTEND],
-                      diet=row[RegisterFields.DIET], extra=row[RegisterFields.EXTRA]) for _, row in df.iterrows()]
+    diet_extra = diet.split()
+    return diet if len(diet_extra) == 0 else diet_extra[0]
 
 
-def remove_extra_tag(diet: str) -> str:
+def get_unique_column_names(header: Tuple) -> List:
     """
-    Keeps the fist word given a text, i.e. "regular + extras" -> "regular"
+    Names the columns of a worksheet header as pandas does: empty cells as 'Unnamed: <idx>' and repeated names with a
+    '.<count>' suffix
 
     Args:
-        diet (str): Text to keep the first word
+        header (Tuple): Values of the first row
 
     Returns:
-        str: First word
+        List: Column names
     """
-    diet_extra = diet.split()
-    return diet if len(diet_extra) == 0 else diet_extra[0]
+    col_names: List = []
+    counts: Dict = dict()
+    for idx, value in enumerate(header):
+        name = f'Unnamed: {idx}' if value is None else value
+        if name in counts:
+            counts[name] += 1
+            name = f'{name}.{counts[name]}'
+        else:
+            counts[name] = 0
+        col_names.append(name)
+    return col_names
+
+
+def worksheet_to_frame(worksheet) -> pandas.DataFrame:
+    """
+    Reads the rows of a worksheet opened with the openpyxl read-only parser as pandas does: empty cells as None,
+    without the trailing empty cells and rows, and the first row as header
+
+    Args:
+        worksheet (ReadOnlyWorksheet): Worksheet to read
+
+    Returns:
+        pandas.DataFrame: Sheet data
+    """
+    rows: List[List] = []
+    for row in worksheet.iter_rows(values_only=True):
+        values = [None if value == '' else value for value in row]
+        while values and values[-1] is None:
+            values.pop()
+        rows.append(values)
+    while rows and not rows[-1]:
+        rows.pop()
+    if not rows:
+        return pandas.DataFrame()
+    num_cols = max(len(values) for values in rows)
+    rows = [values + [None] * (num_cols - len(values)) for values in rows]
+    return pandas.DataFrame(rows[1:], columns=get_unique_column_names(tuple(rows[0])))
+
+
+def read_workbook_streaming(file: Union[str, IO[bytes]], sheets: Optional[List[str]] = None) \
+        -> Dict[str, pandas.DataFrame]:
+    """
+    Reads the sheets of a workbook with the openpyxl read-only parser, which streams the rows instead of loading
+    the whole document tree (useful for very large files) and only parses the sheets that are read
+
+    Args:
+        file (Union[str, IO[bytes]]): Path or binary file object of the workbook
+        sheets (Optional[List[str]]): Names of the sheets to read, all of them if it is None
+
+    Returns:
+        Dict[str, pandas.DataFrame]: Sheet name and its data (the first row is used as header)
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        names = workbook.sheetnames if sheets is None else sheets
+        return {name: worksheet_to_frame(workbook[name]) for name in names}
+    finally:
+        workbook.close()
+
+
+def get_sheet_names(file: Union[str, IO[bytes]]) -> List[str]:
+    """
+    Gets the sheet names of a workbook without parsing its sheets
+
+    Args:
+        file (Union[str, IO[bytes]]): Path or binary file object of the workbook
+
+    Returns:
+        List[str]: Sheet names, in workbook order
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def extract_sheet_registers(df: pandas.DataFrame, cols_idx: List[int], check_extra_meals: bool) -> pandas.DataFrame:
+    """
+    Extracts the registers of a catering (breakfast or lunch) from a service day sheet
+
+    Args:
+        df (pandas.DataFrame): Sheet data
+        cols_idx (List[int]): Column indexes to get the sample_data
+        check_extra_meals (bool): Validate if the register wants extra meals
+
+    Returns:
+        pandas.DataFrame: Registers extracted
+    """
+    df = df.iloc[INDEX_START:, cols_idx]
+
+    # Rename the columns
+    col_names_old = df.columns
+    date_record = col_names_old[0]
+    col_names_new = [RegisterFields.PERSON, RegisterFields.DIET, RegisterFields.ATTEND]
+    col_names_dict = dict(zip(col_names_old, col_names_new))
+    df = df.rename(columns=col_names_dict)
+
+    # Converting to the correct sample_data type
+    df[RegisterFields.REQUEST] = df.loc[:, RegisterFields.DIET].notnull().tolist()
+    df[RegisterFields.DATE] = datetime_to_str(date_record)
+    df[RegisterFields.ATTEND] = df[RegisterFields.ATTEND].fillna(False).astype('bool')
+
+    # Keep sample_data that is not empty on PERSON column
+    df = df[df[RegisterFields.PERSON].notna()]
+
+    # Reset index
+    df.reset_index(drop=True, inplace=True)
+    df = df[[RegisterFields.PERSON, RegisterFields.DATE, RegisterFields.REQUEST, RegisterFields.ATTEND,
+             RegisterFields.DIET]]
+
+    df[RegisterFields.DIET] = df[RegisterFields.DIET].fillna('').str.lower().str.strip()
+    if check_extra_meals:
+        df[RegisterFields.EXTRA] = df[RegisterFields.DIET].str.contains(EXTRA_TAG, regex=False)
+        df[RegisterFields.DIET] = df[RegisterFields.DIET].map(lambda diet: str(diet).replace(EXTRA_TAG, ''))
+    df[RegisterFields.DIET] = df[RegisterFields.DIET].map(remove_extra_tag)
+
+    # Removing not valid diets records
+    valid_diets = ['', *DIETS]
+    df = df[df[RegisterFields.DIET].isin(valid_diets)]
+    # Removing duplicated records and keeping the last
+    return df.drop_duplicates(subset=RegisterFields.PERSON, keep="last")
+
+
+def process_sheet(sheet: str, df: pandas.DataFrame, breakfast_cols_idx: List[int], lunch_cols_idx: List[int]) \
+        -> Tuple[Optional[pandas.DataFrame], Optional[pandas.DataFrame], List[Dict]]:
+    """
+    Extracts the breakfast and lunch registers of a sheet (one day). It is defined at module level so it can be run
+    on a process pool, the diagnostics are returned instead of printed
+
+    Args:
+        sheet (str): Sheet name
+        df (pandas.DataFrame): Sheet data
+        breakfast_cols_idx (List[int]): Column indexes of breakfast registers
+        lunch_cols_idx (List[int]): Column indexes of lunch registers
+
+    Returns:
+        Tuple[Optional[pandas.DataFrame], Optional[pandas.DataFrame], List[Dict]]: Breakfast registers, lunch registers
+            (both None if the sheet is not a service day) and diagnostics of the sheet
+    """
+    report: List[Dict] = []
+    for catering, cols_idx in ((BREAKFAST, breakfast_cols_idx), (LUNCH, lunch_cols_idx)):
+        count_attendance = df.iloc[INDEX_START:, cols_idx[-1]].fillna(False).astype('bool').sum()
+        if count_attendance == 0:
+            report.append({'sheet': sheet, 'catering': catering, 'level': REPORT_WARNING,
+                           'message': f"Warning: '{sheet}' sheet does not contain records of attendance"})
+
+    # is_service_day = (df.iloc[0:5, 0].str.lower() == 'holiday').sum() == 0
+    first_rows = list(df.iloc[0:5, 0].str.lower().values)
+    is_service_day = all(record not in NO_SERVICE_TAGS for record in first_rows)
+    if not is_service_day:
+        report.append({'sheet': sheet, 'catering': None, 'level': REPORT_SKIPPED,
+                       'message': f"Skip '{sheet}' sheet because it has one NO_SERVICE_TAGS: {NO_SERVICE_TAGS}"})
+        return None, None, report
+
+    df_breakfast = extract_sheet_registers(df, breakfast_cols_idx, False)
+    df_lunch = extract_sheet_registers(df, lunch_cols_idx, True)
+    return df_breakfast, df_lunch, report
+
+
+def process_workbook_sheets(path: str, sheets: List[str], breakfast_cols_idx: List[int],
+                            lunch_cols_idx: List[int]) \
+        -> List[Tuple[Optional[pandas.DataFrame], Optional[pandas.DataFrame], List[Dict]]]:
+    """
+    Parses a range of sheets of a workbook with the read-only parser and extracts their registers, so every process
+    of the sheet pool opens the workbook once and only parses its own sheets
+
+    Args:
+        path (str): Path of the workbook
+        sheets (List[str]): Names of the sheets of the range
+        breakfast_cols_idx (List[int]): Column indexes of breakfast registers
+        lunch_cols_idx (List[int]): Column indexes of lunch registers
+
+    Returns:
+        List[Tuple[Optional[pandas.DataFrame], Optional[pandas.DataFrame], List[Dict]]]: Result of `process_sheet`
+            for every sheet of the range, in sheet order
+    """
+    frames = read_workbook_streaming(path, sheets)
+    return [process_sheet(sheet, frames[sheet], breakfast_cols_idx, lunch_cols_idx) for sheet in sheets]
+
+
+def split_sheet_ranges(sheets: List[str], count: int) -> List[List[str]]:
+    """
+    Splits the sheets of a workbook into consecutive ranges of similar size
+
+    Args:
+        sheets (List[str]): Sheet names, in workbook order
+        count (int): Number of ranges
+
+    Returns:
+        List[List[str]]: Ranges of sheets, in workbook order
+    """
+    size, remainder = divmod(len(sheets), count)
+    ranges: List[List[str]] = []
+    start = 0
+    for idx in range(count):
+        end = start + size + (1 if idx < remainder else 0)
+        ranges.append(sheets[start:end])
+        start = end
+    return ranges
+
+
+def get_pool_context() -> multiprocessing.context.BaseContext:
+    """
+    Gets the start method of the sheet pool processes. They are not forked from the request process: a fork of a
+    multi-threaded worker may copy a lock held by another thread and deadlock, so the forkserver (a clean
+    single-threaded process) is used where it is available and spawn otherwise
+
+    Args:
+        None
+
+    Returns:
+        multiprocessing.context.BaseContext: Context of the start method
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def get_sheet_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Gets the process pool shared by the uploads to extract the sheets of the register workbooks, it is started on
+    the first use (and again if more workers are needed)
+
+    Args:
+        workers (int): Number of processes needed
+
+    Returns:
+        ProcessPoolExecutor: Process pool for the sheets
+    """
+    global _sheet_pool, _sheet_pool_workers
+    with _sheet_pool_lock:
+        if _sheet_pool is None or _sheet_pool_workers < workers:
+            if _sheet_pool is not None:
+                _sheet_pool.shutdown(wait=False)
+            _sheet_pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_pool_context())
+            _sheet_pool_workers = workers
+        return _sheet_pool
+
+
+def merge_sheet_registers(frames: List[pandas.DataFrame]) -> pandas.DataFrame:
+    """
+    Merges the registers of every sheet sorted by date, the sheet order is kept within a date
+
+    Args:
+        frames (List[pandas.DataFrame]): Registers of every sheet, in sheet order
+
+    Returns:
+        pandas.DataFrame: Registers merged
+    """
+    df = pandas.concat(frames, ignore_index=True, axis=0)
+    df.sort_values(by=[RegisterFields.DATE], ascending=True, inplace=True, kind='stable')
+    return df.reset_index(drop=True)
 
 
 class RegisterTransformer:
@@ -61,106 +329,162 @@ class RegisterTransformer:
     RegisterTransformer class to extract people registers from raw text
 
     Args:
-        full_path_file (str): Full path of the file to extract the sample_data
+        file (Union[str, IO[bytes]]): Path or binary file object to extract the sample_data
         breakfast_cols_idx (List[int]): Column indexes of breakfast registers
         lunch_cols_idx (List[int]): Column indexes of lunch registers
+        streaming (bool): Use the streaming read-only parser (for very large files)
+        workers (int): Number of processes of the shared sheet pool (each one parses its own sheet), the sheets are
+            extracted on the current process if it is 1
 
     Attributes:
-        full_path_file (str): Full path of the file to extract the sample_data
+        file (Union[str, IO[bytes]]): Path or binary file object to extract the sample_data
         breakfast_cols_idx (List[int]): Column indexes of breakfast registers
         lunch_cols_idx (List[int]): Column indexes of lunch registers
+        streaming (bool): Use the streaming read-only parser (for very large files)
+        workers (int): Number of processes of the shared sheet pool (each one parses its own sheet), the sheets are
+            extracted on the current process if it is 1
+        report (List[Dict]): Diagnostics of the sheets extracted by the last build
     """
 
-    def __init__(self, full_path_file: str, breakfast_cols_idx: List[int] = [0, 1, 2],
-                 lunch_cols_idx: List[int] = [0, 4, 5]):
-        self.full_path_file = full_path_file
+    def __init__(self, file: Union[str, IO[bytes]], breakfast_cols_idx: List[int] = [0, 1, 2],
+                 lunch_cols_idx: List[int] = [0, 4, 5], streaming: bool = False, workers: int = 1):
+        self.file = file
         self.breakfast_cols_idx = breakfast_cols_idx
         self.lunch_cols_idx = lunch_cols_idx
+        self.streaming = streaming
+        self.workers = workers
+        self.report: List[Dict] = []
+
+    def get_file_name(self) -> str:
+        """
+        Gets the name of the file to extract the sample_data
+
+        Args:
+            None
+
+        Returns:
+            str: File path, or file object name (if it has one)
+        """
+        return self.file if isinstance(self.file, str) else str(getattr(self.file, 'name', 'in-memory file'))
+
+    def build_batches(self) -> Dict[str, RegisterBatch]:
+        """
+        Extracts the sample_data from the file provided on the constructor as compact register batches
+
+        Args:
+            None
+
+        Returns:
+            Dict[str, RegisterBatch]: Register batches by catering
+        """
+        df_breakfast, df_lunch = self.__build_frames()
+        return {BREAKFAST: df_to_register_batch(df_breakfast, False), LUNCH: df_to_register_batch(df_lunch, True)}
+
+    def __build_frames(self) -> Tuple[pandas.DataFrame, pandas.DataFrame]:
+        """
+        Extracts the breakfast and lunch registers of every sheet
+
+        Args:
+            None
+
+        Returns:
+            Tuple[pandas.DataFrame, pandas.DataFrame]: Breakfast and lunch registers
+        """
+        # Every sheet is parsed only once, both caterings are taken from the same frames
+        cprint('Extracting Breakfast and Lunch sample_data.', COLOR_BREAKFAST)
+        results = self.__process_sheets() if self.workers > 1 else self.__process_sheets_serial()
+
+        self.report = [entry for _, _, sheet_report in results for entry in sheet_report]
+        for entry in self.report:
+            cprint(entry['message'], REPORT_COLORS[entry['level']])
+        df_breakfast = merge_sheet_registers([df for df, _, _ in results if df is not None])
+        df_lunch = merge_sheet_registers([df for _, df, _ in results if df is not None])
+        return df_breakfast, df_lunch
+
+    def __read_sheets(self) -> Dict[str, pandas.DataFrame]:
+        """
+        Parses every sheet of the workbook once
+
+        Args:
+            None
 
-    def build(self) -> Dict[str, List[AbstractRegister]]:
+        Returns:
+            Dict[str, pandas.DataFrame]: Sheet name and its data
+        """
+        if self.streaming:
+            cprint(f"Reading '{self.get_file_name()}' with the streaming parser", 'cyan')
+            return read_workbook_streaming(self.file)
+        cprint(f"Reading '{self.get_file_name()}' as ExcelFile", 'cyan')
+        with pandas.ExcelFile(self.file) as xls_file:
+            return {sheet: xls_file.parse(sheet_name=sheet) for sheet in xls_file.sheet_names}
+
+    def __process_sheets_serial(self) -> List[Tuple]:
         """
-        Extracts the sample_data from the file provided on the constructor
+        Parses the workbook and extracts the registers of every sheet on the current process
 
         Args:
             None
 
         Returns:
-            Dict[str, List[AbstractRegister]]: Registers by catering
+            List[Tuple]: Result of `process_sheet` for every sheet, in sheet order
         """
-        cprint('Extracting Breakfast sample_data.', COLOR_BREAKFAST)
-        df_breakfast = self.__extract_data(self.breakfast_cols_idx, False)
-        cprint('Extracting Lunch sample_data.', COLOR_LUNCH)
-        df_lunch = self.__extract_data(self.lunch_cols_idx, True)
+        return [process_sheet(sheet, df, self.breakfast_cols_idx, self.lunch_cols_idx)
+                for sheet, df in self.__read_sheets().items()]
 
-        registers: Dict[str, List[AbstractRegister]] = {
-            BREAKFAST: df_to_breakfast_register(df_breakfast),
-            LUNCH: df_to_breakfast_register(df_lunch)
-        }
-        return registers
+    def __process_sheets(self) -> List[Tuple]:
+        """
+        Extracts the registers of every sheet on the shared sheet pool. The sheets are split into one range per
+        process, and only the path of the workbook and the sheet range are sent to each one, which parses its own
+        sheets with the read-only parser. A file object is spooled to a temporary file first
 
-    def __extract_data(self, cols_idx: List[int], check_extra_meals: bool) -> pandas.DataFrame:
+        Args:
+            None
+
+        Returns:
+            List[Tuple]: Result of `process_sheet` for every sheet, in sheet order
         """
-        Extracts the sample_data bny catering (breakfast or lunch)
+        names = get_sheet_names(self.file)
+        workers = min(self.workers, len(names))
+        if not isinstance(self.file, str):
+            self.file.seek(0)
+        if workers <= 1:
+            return self.__process_sheets_serial()
+        if isinstance(self.file, str):
+            return self.__process_sheet_ranges(self.file, names, workers)
+        with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as spool_file:
+            shutil.copyfileobj(self.file, spool_file)
+        try:
+            return self.__process_sheet_ranges(spool_file.name, names, workers)
+        finally:
+            os.remove(spool_file.name)
+
+    def __process_sheet_ranges(self, path: str, names: List[str], workers: int) -> List[Tuple]:
+        """
+        Extracts the registers of every sheet of a workbook on disk on the shared sheet pool, a range of sheets per
+        process
 
         Args:
-            cols_idx (List[int]): Column indexes to get the sample_data
-            check_extra_meals (bool): Validate if the register wants extra meals
+            path (str): Path of the workbook
+            names (List[str]): Sheet names, in workbook order
+            workers (int): Number of processes
 
         Returns:
-            pandas.DataFrame: Registers extracted
-        """
-        cprint(f"Reading '{self.full_path_file}' as ExcelFile", 'cyan')
-        xls_file = pandas.ExcelFile(self.full_path_file)
-        sheets = xls_file.sheet_names
-        frames: List[pandas.DataFrame] = []
-        for sheet in sheets:
-            df = pandas.read_excel(self.full_path_file, sheet_name=sheet)
-
-            # is_service_day = (df.iloc[0:5, 0].str.lower() == 'holiday').sum() == 0
-            first_rows = list(df.iloc[0:5, 0].str.lower().values)
-            is_service_day = all(record not in NO_SERVICE_TAGS for record in first_rows)
-
-            count_attendance = df.iloc[INDEX_START:, cols_idx[-1]].fillna(False).astype('bool').sum()
-            if count_attendance == 0:
-                cprint(f"Warning: '{sheet}' sheet does not contain records of attendance", 'yellow')
-            if not is_service_day:
-                cprint(f"Skip '{sheet}' sheet because it has one NO_SERVICE_TAGS: {NO_SERVICE_TAGS}", 'red')
-                continue
-            df = df.iloc[INDEX_START:, cols_idx]
-
-            # Rename the columns
-            col_names_old = df.columns
-            date_record = col_names_old[0]
-            col_names_new = [RegisterFields.PERSON, RegisterFields.DIET, RegisterFields.ATTEND]
-            col_names_dict = dict(zip(col_names_old, col_names_new))
-            df = df.rename(columns=col_names_dict)
-
-            # Converting to the correct sample_data type
-            df[RegisterFields.REQUEST] = df.loc[:, RegisterFields.DIET].notnull().tolist()
-            df[RegisterFields.DATE] = datetime_to_str(date_record)
-            df[RegisterFields.ATTEND] = df[RegisterFields.ATTEND].fillna(False).astype('bool')
-
-            # Keep sample_data that is not empty on PERSON column
-            df = df[df[RegisterFields.PERSON].notna()]
-
-            # Reset index
-            df.reset_index(drop=True, inplace=True)
-            df = df[[RegisterFields.PERSON, RegisterFields.DATE, RegisterFields.REQUEST, RegisterFields.ATTEND,
-                     RegisterFields.DIET]]
-
-            df[RegisterFields.DIET] = df[RegisterFields.DIET].fillna('').str.lower().str.strip()
-            if check_extra_meals:
-                df[RegisterFields.EXTRA] = df[RegisterFields.DIET].str.contains(EXTRA_TAG, regex=False)
-                df[RegisterFields.DIET] = df[RegisterFields.DIET].map(lambda diet: str(diet).replace(EXTRA_TAG, ''))
-            df[RegisterFields.DIET] = df[RegisterFields.DIET].map(remove_extra_tag)
-
-            # Removing not valid diets records
-            valid_diets = ['', *DIETS]
-            df = df[df[RegisterFields.DIET].isin(valid_diets)]
-            # Removing duplicated records and keeping the last
-            df = df.drop_duplicates(subset=RegisterFields.PERSON, keep="last")
-            frames.append(df)
-
-        df_breakfast = pandas.concat(frames, ignore_index=True, axis=0)
-        df_breakfast.sort_values(by=[RegisterFields.DATE], ascending=True, inplace=True)
-        return df_breakfast.reset_index(drop=True)
+            List[Tuple]: Result of `process_sheet` for every sheet, in sheet order
+        """
+        cprint(f"Extracting {len(names)} sheets of '{self.get_file_name()}' on {workers} processes", 'cyan')
+        pool = get_sheet_pool(workers)
+        futures = [pool.submit(process_workbook_sheets, path, sheets, self.breakfast_cols_idx, self.lunch_cols_idx)
+                   for sheets in split_sheet_ranges(names, workers)]
+        return [result for future in futures for result in future.result()]
+
+    def get_report(self) -> List[Dict]:
+        """
+        Gets the diagnostics of the sheets extracted by the last build
+
+        Args:
+            None
+
+        Returns:
+            List[Dict]: Diagnostics with the sheet, catering (None if it applies to both), level and message
+        """
+        return self.report
@@ -0,0 +1,79 @@
+import json
+import hashlib
+from typing import Any, Dict, Iterable
+
+# Kinds of ingested content
+MENUS_KIND = 'menus'
+REGISTERS_KIND = 'registers'
+
+
+def get_sha256_by_date(documents: Iterable[Dict], date_field: str) -> Dict[str, str]:
+    """
+    Gets the SHA-256 of the documents of every date (per-date block), the documents are hashed as canonical JSON in
+    the given order
+
+    Args:
+        documents (Iterable[Dict]): Documents
+        date_field (str): Field with the date of the documents
+
+    Returns:
+        Dict[str, str]: Hexadecimal SHA-256 by date
+    """
+    hashes: Dict[str, Any] = dict()
+    for document in documents:
+        date = document[date_field]
+        if date not in hashes:
+            hashes[date] = hashlib.sha256()
+        hashes[date].update(json.dumps(document, sort_keys=True, default=str).encode('utf-8'))
+        hashes[date].update(b'\n')
+    return {date: sha256.hexdigest() for date, sha256 in hashes.items()}
+
+
+def get_documents_sha256(documents: Iterable[Dict], sort_field: str = '_id') -> str:
+    """
+    Gets the SHA-256 of a set of documents, they are sorted first so the result does not depend on the read order
+
+    Args:
+        documents (Iterable[Dict]): Documents
+        sort_field (str): Field to sort the documents
+
+    Returns:
+        str: Hexadecimal SHA-256
+    """
+    sha256 = hashlib.sha256()
+    for document in sorted(documents, key=lambda doc: str(doc[sort_field])):
+        sha256.update(json.dumps(document, sort_keys=True, default=str).encode('utf-8'))
+        sha256.update(b'\n')
+    return sha256.hexdigest()
+
+
+def get_block_key(kind: str, catering: str, date: str) -> str:
+    """
+    Gets the fingerprint key of the documents of a catering and date
+
+    Args:
+        kind (str): Kind of documents (menus or registers)
+        catering (str): A valid catering
+        date (str): Date of the documents
+
+    Returns:
+        str: Fingerprint key
+    """
+    return f'block:{kind}:{catering}:{date}'
+
+
+def get_block_fingerprints(kind: str, catering: str, documents: Iterable[Dict], date_field: str) -> Dict[str, str]:
+    """
+    Gets the fingerprints of the per-date blocks of a set of documents of a catering, keyed by their block key
+
+    Args:
+        kind (str): Kind of documents (menus or registers)
+        catering (str): A valid catering
+        documents (Iterable[Dict]): Documents
+        date_field (str): Field with the date of the documents
+
+    Returns:
+        Dict[str, str]: SHA-256 by block key
+    """
+    return {get_block_key(kind, catering, date): sha256
+            for date, sha256 in get_sha256_by_date(documents, date_field).items()}
@@ -0,0 +1 @@
+from .health_monitor import HealthMonitor, HealthStatus
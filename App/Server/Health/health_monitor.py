@@ -0,0 +1,139 @@
+import os
+import time
+import threading
+import traceback
+from typing import Callable, Dict, List, Optional, Tuple
+from termcolor import cprint
+
+COLOR = 'green'
+
+# A check returns its status and details, or raises an exception if the dependency failed
+Check = Callable[[], Tuple[str, Dict]]
+
+
+class HealthStatus:
+    PASS = 'pass'
+    WARN = 'warn'
+    FAIL = 'fail'
+
+
+class HealthMonitor:
+    """
+    Checks the dependencies of the service on a background thread every interval and keeps their last results, so a
+    health probe never waits for a dependency: it only reads the cached results.
+
+    A required dependency makes the service not ready when its check fails, when it has not finished yet or when its
+    last result is older than `max_age` (i.e. the check is hanging). The other checks are only informative.
+
+    The thread is started by every process once it is created (a thread does not survive the fork of the gunicorn
+    workers), or on the first use of the monitor on the process otherwise. A probe received before the first round
+    of checks of the process ended waits for it up to `startup_wait` seconds
+
+    Args:
+        checks (Dict[str, Check]): Checks by dependency name
+        required (List[str]): Dependencies needed to serve requests
+        interval (float): Seconds between two rounds of checks
+        max_age (float): Seconds after which a result is stale
+        startup_wait (float): Seconds a probe waits for the first round of checks
+
+    Attributes:
+        checks (Dict[str, Check]): Checks by dependency name
+        required (List[str]): Dependencies needed to serve requests
+        interval (float): Seconds between two rounds of checks
+        max_age (float): Seconds after which a result is stale
+        startup_wait (float): Seconds a probe waits for the first round of checks
+        __results (Dict[str, Dict]): Last result by dependency name
+        __first_round (threading.Event): Set when the first round of checks of the process ended
+        __thread (Optional[threading.Thread]): Thread running the checks
+        __pid (Optional[int]): Process running the thread
+        __lock (threading.Lock): Lock for the thread
+    """
+
+    def __init__(self, checks: Dict[str, Check], required: List[str], interval: float, max_age: float,
+                 startup_wait: float = 0):
+        self.checks = checks
+        self.required = required
+        self.interval = interval
+        self.max_age = max_age
+        self.startup_wait = startup_wait
+        self.__results: Dict[str, Dict] = dict()
+        self.__first_round = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+        self.__pid: Optional[int] = None
+        self.__lock = threading.Lock()
+
+    def start(self) -> None:
+        """
+        Starts the thread running the checks, if it is not running on this process
+
+        Returns:
+            None
+        """
+        with self.__lock:
+            if self.__thread is not None and self.__pid == os.getpid() and self.__thread.is_alive():
+                return
+            self.__pid = os.getpid()
+            self.__results = dict()
+            self.__first_round = threading.Event()
+            self.__thread = threading.Thread(target=self.__run, args=(self.__first_round,), name='health',
+                                             daemon=True)
+            self.__thread.start()
+
+    def __run(self, first_round: threading.Event) -> None:
+        while True:
+            for name in self.checks.keys():
+                self.__results[name] = self.run_check(name)
+            first_round.set()
+            time.sleep(self.interval)
+
+    def run_check(self, name: str) -> Dict:
+        """
+        Runs the check of a dependency
+
+        Args:
+            name (str): Dependency name
+
+        Returns:
+            Dict: Status, latency, time of the check and details (or error)
+        """
+        start = time.time()
+        try:
+            status, details = self.checks[name]()
+            result = {'status': status, 'details': details}
+        except Exception as e:
+            cprint(f"Health check of {name} failed: {e}", COLOR)
+            traceback.print_exc()
+            result = {'status': HealthStatus.FAIL, 'error': str(e)}
+        end = time.time()
+        return {**result, 'latency': round(end - start, 4), 'checked_at': end}
+
+    def get_health(self) -> Dict:
+        """
+        Gets the last results of the checks, waiting for the first round of checks of the process if it did not end
+
+        Returns:
+            Dict: Overall status, readiness and the last result of every check with its age
+        """
+        self.start()
+        self.__first_round.wait(self.startup_wait)
+        now = time.time()
+        checks: Dict[str, Dict] = dict()
+        for name in self.checks.keys():
+            result = self.__results.get(name)
+            if result is None:
+                checks[name] = {'status': HealthStatus.FAIL, 'error': 'pending'}
+                continue
+            age = now - result['checked_at']
+            checks[name] = {**result, 'age': round(age, 4)}
+            if age > self.max_age:
+                checks[name].update({'status': HealthStatus.FAIL, 'error': 'stale result, the check is hanging'})
+
+        failed = [name for name, check in checks.items() if check['status'] == HealthStatus.FAIL]
+        is_ready = not any(name in self.required for name in failed)
+        if not is_ready:
+            status = HealthStatus.FAIL
+        elif len(failed) > 0 or any(check['status'] == HealthStatus.WARN for check in checks.values()):
+            status = HealthStatus.WARN
+        else:
+            status = HealthStatus.PASS
+        return {'status': status, 'ready': is_ready, 'checks': checks}
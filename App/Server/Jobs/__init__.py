@@ -0,0 +1,2 @@
+from .job_manager import JobManager, JobStatus, JobFields, JobCancelledError
+from .single_flight import SingleFlight, single_flight
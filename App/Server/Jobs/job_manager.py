@@ -0,0 +1,234 @@
+import os
+import time
+import uuid
+import socket
+import threading
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from termcolor import cprint
+from App.Database import db_server
+from App.Util.helpers import is_process_alive
+
+COLOR = 'cyan'
+
+# A task receives the `on_stage(stage)` callback and returns the JSON serializable result of the job
+Task = Callable[[Callable[[str], None]], Dict]
+
+
+class JobStatus:
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+    FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class StageStatus:
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+
+
+class JobFields:
+    ID = '_id'
+    KIND = 'kind'
+    CATERING = 'catering'
+    STATUS = 'status'
+    STAGE = 'stage'
+    STAGES = 'stages'
+    PROGRESS = 'progress'
+    CANCEL_REQUESTED = 'cancel_requested'
+    RESULT = 'result'
+    ERROR = 'error'
+    CREATED_AT = 'created_at'
+    STARTED_AT = 'started_at'
+    ENDED_AT = 'ended_at'
+    PID = 'pid'
+    HOST = 'host'
+
+
+class JobCancelledError(Exception):
+    pass
+
+
+class JobManager:
+    """
+    Runs long-running tasks (i.e. the pipeline builds) on a local thread pool instead of the request thread. Every job
+    has a persisted record with its status, progress by stage, result and error, so it can be followed and cancelled
+    from any process of the service.
+
+    The task calls `on_stage(stage)` when it starts each stage. The callback records the progress and raises
+    JobCancelledError once the cancellation of the job was requested, so a running job is stopped between two stages.
+    The process running a job is recorded on it, and a queued or running job whose process ended (i.e. a restarted
+    worker) is marked as failed when it is read
+
+    Args:
+        workers (int): Number of jobs running at the same time
+
+    Attributes:
+        workers (int): Number of jobs running at the same time
+        __executor (Optional[ThreadPoolExecutor]): Thread pool of the jobs, created on the first submit
+        __futures (Dict[str, Future]): Pending jobs submitted by this process by job identifier
+        __lock (threading.Lock): Lock for the thread pool and the futures
+    """
+
+    def __init__(self, workers: int = 1):
+        self.workers = workers
+        self.__executor: Optional[ThreadPoolExecutor] = None
+        self.__futures: Dict[str, Future] = dict()
+        self.__lock = threading.Lock()
+
+    def __get_executor(self) -> ThreadPoolExecutor:
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job')
+        return self.__executor
+
+    def submit(self, kind: str, catering: Optional[str], task: Task, stages: List[str]) -> Dict:
+        """
+        Records a new job and queues its task
+
+        Args:
+            kind (str): Kind of job
+            catering (Optional[str]): A valid catering, None if the job works on all the caterings
+            task (Task): Function running the job
+            stages (List[str]): Stages reported by the task, in order, to compute the progress
+
+        Returns:
+            Dict: Job record
+        """
+        job_id = uuid.uuid4().hex
+        stage_records = [{'name': stage, 'status': StageStatus.PENDING} for stage in stages]
+        job = {
+            JobFields.ID: job_id, JobFields.KIND: kind, JobFields.CATERING: catering,
+            JobFields.STATUS: JobStatus.QUEUED, JobFields.STAGE: None, JobFields.STAGES: stage_records,
+            JobFields.PROGRESS: 0.0, JobFields.CANCEL_REQUESTED: False, JobFields.RESULT: None, JobFields.ERROR: None,
+            JobFields.CREATED_AT: time.time(), JobFields.STARTED_AT: None, JobFields.ENDED_AT: None,
+            JobFields.PID: os.getpid(), JobFields.HOST: socket.gethostname()}
+        db_server.save_job(job)
+        with self.__lock:
+            future = self.__get_executor().submit(self.__run, job_id, task, stage_records)
+            self.__futures[job_id] = future
+        future.add_done_callback(lambda _: self.__futures.pop(job_id, None))
+        return job
+
+    @staticmethod
+    def __run(job_id: str, task: Task, stages: List[Dict]) -> None:
+        """
+        Runs the task of a job, recording its progress and its result or error
+
+        Args:
+            job_id (str): Job identifier
+            task (Task): Function running the job
+            stages (List[Dict]): Expected stages of the job
+
+        Returns:
+            None
+        """
+        job = db_server.get_job(job_id)
+        if job is None or job[JobFields.STATUS] != JobStatus.QUEUED:
+            return
+        if job[JobFields.CANCEL_REQUESTED]:
+            db_server.update_job(job_id, {JobFields.STATUS: JobStatus.CANCELLED, JobFields.ENDED_AT: time.time()})
+            cprint(f"Job {job_id} ({job[JobFields.KIND]}, {job[JobFields.CATERING]}) cancelled", COLOR)
+            return
+        db_server.update_job(job_id, {JobFields.STATUS: JobStatus.RUNNING, JobFields.STARTED_AT: time.time()})
+        cprint(f"Job {job_id} ({job[JobFields.KIND]}, {job[JobFields.CATERING]}) started", COLOR)
+
+        def finish_running_stage() -> None:
+            for stage_record in stages:
+                if stage_record['status'] == StageStatus.RUNNING:
+                    stage_record.update(status=StageStatus.DONE, ended_at=time.time())
+
+        def on_stage(stage: str) -> None:
+            # The record is read again so a cancellation requested from another process is also seen
+            current_job = db_server.get_job(job_id)
+            if current_job is not None and current_job[JobFields.CANCEL_REQUESTED]:
+                raise JobCancelledError(f"Job {job_id} was cancelled")
+            finish_running_stage()
+            stage_record = next((record for record in stages if record['name'] == stage), None)
+            if stage_record is None:
+                stage_record = {'name': stage}
+                stages.append(stage_record)
+            stage_record.update(status=StageStatus.RUNNING, started_at=time.time())
+            num_done = sum(record['status'] == StageStatus.DONE for record in stages)
+            db_server.update_job(job_id, {JobFields.STAGE: stage, JobFields.STAGES: stages,
+                                          JobFields.PROGRESS: round(num_done / len(stages), 4)})
+
+        try:
+            result = task(on_stage)
+            finish_running_stage()
+            updates = {JobFields.STATUS: JobStatus.SUCCEEDED, JobFields.RESULT: result, JobFields.PROGRESS: 1.0,
+                       JobFields.STAGE: None}
+        except JobCancelledError:
+            updates = {JobFields.STATUS: JobStatus.CANCELLED}
+        except Exception as e:
+            traceback.print_exc()
+            updates = {JobFields.STATUS: JobStatus.FAILED, JobFields.ERROR: str(e)}
+        # A failed or cancelled job keeps the stage where it stopped
+        updates.update({JobFields.STAGES: stages, JobFields.ENDED_AT: time.time()})
+        db_server.update_job(job_id, updates)
+        cprint(f"Job {job_id} ({job[JobFields.KIND]}, {job[JobFields.CATERING]}) {updates[JobFields.STATUS]}", COLOR)
+
+    @staticmethod
+    def get(job_id: str) -> Optional[Dict]:
+        """
+        Gets the record of a job
+
+        Args:
+            job_id (str): Job identifier
+
+        Returns:
+            Optional[Dict]: Job record, None if it was not found
+        """
+        job = db_server.get_job(job_id)
+        return None if job is None else JobManager.fail_orphan_job(job)
+
+    @staticmethod
+    def fail_orphan_job(job: Dict) -> Dict:
+        """
+        Marks a queued or running job as failed if the process running it ended (i.e. a restarted worker), otherwise
+        it would never finish. Only the processes of the current host can be checked
+
+        Args:
+            job (Dict): Job record
+
+        Returns:
+            Dict: Job record, updated if it was an orphan
+        """
+        if job[JobFields.STATUS] in JobStatus.FINISHED or job.get(JobFields.PID) is None or \
+                job.get(JobFields.HOST) != socket.gethostname() or is_process_alive(job[JobFields.PID]):
+            return job
+        updates = {JobFields.STATUS: JobStatus.FAILED, JobFields.ENDED_AT: time.time(),
+                   JobFields.ERROR: f"The process {job[JobFields.PID]} running the job ended before the job finished"}
+        db_server.update_job(job[JobFields.ID], updates)
+        cprint(f"Job {job[JobFields.ID]} ({job[JobFields.KIND]}, {job[JobFields.CATERING]}) failed: "
+               f"{updates[JobFields.ERROR]}", COLOR)
+        job.update(updates)
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """
+        Requests the cancellation of a job, a finished job is not changed. Only the request is recorded: the job is
+        cancelled by the process running it, when it starts (a queued job) or its next stage (a running job), so the
+        status is never written by two processes at the same time. A queued job of this process whose task was not
+        started yet is cancelled at once, as it will never run
+
+        Args:
+            job_id (str): Job identifier
+
+        Returns:
+            Optional[Dict]: Job record, None if it was not found
+        """
+        job = self.get(job_id)
+        if job is None or job[JobFields.STATUS] in JobStatus.FINISHED:
+            return job
+        updates: Dict = {JobFields.CANCEL_REQUESTED: True}
+        with self.__lock:
+            future = self.__futures.get(job_id)
+            if future is not None and future.cancel():
+                updates.update({JobFields.STATUS: JobStatus.CANCELLED, JobFields.ENDED_AT: time.time()})
+        db_server.update_job(job_id, updates)
+        job.update(updates)
+        return job
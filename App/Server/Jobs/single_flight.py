@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import fcntl
+import functools
+import threading
+import contextlib
+from typing import Any, Callable, Dict, Iterator, Optional
+from termcolor import cprint
+from config import BUILD_LOCK_PATH
+from App.Server.Jobs.job_manager import JobCancelledError
+
+COLOR = 'cyan'
+
+
+class Flight:
+    """
+    Build running on this process, shared by the threads that asked for the same build
+
+    Attributes:
+        done (threading.Event): Set when the build ended
+        result (Any): Value returned by the build
+        error (Optional[Exception]): Exception raised by the build
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[Exception] = None
+
+
+class SingleFlight:
+    """
+    Coordinates the builds of the artifacts of every catering across the threads and the processes (i.e. gunicorn
+    workers) of the host:
+
+    - The builds of a catering are serialized with an exclusive lock on a file per catering, so two builds never
+      remove or write the artifacts of the same catering at the same time.
+    - A build requested while the same build of the same catering is running joins it: it waits for the running
+      build and returns its result instead of repeating the work. The threads of a process share the running build
+      directly and the other processes read the completion stamp written by the build when it ends.
+
+    Args:
+        lock_path (str): Folder of the lock files and the completion stamps
+
+    Attributes:
+        lock_path (str): Folder of the lock files and the completion stamps
+        __flights (Dict[str, Flight]): Builds running on this process by key
+        __lock (threading.Lock): Lock for the running builds
+    """
+
+    def __init__(self, lock_path: str):
+        self.lock_path = lock_path
+        self.__flights: Dict[str, Flight] = dict()
+        self.__lock = threading.Lock()
+
+    def __get_stamp_path(self, key: str) -> str:
+        return os.path.join(self.lock_path, f'{key}.json')
+
+    def __read_stamp(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self.__get_stamp_path(key)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def __write_stamp(self, key: str, stamp: Dict) -> None:
+        # Written to a temporary file and then replaced, so a reader never sees a partial stamp
+        stamp_path = self.__get_stamp_path(key)
+        temp_path = f'{stamp_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(stamp, f, default=str)
+        os.replace(temp_path, stamp_path)
+
+    def run(self, kind: str, catering: str, build: Callable[[], Any]) -> Any:
+        """
+        Runs a build of a catering, or joins the same build if it is already running
+
+        Args:
+            kind (str): Kind of build
+            catering (str): A valid catering
+            build (Callable[[], Any]): Function running the build, its result must be JSON serializable
+
+        Returns:
+            Any: Value returned by the build (or by the joined build)
+
+        Raises:
+            Exception: If the build (or the joined build) failed
+        """
+        key = f'{kind}_{catering}'
+        with self.__lock:
+            flight = self.__flights.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = Flight()
+                self.__flights[key] = flight
+        if not is_leader:
+            cprint(f"Joining the running {kind} build of {catering}", COLOR)
+            flight.done.wait()
+            if isinstance(flight.error, JobCancelledError):
+                # The joined build was stopped by the cancellation of its job, not of this one
+                raise Exception(f"The running {kind} build of {catering} was cancelled")
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self.__run_locked(kind, catering, key, build)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise e
+        finally:
+            with self.__lock:
+                del self.__flights[key]
+            flight.done.set()
+
+    def __run_locked(self, kind: str, catering: str, key: str, build: Callable[[], Any]) -> Any:
+        """
+        Runs a build holding the lock of its catering, unless the same build was running on another process when it
+        was requested
+
+        Args:
+            kind (str): Kind of build
+            catering (str): A valid catering
+            key (str): Key of the build
+            build (Callable[[], Any]): Function running the build
+
+        Returns:
+            Any: Value returned by the build (or by the joined build)
+        """
+        requested_at = time.time()
+        with self.lock(catering):
+            stamp = self.__read_stamp(key)
+            if stamp is not None and stamp['started_at'] <= requested_at <= stamp['ended_at']:
+                cprint(f"Joined the {kind} build of {catering} from process {stamp['pid']}", COLOR)
+                if stamp['error'] is not None:
+                    raise Exception(stamp['error'])
+                return stamp['result']
+            stamp = {'started_at': time.time(), 'pid': os.getpid(), 'result': None, 'error': None}
+            try:
+                stamp['result'] = build()
+                return stamp['result']
+            except Exception as e:
+                stamp['error'] = str(e)
+                raise e
+            finally:
+                stamp['ended_at'] = time.time()
+                self.__write_stamp(key, stamp)
+
+    @contextlib.contextmanager
+    def lock(self, catering: str) -> Iterator[None]:
+        """
+        Holds the exclusive lock of a catering held by its builds, for the other changes of its artifacts (i.e. a
+        rollback) that must not run while a build publishes and prunes its versions. It is not reentrant
+
+        Args:
+            catering (str): A valid catering
+
+        Returns:
+            Iterator[None]: Context holding the lock
+        """
+        os.makedirs(self.lock_path, exist_ok=True)
+        with open(os.path.join(self.lock_path, f'{catering}.lock'), 'a') as lock_file:
+            # Blocks while another thread or process builds an artifact of the catering
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """
+    Gets the build coordinator shared by the process
+
+    Returns:
+        SingleFlight: Build coordinator
+    """
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight(BUILD_LOCK_PATH)
+    return _single_flight
+
+
+def single_flight(kind: str) -> Callable:
+    """
+    Decorator for the build functions of a catering (the catering is their first argument), see `SingleFlight`
+
+    Args:
+        kind (str): Kind of build
+
+    Returns:
+        Callable: Decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(catering: str, *args, **kwargs) -> Any:
+            return get_single_flight().run(kind, catering, lambda: func(catering, *args, **kwargs))
+
+        return wrapper
+
+    return decorator
@@ -1,13 +1,11 @@
-from typing import List, Dict, Set
-import nltk
+from typing import TYPE_CHECKING, List, Dict, Set
 import pandas
 from collections import defaultdict
 from termcolor import cprint
-from sklearn.feature_extraction.text import CountVectorizer
 from App.Server.Preprocessor.TextCleaner import text_cleaner
 
-nltk.download('punkt')
-nltk.download('stopwords')
+if TYPE_CHECKING:
+    from sklearn.feature_extraction.text import CountVectorizer
 
 COLOR = "blue"
 
@@ -39,7 +37,7 @@ class BagOfWords:
         self.__stemmed_words_features_dict: Dict[str, Set] = dict()
         self.__bow_features: List[str] = []
         self.__bow_vectors: List[List[int]] = []
-        self.__vectorizer: CountVectorizer = None
+        self.__vectorizer: 'CountVectorizer' = None
 
     def build(self, df: pandas.DataFrame, filter_col_name: str) -> None:
         """
@@ -52,6 +50,20 @@ class BagOfWords:
         Returns:
             None
         """
+        self.clean_corpus(df, filter_col_name)
+        self.fit_vectorizer()
+
+    def clean_corpus(self, df: pandas.DataFrame, filter_col_name: str) -> int:
+        """
+        Extracts the text from a sample_data frame and cleans and stems it to build the corpus
+
+        Args:
+            df (pandas.DataFrame): Data frame to extract the text
+            filter_col_name (str): Column name to filter sample_data
+
+        Returns:
+            int: Number of texts on the corpus
+        """
         # Get clean stemmed sample_data
         cprint(f"Cleaning and stemming the sample_data...", COLOR)
         for col_name in self.col_names_features:
@@ -59,8 +71,19 @@ class BagOfWords:
             diet_texts = filtered_data.astype(str).values.tolist()
             self.__cleaned_text_data += self.stem_raw_text_list(
                 diet_texts, feed_stem_dict=True)
+        return len(self.__cleaned_text_data)
+
+    def fit_vectorizer(self) -> None:
+        """
+        Creates the bow features and vectors from the cleaned corpus (see `clean_corpus`)
+
+        Returns:
+            None
+        """
         # Get Bag of Words
         cprint(f"Building the BoW model...", COLOR)
+        # Imported on the first build, the unpickled models import it by themselves
+        from sklearn.feature_extraction.text import CountVectorizer
         self.__vectorizer = CountVectorizer(max_features=self.max_features)
         self.__bow_vectors = self.__vectorizer.fit_transform(self.__cleaned_text_data).toarray()
         self.__bow_features = self.__vectorizer.get_feature_names()
@@ -118,7 +141,7 @@ class BagOfWords:
         """
         return self.__bow_vectors
 
-    def get_vectorizer(self) -> CountVectorizer:
+    def get_vectorizer(self) -> 'CountVectorizer':
         """
         Gets the CountVectorizer object used to transform cleaned text to vector representation
 
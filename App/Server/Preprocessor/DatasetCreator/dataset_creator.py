@@ -1,3 +1,4 @@
+import time
 import pandas
 from termcolor import cprint
 from typing import List, Dict, Set, Tuple, Union
@@ -36,6 +37,8 @@ class DatasetCreator:
         menu_bow (BagOfWords): BagOfWords instance previously obtained
         common_dates (): Dates that match between df_registers and df_menu
         different_dates (): Dates that don't match between df_registers and df_menu
+        vectorize_time (float): Seconds spent vectorizing the menus on the last build (interleaved with the grouping)
+        vectorized_texts (int): Menu texts vectorized on the last build
     """
 
     def __init__(self, df_registers: pandas.DataFrame, df_menus: pandas.DataFrame, menu_bow: BagOfWords):
@@ -45,6 +48,8 @@ class DatasetCreator:
         self.menu_bow = menu_bow
         self.common_dates: List[str] = []
         self.different_dates: List[str] = []
+        self.vectorize_time: float = 0.0
+        self.vectorized_texts: int = 0
 
     def __get_common_dates(self, date_col_name: str) -> Tuple[List[str], List[str]]:
         """
@@ -82,6 +87,7 @@ class DatasetCreator:
         bow_features: List[str] = self.menu_bow.get_features()
         cprint(f'Common dates: {len(self.common_dates)}. Dates not included: {len(self.different_dates)}', 'yellow')
 
+        self.vectorize_time, self.vectorized_texts = 0.0, 0
         grouped_data: List[Dict[str, Union[str, int]]] = []
         for idx, date in enumerate(self.common_dates):
             menu: pandas.DataFrame = get_data_satisfy_condition(self.df_menu, MenuFields.DATE, date)
@@ -99,7 +105,10 @@ class DatasetCreator:
 
             for diet in DIETS:
                 raw_text: List[str] = menu[diet].values
+                start = time.perf_counter()
                 bow_vector: List[int] = self.menu_bow.vectorize_raw_data(raw_text)[0].tolist()
+                self.vectorize_time += time.perf_counter() - start
+                self.vectorized_texts += len(raw_text)
                 bow_dict = dict(zip(bow_features, bow_vector))
 
                 group_record: Dict[str, Union[str, int]] = dict()
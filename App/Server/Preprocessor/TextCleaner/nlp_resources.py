@@ -0,0 +1,152 @@
+import os
+import functools
+import threading
+from typing import TYPE_CHECKING, Dict, List, Set
+from termcolor import cprint
+from config import NLP_DATA_PATH, NLP_AUTO_DOWNLOAD
+
+if TYPE_CHECKING:
+    from nltk.stem.snowball import SnowballStemmer
+    from autocorrect import Speller
+
+COLOR = 'blue'
+# Languages of the spell checkers used by the text cleaner
+SPELL_LANGUAGES = ['en']
+
+_ready = False
+_ready_lock = threading.Lock()
+
+
+def get_nltk_resources() -> Dict[str, str]:
+    """
+    Gets the NLTK data used by the text cleaner
+
+    Returns:
+        Dict[str, str]: NLTK package name by resource path
+    """
+    import nltk
+    # The newer NLTK versions tokenize with the `punkt_tab` tables instead of the pickled `punkt` models
+    punkt = 'punkt_tab' if hasattr(nltk.tokenize.punkt, 'PunktTokenizer') else 'punkt'
+    return {f'tokenizers/{punkt}': punkt, 'corpora/stopwords': 'stopwords'}
+
+
+def get_missing_nltk_resources() -> List[str]:
+    """
+    Gets the NLTK packages that are not installed on the NLP data folder (or any other NLTK data folder)
+
+    Returns:
+        List[str]: Missing NLTK package names
+    """
+    import nltk
+    if NLP_DATA_PATH not in nltk.data.path:
+        nltk.data.path.insert(0, NLP_DATA_PATH)
+    missing: List[str] = list()
+    for resource, package in get_nltk_resources().items():
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            missing.append(package)
+    return missing
+
+
+def download_nltk_resources(packages: List[str]) -> List[str]:
+    """
+    Downloads NLTK packages to the NLP data folder
+
+    Args:
+        packages (List[str]): NLTK package names
+
+    Returns:
+        List[str]: Packages that could not be downloaded
+    """
+    import nltk
+    os.makedirs(NLP_DATA_PATH, exist_ok=True)
+    return [package for package in packages if not nltk.download(package, download_dir=NLP_DATA_PATH, quiet=True)]
+
+
+def ensure_nlp_resources() -> None:
+    """
+    Checks (only once per process) that the NLTK data is installed before its first use. Nothing is downloaded on
+    import time or by default, the data is prepared in advance with `flask prepare-resources`
+
+    Returns:
+        None
+
+    Raises:
+        Exception: If any NLTK package is missing and it could not be downloaded
+    """
+    global _ready
+    if _ready:
+        return
+    with _ready_lock:
+        if _ready:
+            return
+        missing = get_missing_nltk_resources()
+        if len(missing) > 0 and NLP_AUTO_DOWNLOAD:
+            cprint(f"Downloading the NLTK data {missing} to {NLP_DATA_PATH}", COLOR)
+            missing = download_nltk_resources(missing)
+        if len(missing) > 0:
+            raise Exception(f"NLTK data {missing} not found on {NLP_DATA_PATH}. Run `flask prepare-resources` (with "
+                            f"FLASK_APP=main_app) to download it.")
+        _ready = True
+
+
+def prepare_nlp_resources() -> Dict[str, List[str]]:
+    """
+    Downloads the missing NLTK data to the NLP data folder and loads the spell checkers (downloading their
+    dictionaries if they are not bundled), i.e. while building an image, so the service works offline
+
+    Returns:
+        Dict[str, List[str]]: Downloaded NLTK packages and packages that could not be downloaded
+    """
+    missing = get_missing_nltk_resources()
+    failed = download_nltk_resources(missing)
+    for language in SPELL_LANGUAGES:
+        get_speller(language)
+    return {'downloaded': [package for package in missing if package not in failed], 'failed': failed}
+
+
+@functools.lru_cache(maxsize=None)
+def get_stop_words(language: str) -> Set[str]:
+    """
+    Gets the stop words of a language, loaded once per process
+
+    Args:
+        language (str): Language to use
+
+    Returns:
+        Set[str]: Stop words
+    """
+    from nltk.corpus import stopwords
+    ensure_nlp_resources()
+    return set(stopwords.words(language))
+
+
+@functools.lru_cache(maxsize=None)
+def get_stemmer(language: str) -> 'SnowballStemmer':
+    """
+    Gets the stemmer of a language, created once per process
+
+    Args:
+        language (str): Language to use
+
+    Returns:
+        SnowballStemmer: Stemmer
+    """
+    from nltk.stem.snowball import SnowballStemmer
+    return SnowballStemmer(language)
+
+
+@functools.lru_cache(maxsize=None)
+def get_speller(language: str) -> 'Speller':
+    """
+    Gets the spell checker of a language, its dictionary is loaded once per process
+
+    Args:
+        language (str): Language to use
+
+    Returns:
+        Speller: Spell checker
+    """
+    from autocorrect import Speller
+    return Speller(lang=language)
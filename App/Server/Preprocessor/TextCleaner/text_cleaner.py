@@ -1,9 +1,7 @@
 import re
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem.snowball import SnowballStemmer
-from autocorrect import Speller
 from typing import List
+from App.Server.Preprocessor.TextCleaner.nlp_resources import ensure_nlp_resources, get_stop_words, get_stemmer, \
+    get_speller
 
 
 def remove_stop_words(tokens: List[str], language="english") -> List[str]:
@@ -17,7 +15,8 @@ def remove_stop_words(tokens: List[str], language="english") -> List[str]:
     Returns:
         tokens (List[str]): List of tokens that not includes stop words
     """
-    return [word for word in tokens if word not in stopwords.words(language)]
+    stop_words = get_stop_words(language)
+    return [word for word in tokens if word not in stop_words]
 
 
 def get_base_words(tokens: List[str], stem_lang="english", spell_lang="en") -> List[str]:
@@ -32,8 +31,8 @@ def get_base_words(tokens: List[str], stem_lang="english", spell_lang="en") -> L
     Returns:
         stemmed_tokens (List[str]): List of stemmed tokens
     """
-    stemmer = SnowballStemmer(stem_lang)
-    spell = Speller(lang=spell_lang)
+    stemmer = get_stemmer(stem_lang)
+    spell = get_speller(spell_lang)
     return [spell(stemmer.stem(word))
             for word in tokens]
 
@@ -90,4 +89,6 @@ def get_tokens_word(word: str, language="english") -> List[str]:
     Returns:
         tokens (List[str]): List of tokens obtained from the word
     """
+    from nltk.tokenize import word_tokenize
+    ensure_nlp_resources()
     return word_tokenize(word, language)
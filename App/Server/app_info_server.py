@@ -1,17 +1,98 @@
-import traceback
+import os
+import time
+from typing import Dict, Optional, Tuple
 from App.Database import db
+from App.Server import artifact_server
+from App.Server.Artifacts import Pointers
+from App.Server.Health import HealthMonitor, HealthStatus
+from App.Util.constants import CATERINGS
+from config import STORAGE_BACKEND, HEALTH_CHECK_INTERVAL, HEALTH_CHECK_MAX_AGE, HEALTH_CHECK_STARTUP_WAIT
 
+STORAGE_CHECK = 'storage'
+ARTIFACTS_CHECK = 'artifacts'
+# Start time of the service (the gunicorn workers inherit it from the master process)
+STARTED_AT = time.time()
 
-def is_mongo_client_healthy() -> bool:
+_health_monitor: Optional[HealthMonitor] = None
+
+
+def check_storage() -> Tuple[str, Dict]:
+    """
+    Checks the connection with the storage service
+
+    Returns:
+        str: Health status
+        Dict: Storage backend and its version
+
+    Raises:
+        Exception: If the storage service is not reachable
+    """
+    info = db.client_health()
+    return HealthStatus.PASS, {'backend': STORAGE_BACKEND, 'version': info.get('version')}
+
+
+def check_artifacts() -> Tuple[str, Dict]:
+    """
+    Checks that every catering has the models to predict, a missing model is a warning since the service can still
+    collect the data to build it
+
+    Returns:
+        str: Health status
+        Dict: Presence of the BoW and prediction models and served version by catering
+    """
+    caterings: Dict[str, Dict] = dict()
+    for catering in CATERINGS:
+        caterings[catering] = {
+            'bow': artifact_server.has_bow_model(catering),
+            'model': artifact_server.has_prediction_model(catering),
+            'version': artifact_server.get_artifact_store().read_pointer(catering, Pointers.CURRENT)
+        }
+    is_complete = all(artifacts['bow'] and artifacts['model'] for artifacts in caterings.values())
+    return HealthStatus.PASS if is_complete else HealthStatus.WARN, caterings
+
+
+def get_health_monitor() -> HealthMonitor:
+    """
+    Gets the health monitor shared by the process
+
+    Returns:
+        HealthMonitor: Health monitor
     """
-    Returns True if the mongo connection is OK else returns False
+    global _health_monitor
+    if _health_monitor is None:
+        _health_monitor = HealthMonitor({STORAGE_CHECK: check_storage, ARTIFACTS_CHECK: check_artifacts},
+                                        [STORAGE_CHECK], HEALTH_CHECK_INTERVAL, HEALTH_CHECK_MAX_AGE,
+                                        HEALTH_CHECK_STARTUP_WAIT)
+    return _health_monitor
+
+
+def start_health_monitor() -> None:
+    """
+    Starts the health checks of the process, so its first round is done before the first probe. Called by every
+    gunicorn worker after the fork and by the development server
 
     Returns:
-        bool: Mongo's health
-    """
-    try:
-        info = db.client_health()
-        return bool(info)
-    except Exception:
-        traceback.print_exc()
-        return False
+        None
+    """
+    get_health_monitor().start()
+
+
+def get_health() -> Dict:
+    """
+    Gets the last health results of the dependencies of the service, without waiting for them
+
+    Returns:
+        Dict: Overall status, readiness and the last result of every check
+    """
+    return get_health_monitor().get_health()
+
+
+def get_liveness() -> Dict:
+    """
+    Gets the liveness of the process, it does not depend on any dependency nor on the health checks
+
+    Returns:
+        Dict: Status, process identifier and uptime
+    """
+    return {'status': HealthStatus.PASS, 'pid': os.getpid(),
+            'uptime': round(time.time() - STARTED_AT, 4)}
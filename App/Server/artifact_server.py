@@ -0,0 +1,297 @@
+import os
+import time
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from termcolor import cprint
+from App.Server.Artifacts import ArtifactStore, ArtifactNames, Pointers
+from App.Server.Jobs.single_flight import get_single_flight
+from App.Util.constants import BOW_FILE_PATH, PREDICTION_MODEL_FILE_PATH, CATERINGS
+from App.Util.helpers import read_object_from_pkl_file
+from config import ARTIFACTS_PATH, ARTIFACT_VERSIONS_KEPT
+
+COLOR = 'yellow'
+
+_artifact_store: Optional[ArtifactStore] = None
+# Models loaded on the process by file path, with the modification time and size of the file they were read from
+_loaded_artifacts: Dict[str, Tuple[Tuple[int, int], Any]] = dict()
+_loaded_artifacts_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """
+    Gets the versioned store of the BoW and prediction models
+
+    Returns:
+        ArtifactStore: Artifact store
+    """
+    global _artifact_store
+    if _artifact_store is None:
+        _artifact_store = ArtifactStore(ARTIFACTS_PATH, ARTIFACT_VERSIONS_KEPT)
+    return _artifact_store
+
+
+def get_legacy_bow_path(catering: str) -> str:
+    """
+    Gets the full path file name of the BoW model saved before the versioned store, used while the catering has no
+    versions
+
+    Args:
+        catering (string): A valid catering
+
+    Returns:
+        str: Full path file name of the BoW model
+    """
+    return f"{BOW_FILE_PATH}{catering}_menu.pkl"
+
+
+def get_legacy_model_path(catering: str) -> str:
+    """
+    Gets the full path file name of the prediction model saved before the versioned store, used while the catering
+    has no versions
+
+    Args:
+        catering (string): A valid catering
+
+    Returns:
+        str: Full path file name of the prediction model
+    """
+    return f"{PREDICTION_MODEL_FILE_PATH}{catering}.pkl"
+
+
+def get_bow_path(catering: str, pointer: str = Pointers.CURRENT) -> str:
+    """
+    Gets the full path file name of the BoW model of a version
+
+    Args:
+        catering (string): A valid catering
+        pointer (str): Pointer to the version, `Pointers.CURRENT` for the BoW model of the served prediction model or
+            `Pointers.LATEST` for the newest BoW model
+
+    Returns:
+        str: Full path file name of the BoW model, the legacy one if the pointer was never written
+    """
+    version = get_artifact_store().read_pointer(catering, pointer)
+    if version is None:
+        return get_legacy_bow_path(catering)
+    return get_artifact_store().get_artifact_path(catering, version, ArtifactNames.BOW)
+
+
+def get_serving_model(catering: str) -> Tuple[str, Optional[Dict]]:
+    """
+    Gets the served prediction model, resolving the current version once so its model and manifest are consistent
+
+    Args:
+        catering (string): A valid catering
+
+    Returns:
+        str: Full path file name of the prediction model, the legacy one if there is no current version
+        Optional[Dict]: Manifest of the current version, None for the legacy prediction model
+    """
+    store = get_artifact_store()
+    version = store.read_pointer(catering, Pointers.CURRENT)
+    if version is None:
+        return get_legacy_model_path(catering), None
+    return store.get_artifact_path(catering, version, ArtifactNames.MODEL), store.read_manifest(catering, version)
+
+
+def load_artifact(file_path: str) -> Any:
+    """
+    Reads a BoW or prediction model, keeping it loaded on the process so every request (and every worker forked
+    after `preload_artifacts`) shares the same instance. The models are only read by the predictions, and a file is
+    read again if it changed since it was loaded
+
+    Args:
+        file_path (str): Full path file name of the model
+
+    Returns:
+        Any: Model
+
+    Raises:
+        Exception: If the file does not exist
+    """
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return read_object_from_pkl_file(file_path)
+    file_id = (stat.st_mtime_ns, stat.st_size)
+    with _loaded_artifacts_lock:
+        loaded = _loaded_artifacts.get(file_path)
+    if loaded is not None and loaded[0] == file_id:
+        return loaded[1]
+
+    obj = read_object_from_pkl_file(file_path)
+    with _loaded_artifacts_lock:
+        # Releases the models of the versions removed since they were loaded
+        for loaded_path in [path for path in _loaded_artifacts.keys() if not os.path.isfile(path)]:
+            del _loaded_artifacts[loaded_path]
+        _loaded_artifacts[file_path] = (file_id, obj)
+    return obj
+
+
+def preload_artifacts() -> Dict[str, List[str]]:
+    """
+    Loads the served BoW and prediction models of every catering (see `load_artifact`). Called by the server before
+    forking its workers, so they share the loaded models instead of reading their own copies
+
+    Returns:
+        Dict[str, List[str]]: Loaded models by catering
+    """
+    start = time.time()
+    loaded: Dict[str, List[str]] = dict()
+    for catering in CATERINGS:
+        loaded[catering] = list()
+        file_paths = {ArtifactNames.BOW: get_bow_path(catering), ArtifactNames.MODEL: get_serving_model(catering)[0]}
+        for name, file_path in file_paths.items():
+            if not os.path.isfile(file_path):
+                continue
+            try:
+                load_artifact(file_path)
+                loaded[catering].append(name)
+            except Exception as e:
+                cprint(f"Failed to preload {file_path}: {e}", 'red')
+    cprint(f"Preloaded models in {round(time.time() - start, 4)} sec: {loaded}", COLOR)
+    return loaded
+
+
+def has_bow_model(catering: str) -> bool:
+    """
+    Checks if there is a BoW model to build the training dataset
+
+    Args:
+        catering (string): A valid catering
+
+    Returns:
+        bool: True if the BoW model exists
+    """
+    return os.path.isfile(get_bow_path(catering, Pointers.LATEST))
+
+
+def has_prediction_model(catering: str) -> bool:
+    """
+    Checks if there is a prediction model to serve
+
+    Args:
+        catering (string): A valid catering
+
+    Returns:
+        bool: True if the prediction model exists
+    """
+    return os.path.isfile(get_serving_model(catering)[0])
+
+
+def publish_bow_model(catering: str, bow: Any, features: List[str]) -> str:
+    """
+    Publishes a new BoW model as the newest one, the served version does not change until a prediction model is
+    trained with it
+
+    Args:
+        catering (string): A valid catering
+        bow (Any): BoW model
+        features (List[str]): BoW features
+
+    Returns:
+        str: New version
+    """
+    store = get_artifact_store()
+    version = store.create_version(catering, {ArtifactNames.BOW: bow}, dict(), {'features': features})
+    store.write_pointer(catering, Pointers.LATEST, version)
+    store.prune(catering)
+    return version
+
+
+def get_latest_bow_version(catering: str) -> Optional[str]:
+    """
+    Gets the version of the newest BoW model
+
+    Args:
+        catering (string): A valid catering
+
+    Returns:
+        Optional[str]: Version, None if the legacy BoW model is used
+    """
+    return get_artifact_store().read_pointer(catering, Pointers.LATEST)
+
+
+def set_dataset_bow_version(catering: str, version: Optional[str]) -> None:
+    """
+    Records the version of the BoW model used to build the training dataset, the prediction model trained with the
+    dataset is published with it
+
+    Args:
+        catering (string): A valid catering
+        version (Optional[str]): Version, None if the legacy BoW model was used
+
+    Returns:
+        None
+    """
+    if version is not None:
+        get_artifact_store().write_pointer(catering, Pointers.DATASET, version)
+
+
+def publish_prediction_model(catering: str, model: Any, manifest: Dict) -> str:
+    """
+    Publishes a new version with a prediction model and the BoW model used to build its training dataset, and serves
+    it. The previous versions are kept for rollbacks
+
+    Args:
+        catering (string): A valid catering
+        model (Any): Prediction model
+        manifest (Dict): Information about the prediction model to save on the manifest
+
+    Returns:
+        str: New version
+
+    Raises:
+        Exception: If there is no BoW model
+    """
+    store = get_artifact_store()
+    bow_version = store.read_pointer(catering, Pointers.DATASET) or store.read_pointer(catering, Pointers.LATEST)
+    bow_path = get_legacy_bow_path(catering) if bow_version is None \
+        else store.get_artifact_path(catering, bow_version, ArtifactNames.BOW)
+    if not os.path.isfile(bow_path):
+        raise Exception(f"BoW file for {catering} menus does not exist. In order to publish the prediction model you "
+                        f"need to build the BoW model first.")
+    bow_manifest = dict() if bow_version is None else store.read_manifest(catering, bow_version)
+    version = store.create_version(catering, {ArtifactNames.MODEL: model}, {ArtifactNames.BOW: bow_path},
+                                   {**manifest, 'bow_version': bow_version, 'features': bow_manifest.get('features')})
+    store.write_pointer(catering, Pointers.CURRENT, version)
+    # The new version has the same BoW model, so it replaces the BoW-only version on the other pointers
+    for pointer in (Pointers.LATEST, Pointers.DATASET):
+        if store.read_pointer(catering, pointer) in (None, bow_version):
+            store.write_pointer(catering, pointer, version)
+    store.prune(catering)
+    return version
+
+
+def get_versions(catering: str) -> Dict:
+    """
+    Gets the versions of the models of a catering and the versions referenced by every pointer
+
+    Args:
+        catering (string): A valid catering
+
+    Returns:
+        Dict: Versions by pointer and manifests of all the versions (from the newest to the oldest)
+    """
+    store = get_artifact_store()
+    return {
+        Pointers.CURRENT: store.read_pointer(catering, Pointers.CURRENT),
+        Pointers.LATEST: store.read_pointer(catering, Pointers.LATEST),
+        'versions': store.list_versions(catering)
+    }
+
+
+def rollback_models(catering: str, version: Optional[str] = None) -> str:
+    """
+    Serves a previous version of the models of a catering. It holds the build lock of the catering, so a build never
+    prunes the version it points to while it is rolled back
+
+    Args:
+        catering (string): A valid catering
+        version (Optional[str]): Version to serve, the version published before the served one if it is None
+
+    Returns:
+        str: Version served
+    """
+    with get_single_flight().lock(catering):
+        return get_artifact_store().rollback(catering, version)
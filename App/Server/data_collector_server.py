@@ -1,17 +1,26 @@
-from typing import Dict, List, Set, Union
-from App.Models import Menu, AbstractRegister, BreakfastRegister, LunchRegister
+import time
+import asyncio
+import pandas
+from typing import IO, Dict, Iterator, List, Set, Tuple, Union
+from App.Models import Menu, RegisterBatch
 from App.Server.DataCollector import MenuTransformer, RegisterTransformer
+from App.Server.DataCollector.DataTransformers.register_transformer import df_to_register_batch
+from App.Server.DataCollector.fingerprint import MENUS_KIND, REGISTERS_KIND, get_sha256_by_date, get_block_key, \
+    get_block_fingerprints
 from App.Util.constants import MenuFields, RegisterFields
 from App.Util.constants import BREAKFAST
-from App.Database.db_server import save_menus_db, save_registers_db
+from App.Util.helpers import get_file_size, to_dict
+from App.Database.db_server import save_menus_db, save_registers_db, save_fingerprints
+from App.Database import async_db_server, menu_cache
+from config.uploading_config import REGISTERS_STREAMING_MIN_SIZE, REGISTERS_SHEET_WORKERS
 
 
-def transform_menu_data(full_path_file: str) -> Dict[str, List[Menu]]:
+def transform_menu_data(file: Union[str, IO[bytes]]) -> Dict[str, List[Menu]]:
     """
     Transform a raw file to a valid dictionary of menus data grouped by catering
 
     Args:
-        full_path_file (string): Raw menu file path
+        file (Union[str, IO[bytes]]): Raw menu file path or binary file object
 
     Returns:
         Dict[str, List[Menu]]: Dictionary of menus data grouped by catering
@@ -20,44 +29,45 @@ def transform_menu_data(full_path_file: str) -> Dict[str, List[Menu]]:
         Exception: If the file has not a valid structure
     """
     try:
-        menu_transformer = MenuTransformer(full_path_file)
+        menu_transformer = MenuTransformer(file)
         dict_menus: Dict[str, List[Menu]] = menu_transformer.build()
         return dict_menus
     except IndexError as e:
         raise Exception("The file has not a valid structure for transforming to menu sample_data.")
 
 
-def transform_register_data(full_path_file: str) -> Dict[str, List[AbstractRegister]]:
+def transform_register_data(file: Union[str, IO[bytes]]) -> Tuple[Dict[str, RegisterBatch], List[Dict]]:
     """
-    Transform a raw file to a valid dictionary of registers data grouped by catering
+    Transform a raw file to a valid dictionary of register batches grouped by catering
 
     Args:
-        full_path_file (string): Raw menu file path
+        file (Union[str, IO[bytes]]): Raw register file path or seekable binary file object
 
     Returns:
-        Dict[str, List[Menu]]: Dictionary of registers data grouped by catering
+        Tuple[Dict[str, RegisterBatch], List[Dict]]: Dictionary of register batches grouped by catering and
+            diagnostics of the sheets (sheets without attendance or skipped)
 
     Raises:
         Exception: If the file has not a valid structure
     """
     try:
-        register_transformer = RegisterTransformer(full_path_file)
-        dict_registers: Dict[str, List[AbstractRegister]] = register_transformer.build()
-        return dict_registers
+        streaming = get_file_size(file) >= REGISTERS_STREAMING_MIN_SIZE
+        register_transformer = RegisterTransformer(file, streaming=streaming, workers=REGISTERS_SHEET_WORKERS)
+        dict_registers: Dict[str, RegisterBatch] = register_transformer.build_batches()
+        return dict_registers, register_transformer.get_report()
     except IndexError as e:
         raise Exception("The file has not a valid structure for transforming to register sample_data.")
 
 
-def insert_menus(catering: str, list_dict_menus: List[Dict]) -> None:
+def build_menus(list_dict_menus: List[Dict]) -> List[Menu]:
     """
-    Insert a list of menus to the given catering collection
+    Builds a list of menus from a list of menu dictionaries
 
     Args:
-        catering (string): A valid catering
-        list_dict_menus (List[Dict]): List of menu dictionaries to insert into the db
+        list_dict_menus (List[Dict]): List of menu dictionaries
 
     Returns:
-        None
+        List[Menu]: List of menus
 
     Raises:
         Exception: If there is a missing menu attribute
@@ -75,12 +85,64 @@ def insert_menus(catering: str, list_dict_menus: List[Dict]) -> None:
             menu = Menu(date=date, day=day, is_service_day=is_service_day, regular=regular, light=light, vegan=vegan,
                         vegetarian=vegetarian)
             menus.append(menu)
-        unique_dates: Set[str] = {menu.date for menu in menus}
-        save_menus_db(catering, menus, unique_dates)
+        return menus
     except KeyError as e:
         raise Exception(f"Missing key {e} on one or many menus.")
 
 
+def build_register_batch(catering: str, list_dict_registers: List[Dict]) -> RegisterBatch:
+    """
+    Builds a batch with the registers of the given catering from a list of register dictionaries, by column instead
+    of building a register instance per dictionary
+
+    Args:
+        catering (string): A valid catering
+        list_dict_registers (List[Dict]): List of register dictionaries
+
+    Returns:
+        RegisterBatch: Batch of registers
+
+    Raises:
+        Exception: If there is a missing register attribute
+    """
+    fields = [RegisterFields.DATE, RegisterFields.PERSON, RegisterFields.DIET, RegisterFields.REQUEST,
+              RegisterFields.ATTEND]
+    df = pandas.DataFrame(list_dict_registers, columns=None if list_dict_registers else fields)
+    # A register without diet is a register without request, any other missing attribute is an error
+    missing_fields = [field for field in fields if field not in df.columns or
+                      (field != RegisterFields.DIET and df[field].isna().any())]
+    if missing_fields:
+        raise Exception(f"Missing key '{missing_fields[0]}' on one or many registers for {catering}.")
+    with_extra = catering != BREAKFAST
+    if with_extra:
+        df[RegisterFields.EXTRA] = df[RegisterFields.EXTRA].fillna(False) if RegisterFields.EXTRA in df.columns \
+            else False
+    return df_to_register_batch(df, with_extra)
+
+
+def insert_menus(catering: str, list_dict_menus: List[Dict]) -> None:
+    """
+    Insert a list of menus to the given catering collection
+
+    Args:
+        catering (string): A valid catering
+        list_dict_menus (List[Dict]): List of menu dictionaries to insert into the db
+
+    Returns:
+        None
+
+    Raises:
+        Exception: If there is a missing menu attribute
+    """
+    menus: List[Menu] = build_menus(list_dict_menus)
+    unique_dates: Set[str] = {menu.date for menu in menus}
+    save_menus_db(catering, menus, unique_dates)
+    menu_cache.invalidate_menus(catering, unique_dates)
+    # The fingerprints of the dates written are overwritten, so a later ingest compares with the inserted content
+    fingerprints = get_block_fingerprints(MENUS_KIND, catering, to_dict(menus), MenuFields.DATE)
+    save_fingerprints(fingerprints)
+
+
 def insert_registers(catering: str, list_dict_registers: List[Dict]) -> None:
     """
     Insert a list of registers to the given catering collection
@@ -95,21 +157,222 @@ def insert_registers(catering: str, list_dict_registers: List[Dict]) -> None:
     Raises:
         Exception: If there is a missing register attribute
     """
-    try:
-        registers: List[Union[BreakfastRegister, LunchRegister]] = []
-        for dict_registers in list_dict_registers:
-            date = dict_registers[RegisterFields.DATE]
-            person = dict_registers[RegisterFields.PERSON]
-            diet = dict_registers[RegisterFields.DIET]
-            request = dict_registers[RegisterFields.REQUEST]
-            attend = dict_registers[RegisterFields.ATTEND]
-            if catering == BREAKFAST:
-                register = BreakfastRegister(date=date, person=person, request=request, attend=attend, diet=diet)
-            else:
-                register = LunchRegister(date=date, person=person, request=request, attend=attend, diet=diet,
-                                         extra=RegisterFields.EXTRA)
-            registers.append(register)
-        unique_dates: Set[str] = {register.date for register in registers}
-        save_registers_db(catering, registers, unique_dates)
-    except KeyError as e:
-        raise Exception(f"Missing key {e} on one or many registers for {catering}.")
+    registers: RegisterBatch = build_register_batch(catering, list_dict_registers)
+    save_registers_db(catering, registers.iter_documents(), registers.get_dates())
+    # The fingerprints of the dates written are overwritten, so a later ingest compares with the inserted content
+    fingerprints = get_block_fingerprints(REGISTERS_KIND, catering, registers.iter_documents(), RegisterFields.DATE)
+    save_fingerprints(fingerprints)
+
+
+async def insert_menus_async(catering: str, list_dict_menus: List[Dict]) -> None:
+    """
+    Insert a list of menus to the given catering collection without blocking the event loop
+
+    Args:
+        catering (string): A valid catering
+        list_dict_menus (List[Dict]): List of menu dictionaries to insert into the db
+
+    Returns:
+        None
+
+    Raises:
+        Exception: If there is a missing menu attribute
+    """
+    menus: List[Menu] = build_menus(list_dict_menus)
+    unique_dates: Set[str] = {menu.date for menu in menus}
+    await async_db_server.save_menus_db(catering, menus, unique_dates)
+    menu_cache.invalidate_menus(catering, unique_dates)
+    # The fingerprints of the dates written are overwritten, so a later ingest compares with the inserted content
+    fingerprints = get_block_fingerprints(MENUS_KIND, catering, to_dict(menus), MenuFields.DATE)
+    await async_db_server.save_fingerprints(fingerprints)
+
+
+async def insert_registers_async(catering: str, list_dict_registers: List[Dict]) -> None:
+    """
+    Insert a list of registers to the given catering collection without blocking the event loop
+
+    Args:
+        catering (string): A valid catering
+        list_dict_registers (List[Dict]): List of register dictionaries to insert into the db
+
+    Returns:
+        None
+
+    Raises:
+        Exception: If there is a missing register attribute
+    """
+    registers: RegisterBatch = build_register_batch(catering, list_dict_registers)
+    await async_db_server.save_registers_db(catering, registers.iter_documents(), registers.get_dates())
+    # The fingerprints of the dates written are overwritten, so a later ingest compares with the inserted content
+    fingerprints = get_block_fingerprints(REGISTERS_KIND, catering, registers.iter_documents(), RegisterFields.DATE)
+    await async_db_server.save_fingerprints(fingerprints)
+
+
+def get_ingest_response(counts: Dict[str, int], changed_dates: Dict[str, List[str]],
+                        skipped_dates: Dict[str, List[str]], start: float, transform_end: float) -> Dict:
+    """
+    Builds the response of an ingest: counts, content skipped and timings. The whole file is skipped when none of
+    its dates changed
+
+    Args:
+        counts (Dict[str, int]): Number of documents saved by catering
+        changed_dates (Dict[str, List[str]]): Dates saved by catering because their content changed
+        skipped_dates (Dict[str, List[str]]): Dates skipped by catering because their content did not change
+        start (float): Start time of the ingest (perf_counter)
+        transform_end (float): End time of the file transformation (perf_counter)
+
+    Returns:
+        Dict: Ingest response
+    """
+    end = time.perf_counter()
+    return {
+        'counts': counts,
+        'skipped': {'file': not any(changed_dates.values()), 'dates': skipped_dates},
+        'timings': {'transform': transform_end - start, 'save': end - transform_end, 'total': end - start}
+    }
+
+
+async def get_changed_dates(kind: str, sha256_by_catering: Dict[str, Dict[str, str]],
+                            force: bool) -> Dict[str, List[str]]:
+    """
+    Compares the per-date fingerprints of every catering with the stored ones
+
+    Args:
+        kind (str): Kind of documents (menus or registers)
+        sha256_by_catering (Dict[str, Dict[str, str]]): SHA-256 by date of every catering
+        force (bool): Consider all the dates as changed
+
+    Returns:
+        Dict[str, List[str]]: Changed dates by catering
+    """
+    keys = [get_block_key(kind, catering, date) for catering, hashes in sha256_by_catering.items() for date in hashes]
+    stored: Dict[str, str] = dict() if force else await async_db_server.get_fingerprints(keys)
+    return {catering: [date for date, sha256 in hashes.items()
+                       if stored.get(get_block_key(kind, catering, date)) != sha256]
+            for catering, hashes in sha256_by_catering.items()}
+
+
+async def save_ingest_fingerprints(kind: str, sha256_by_catering: Dict[str, Dict[str, str]],
+                                   changed_dates: Dict[str, List[str]]) -> None:
+    """
+    Saves the fingerprints of the changed per-date blocks of an ingested file
+
+    Args:
+        kind (str): Kind of documents (menus or registers)
+        sha256_by_catering (Dict[str, Dict[str, str]]): SHA-256 by date of every catering
+        changed_dates (Dict[str, List[str]]): Changed dates by catering
+
+    Returns:
+        None
+    """
+    fingerprints: Dict[str, str] = {get_block_key(kind, catering, date): sha256_by_catering[catering][date]
+                                    for catering, dates in changed_dates.items() for date in dates}
+    await async_db_server.save_fingerprints(fingerprints)
+
+
+def get_unchanged_dates(sha256_by_catering: Dict[str, Dict[str, str]],
+                        changed_dates: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """
+    Gets the dates of every catering whose content did not change
+
+    Args:
+        sha256_by_catering (Dict[str, Dict[str, str]]): SHA-256 by date of every catering
+        changed_dates (Dict[str, List[str]]): Changed dates by catering
+
+    Returns:
+        Dict[str, List[str]]: Unchanged dates by catering
+    """
+    return {catering: [date for date in hashes if date not in set(changed_dates[catering])]
+            for catering, hashes in sha256_by_catering.items()}
+
+
+async def ingest_menus_async(file: Union[str, IO[bytes]], force: bool = False) -> Dict:
+    """
+    Transforms a raw menu file and saves the menus of every catering in one server-side pass, replacing the menus of
+    the same dates with a bulk write per catering. The dates whose stored menus have the same content (same SHA-256)
+    are skipped. A file is always transformed: the dates of a file already ingested may have been replaced later by
+    another file with the same dates
+
+    Args:
+        file (Union[str, IO[bytes]]): Raw menu file path or seekable binary file object
+        force (bool): Save all the menus even if their content did not change
+
+    Returns:
+        Dict: Number of menus saved by catering, content skipped and timings in seconds
+
+    Raises:
+        Exception: If the file has not a valid structure
+    """
+    start = time.perf_counter()
+    dict_menus: Dict[str, List[Menu]] = transform_menu_data(file)
+    transform_end = time.perf_counter()
+
+    sha256_by_catering = {catering: get_sha256_by_date(to_dict(menus), MenuFields.DATE)
+                          for catering, menus in dict_menus.items()}
+    changed_dates = await get_changed_dates(MENUS_KIND, sha256_by_catering, force)
+    changed_menus = {catering: [menu for menu in dict_menus[catering] if menu.date in set(dates)]
+                     for catering, dates in changed_dates.items()}
+    await asyncio.gather(*[async_db_server.save_menus_db(catering, changed_menus[catering], dates)
+                           for catering, dates in changed_dates.items() if dates])
+    for catering, dates in changed_dates.items():
+        if dates:
+            menu_cache.invalidate_menus(catering, dates)
+    await save_ingest_fingerprints(MENUS_KIND, sha256_by_catering, changed_dates)
+
+    counts = {catering: len(menus) for catering, menus in changed_menus.items()}
+    return get_ingest_response(counts, changed_dates, get_unchanged_dates(sha256_by_catering, changed_dates), start,
+                               transform_end)
+
+
+async def ingest_registers_async(file: Union[str, IO[bytes]], force: bool = False) -> Dict:
+    """
+    Transforms a raw register file and saves the registers of every catering in one server-side pass, replacing the
+    registers of the same dates with a bulk write per catering. The dates whose stored registers have the same content
+    (same SHA-256) are skipped. A file is always transformed: the dates of a file already ingested may have been
+    replaced later by another file with the same dates
+
+    Args:
+        file (Union[str, IO[bytes]]): Raw register file path or seekable binary file object
+        force (bool): Save all the registers even if their content did not change
+
+    Returns:
+        Dict: Number of registers saved by catering, content skipped, diagnostics of the sheets and timings in
+            seconds
+
+    Raises:
+        Exception: If the file has not a valid structure
+    """
+    start = time.perf_counter()
+    dict_registers, report = transform_register_data(file)
+    transform_end = time.perf_counter()
+
+    sha256_by_catering = {catering: get_sha256_by_date(registers.iter_documents(), RegisterFields.DATE)
+                          for catering, registers in dict_registers.items()}
+    changed_dates = await get_changed_dates(REGISTERS_KIND, sha256_by_catering, force)
+    await asyncio.gather(*[
+        async_db_server.save_registers_db(catering, iter_documents_by_dates(dict_registers[catering], dates), dates)
+        for catering, dates in changed_dates.items() if dates])
+    await save_ingest_fingerprints(REGISTERS_KIND, sha256_by_catering, changed_dates)
+
+    counts_by_date = {catering: registers.count_by_date() for catering, registers in dict_registers.items()}
+    counts = {catering: sum(counts_by_date[catering][date] for date in dates)
+              for catering, dates in changed_dates.items()}
+    response = get_ingest_response(counts, changed_dates, get_unchanged_dates(sha256_by_catering, changed_dates),
+                                   start, transform_end)
+    response['report'] = report
+    return response
+
+
+def iter_documents_by_dates(registers: RegisterBatch, dates: List[str]) -> Iterator[Dict]:
+    """
+    Iterates over the register documents of the given dates
+
+    Args:
+        registers (RegisterBatch): Batch of registers
+        dates (List[str]): Dates to keep
+
+    Returns:
+        Iterator[Dict]: Register documents of the dates
+    """
+    dates = set(dates)
+    return (document for document in registers.iter_documents() if document[RegisterFields.DATE] in dates)
@@ -1,19 +1,30 @@
-from typing import List, Dict, Union
+from typing import Callable, Iterable, List, Dict, Optional, Tuple, Union
 import time
+import numpy
 import pandas
 from App.Server.Preprocessor.DatasetCreator import DatasetCreator
 from App.Server.preprocessor_server import read_menu_bow_model
-from App.Server.predictor_server import remove_prediction_model
-from App.Database.db_server import get_list_menu_docs, get_list_register_docs, save_dataset_db
+from App.Server import artifact_server
+from App.Server.Artifacts import Pointers
+from App.Database import menu_cache
+from App.Database.db_server import get_list_menu_docs, get_list_register_docs, get_register_columns, save_dataset_db
 from App.Util.constants import RegisterFields
+from App.Util.helpers import notify_stage, count_rows
+from App.Util.metrics import StageTimer, time_stage
+from App.Server.Jobs.single_flight import single_flight
+from config import BULK_READ_COLUMNAR
 
+# Stages of the training dataset build, in order
+DATASET_BUILD_STAGES = ['read_registers', 'read_menus', 'read_bow', 'build_dataset', 'save_dataset']
 
-def get_menus_dataframe_from_db(catering: str) -> pandas.DataFrame:
+
+def get_menus_dataframe_from_db(catering: str, timer: Optional[StageTimer] = None) -> pandas.DataFrame:
     """
     Gets a menus dataframe from all the menu documents given a catering collection
 
     Args:
         catering (string): A valid catering
+        timer (Optional[StageTimer]): Timer of the build, to time the read and the dataframe construction
 
     Returns:
         pandas.DataFrame: Menus dataframe from all the menu documents in the db
@@ -21,19 +32,46 @@ def get_menus_dataframe_from_db(catering: str) -> pandas.DataFrame:
     Raises:
         Exception: If there is no documents on the catering collection
     """
-    data: List[Dict] = get_list_menu_docs(catering)
+    timer = timer if timer is not None else StageTimer('dataset', catering)
+    with timer.stage('fetch_menus') as stage:
+        data: List[Dict] = get_list_menu_docs(catering)
+        stage['rows'] = len(data)
     if len(data) == 0:
         raise Exception(f"Empty menus collection")
+    with timer.stage('build_menus_dataframe') as stage:
+        df = pandas.DataFrame(data=data)
+        stage['rows'] = len(df)
+    return df
+
+
+def get_menus_dataframe_by_dates(catering: str, dates: Iterable[str]) -> pandas.DataFrame:
+    """
+    Gets a menus dataframe with the menus of the given dates (read through the in-process menu cache)
+
+    Args:
+        catering (string): A valid catering
+        dates (Iterable[str]): Dates of the menus
+
+    Returns:
+        pandas.DataFrame: Menus dataframe of the given dates
+
+    Raises:
+        Exception: If there is no menu for the given dates
+    """
+    data: List[Dict] = menu_cache.get_menus_by_dates(catering, dates)
+    if len(data) == 0:
+        raise Exception(f"There are no menus for the given dates")
     df = pandas.DataFrame(data=data)
     return df
 
 
-def get_registers_dataframe_from_db(catering: str) -> pandas.DataFrame:
+def get_registers_dataframe_from_db(catering: str, timer: Optional[StageTimer] = None) -> pandas.DataFrame:
     """
     Gets a registers dataframe from all the register documents given a catering collection
 
     Args:
         catering (string): A valid catering
+        timer (Optional[StageTimer]): Timer of the build, to time the read and the dataframe construction
 
     Returns:
         pandas.DataFrame: Registers dataframe from all the register documents in the db
@@ -41,10 +79,16 @@ def get_registers_dataframe_from_db(catering: str) -> pandas.DataFrame:
     Raises:
         Exception: If there is no documents on the catering collection
     """
-    data: List[Dict] = get_list_register_docs(catering)
+    timer = timer if timer is not None else StageTimer('dataset', catering)
+    with timer.stage('fetch_registers') as stage:
+        data: Union[List[Dict], Dict[str, numpy.ndarray]] = get_register_columns(catering) if BULK_READ_COLUMNAR \
+            else get_list_register_docs(catering)
+        stage['rows'] = count_rows(data)
     if len(data) == 0:
         raise Exception(f"Empty registers collection")
-    df = pandas.DataFrame(data=data)
+    with timer.stage('build_registers_dataframe') as stage:
+        df = pandas.DataFrame(data=data)
+        stage['rows'] = len(df)
     return df
 
 
@@ -78,36 +122,53 @@ def get_registers_dataframe_from_raw_dict(raw_registers: List[Dict], ignore_atte
     return df
 
 
-def build_training_dataset(catering: str) -> float:
+@single_flight('dataset')
+def build_training_dataset(catering: str, on_stage: Optional[Callable[[str], None]] = None) \
+        -> Tuple[float, List[Dict]]:
     """
     Creates and saves the training dataset from all the preprocessed menus (BoW features) and grouped records
 
     Args:
         catering (string): A valid catering
+        on_stage (Optional[Callable[[str], None]]): Callback notified when every stage of DATASET_BUILD_STAGES starts
 
     Returns:
-        pandas.DataFrame: Registers dataframe
+        float: Time elapsed
+        List[Dict]: Time and rows of every stage of the build (see `StageTimer`)
 
     Raises:
         Exception: If there is missing a column (attribute) in any menus or registers datasets
     """
     try:
         start: float = time.time()
-        # Remove old prediction model
-        remove_prediction_model(catering)
-
-        df_registers = get_registers_dataframe_from_db(catering)
-        df_menus = get_menus_dataframe_from_db(catering)
-        bow_menus = read_menu_bow_model(catering)
-
+        timer = StageTimer('dataset', catering)
+        notify_stage(on_stage, 'read_registers')
+        df_registers = get_registers_dataframe_from_db(catering, timer)
+        notify_stage(on_stage, 'read_menus')
+        df_menus = get_menus_dataframe_from_db(catering, timer)
+        notify_stage(on_stage, 'read_bow')
+        with timer.stage('read_bow'):
+            # The builds of the catering are serialized, so the newest BoW model does not change during the build
+            bow_version = artifact_server.get_latest_bow_version(catering)
+            bow_menus = read_menu_bow_model(catering, Pointers.LATEST)
+
+        notify_stage(on_stage, 'build_dataset')
         dataset_creator = DatasetCreator(df_registers, df_menus, bow_menus)
+        build_start = time.perf_counter()
         dataset: List[Dict[str, Union[str, int]]] = dataset_creator.build()
+        # The menus are vectorized while the registers are grouped by date and diet
+        timer.add('vectorize', dataset_creator.vectorize_time, dataset_creator.vectorized_texts)
+        timer.add('aggregate', time.perf_counter() - build_start - dataset_creator.vectorize_time, len(dataset))
 
-        save_dataset_db(catering, dataset)
+        notify_stage(on_stage, 'save_dataset')
+        with timer.stage('save_dataset') as stage:
+            save_dataset_db(catering, dataset)
+            artifact_server.set_dataset_bow_version(catering, bow_version)
+            stage['rows'] = len(dataset)
 
         end: float = time.time()
         time_elapsed: float = end - start
-        return time_elapsed
+        return time_elapsed, timer.log()
     except KeyError as e:
         raise Exception(f"Missing column {e} on the registers or menus collection.")
 
@@ -130,11 +191,12 @@ def transform_test_dataset(catering: str, raw_registers: List[Dict], ignore_atte
     """
     try:
         df_registers = get_registers_dataframe_from_raw_dict(raw_registers, ignore_attend)
-        df_menus = get_menus_dataframe_from_db(catering)
+        df_menus = get_menus_dataframe_by_dates(catering, df_registers[RegisterFields.DATE].unique().tolist())
         bow_menus = read_menu_bow_model(catering)
 
         dataset_creator = DatasetCreator(df_registers, df_menus, bow_menus)
-        dataset: List[Dict[str, Union[str, int]]] = dataset_creator.build(ignore_attend)
+        with time_stage('vectorize_test_data', catering):
+            dataset: List[Dict[str, Union[str, int]]] = dataset_creator.build(ignore_attend)
         return dataset
     except KeyError as e:
         raise Exception(f"Missing key {e} on one or many registers for {catering}.")
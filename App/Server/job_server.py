@@ -0,0 +1,193 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from App.Server import dataset_creator_server, predictor_server, preprocessor_server, pipeline_server
+from App.Server.Jobs import JobManager, JobFields
+from config import JOB_WORKERS
+
+
+class JobKinds:
+    MENU_BOW = 'menu_bow'
+    TRAIN_DATASET = 'train_dataset'
+    PREDICTION_MODEL = 'prediction_model'
+    TRAIN_PERFORMANCE = 'train_performance'
+    PIPELINE = 'pipeline'
+
+
+_job_manager: Optional[JobManager] = None
+
+
+def get_job_manager() -> JobManager:
+    """
+    Gets the job manager shared by the process to run the background jobs
+
+    Returns:
+        JobManager: Job manager
+    """
+    global _job_manager
+    if _job_manager is None:
+        _job_manager = JobManager(JOB_WORKERS)
+    return _job_manager
+
+
+def run_menu_bow_build(catering: str, on_stage: Optional[Callable[[str], None]] = None) -> Dict:
+    """
+    Builds the menu BoW model of a catering
+
+    Args:
+        catering (string): A valid catering
+        on_stage (Optional[Callable[[str], None]]): Callback notified when every stage starts
+
+    Returns:
+        Dict: Time elapsed, time of every stage and BoW features
+    """
+    time_elapsed, features, stages = preprocessor_server.build_menus_bow_model(catering, on_stage)
+    return {
+        "time": f"{round(time_elapsed, 4)} sec",
+        "stages": stages,
+        "features": features
+    }
+
+
+def run_train_dataset_build(catering: str, on_stage: Optional[Callable[[str], None]] = None) -> Dict:
+    """
+    Builds the training dataset of a catering
+
+    Args:
+        catering (string): A valid catering
+        on_stage (Optional[Callable[[str], None]]): Callback notified when every stage starts
+
+    Returns:
+        Dict: Saved status, time elapsed and time of every stage
+    """
+    time_elapsed, stages = dataset_creator_server.build_training_dataset(catering, on_stage)
+    return {
+        "saved": "ok",
+        "time": f"{round(time_elapsed, 4)} sec",
+        "stages": stages,
+    }
+
+
+def run_prediction_model_build(catering: str, on_stage: Optional[Callable[[str], None]] = None) -> Dict:
+    """
+    Trains and saves the prediction model of a catering
+
+    Args:
+        catering (string): A valid catering
+        on_stage (Optional[Callable[[str], None]]): Callback notified when every stage starts
+
+    Returns:
+        Dict: Time elapsed, time of every stage and catering
+    """
+    time_elapsed, stages = predictor_server.build_prediction_model(catering, on_stage)
+    return {
+        "time": f"{round(time_elapsed, 4)} sec",
+        "stages": stages,
+        "catering": catering,
+    }
+
+
+def run_train_performance(catering: str, on_stage: Optional[Callable[[str], None]] = None) -> Dict:
+    """
+    Evaluates the training performance of the prediction model of a catering
+
+    Args:
+        catering (string): A valid catering
+        on_stage (Optional[Callable[[str], None]]): Callback notified when every stage starts
+
+    Returns:
+        Dict: Time elapsed, time of every stage, catering, model name and scores
+    """
+    time_elapsed, model_name, model, cross_val_r2_mean_train, cross_val_r2_std_train, r2_valid, stages = \
+        predictor_server.evaluate_train_model_performance(catering, on_stage)
+    return {
+        "time": f"{round(time_elapsed, 4)} sec",
+        "stages": stages,
+        "catering": catering,
+        "model_name": model_name,
+        "cross_val_r2_mean_train": float(cross_val_r2_mean_train),
+        "cross_val_r2_std_train": float(cross_val_r2_std_train),
+        "r2_valid": float(r2_valid)
+    }
+
+
+# Function and stages of every kind of job
+JOBS: Dict[str, Tuple[Callable[[str, Optional[Callable[[str], None]]], Dict], List[str]]] = {
+    JobKinds.MENU_BOW: (run_menu_bow_build, preprocessor_server.BOW_BUILD_STAGES),
+    JobKinds.TRAIN_DATASET: (run_train_dataset_build, dataset_creator_server.DATASET_BUILD_STAGES),
+    JobKinds.PREDICTION_MODEL: (run_prediction_model_build, predictor_server.MODEL_BUILD_STAGES),
+    JobKinds.TRAIN_PERFORMANCE: (run_train_performance, predictor_server.EVALUATION_STAGES),
+}
+
+
+def submit_job(kind: str, catering: str) -> Dict:
+    """
+    Queues a background job for a catering
+
+    Args:
+        kind (str): Kind of job, see `JobKinds`
+        catering (string): A valid catering
+
+    Returns:
+        Dict: Job record
+
+    Raises:
+        Exception: If an invalid kind of job is given
+    """
+    if kind not in JOBS:
+        raise Exception(f"Invalid job kind '{kind}'. Valid job kinds: {list(JOBS.keys())}")
+    func, stages = JOBS[kind]
+    return get_job_manager().submit(kind, catering, lambda on_stage: func(catering, on_stage), stages)
+
+
+def submit_pipeline_job(force: bool = False) -> Dict:
+    """
+    Queues a background job bringing the artifacts of all the caterings up to date
+
+    Args:
+        force (bool): Build every stage even if it is up to date
+
+    Returns:
+        Dict: Job record
+    """
+    return get_job_manager().submit(JobKinds.PIPELINE, None,
+                                    lambda on_stage: pipeline_server.run_pipeline(force, on_stage),
+                                    pipeline_server.PIPELINE_STAGES)
+
+
+def get_job(job_id: str) -> Optional[Dict]:
+    """
+    Gets the record of a background job
+
+    Args:
+        job_id (str): Job identifier
+
+    Returns:
+        Optional[Dict]: Job record, None if it was not found
+    """
+    return get_job_manager().get(job_id)
+
+
+def cancel_job(job_id: str) -> Optional[Dict]:
+    """
+    Requests the cancellation of a background job
+
+    Args:
+        job_id (str): Job identifier
+
+    Returns:
+        Optional[Dict]: Job record, None if it was not found
+    """
+    return get_job_manager().cancel(job_id)
+
+
+def job_to_status(job: Dict) -> Dict:
+    """
+    Gets the public status of a job record, without its result
+
+    Args:
+        job (Dict): Job record
+
+    Returns:
+        Dict: Job status
+    """
+    status = {field: value for field, value in job.items() if field not in (JobFields.ID, JobFields.RESULT)}
+    return {'id': job[JobFields.ID], **status}
@@ -0,0 +1,229 @@
+import json
+import time
+import hashlib
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from termcolor import cprint
+from App.Database.db_server import get_list_menu_docs, get_list_register_docs, has_dataset_docs, get_fingerprints, \
+    save_fingerprints
+from App.Server import artifact_server, dataset_creator_server, predictor_server, preprocessor_server
+from App.Server.DataCollector.fingerprint import get_documents_sha256
+from App.Util.constants import CATERINGS, DIETS, BOW_MAX_FEATURES
+from App.Util.helpers import notify_stage
+from config import prediction_config
+
+COLOR = 'magenta'
+
+FINGERPRINT_STAGE = 'fingerprint'
+BOW_STAGE = 'bow'
+DATASET_STAGE = 'dataset'
+MODEL_STAGE = 'model'
+# Build stages in dependency order: menus -> BoW, menus + registers + BoW -> dataset, dataset -> model
+BUILD_STAGES = [BOW_STAGE, DATASET_STAGE, MODEL_STAGE]
+# Stages of a pipeline run, in order. Every build stage runs for all the caterings at the same time
+PIPELINE_STAGES = [FINGERPRINT_STAGE, *BUILD_STAGES]
+
+
+class StageResult:
+    BUILT = 'built'
+    SKIPPED = 'skipped'
+    FAILED = 'failed'
+    BLOCKED = 'blocked'
+
+
+def get_stage_key(catering: str, stage: str) -> str:
+    """
+    Gets the fingerprint key of the last build of a stage
+
+    Args:
+        catering (string): A valid catering
+        stage (str): Build stage
+
+    Returns:
+        str: Fingerprint key
+    """
+    return f'pipeline:{catering}:{stage}'
+
+
+def combine_sha256(*values: str) -> str:
+    """
+    Gets the SHA-256 of a list of values (i.e. the fingerprints of the inputs of a stage)
+
+    Args:
+        *values (str): Values to combine, in order
+
+    Returns:
+        str: Hexadecimal SHA-256
+    """
+    return hashlib.sha256('\n'.join(values).encode('utf-8')).hexdigest()
+
+
+def get_config_sha256(config: Dict) -> str:
+    """
+    Gets the SHA-256 of the configuration of a stage
+
+    Args:
+        config (Dict): Configuration values by name
+
+    Returns:
+        str: Hexadecimal SHA-256
+    """
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def get_stage_fingerprints(catering: str) -> Dict[str, str]:
+    """
+    Computes the fingerprint of every build stage of a catering from the content of its inputs and its configuration.
+    The fingerprint of a stage includes the fingerprints of its upstream stages, so a change is propagated downstream
+
+    Args:
+        catering (string): A valid catering
+
+    Returns:
+        Dict[str, str]: Fingerprint by build stage
+    """
+    menus_sha256 = get_documents_sha256(get_list_menu_docs(catering))
+    registers_sha256 = get_documents_sha256(get_list_register_docs(catering))
+    bow_config = get_config_sha256({'diets': DIETS, 'max_features': BOW_MAX_FEATURES})
+    model_config = get_config_sha256({name: getattr(prediction_config, name) for name in dir(prediction_config)
+                                      if name.isupper()})
+    bow = combine_sha256(menus_sha256, bow_config)
+    dataset = combine_sha256(bow, menus_sha256, registers_sha256)
+    model = combine_sha256(dataset, model_config)
+    return {BOW_STAGE: bow, DATASET_STAGE: dataset, MODEL_STAGE: model}
+
+
+def is_artifact_present(catering: str, stage: str) -> bool:
+    """
+    Checks if the artifact built by a stage exists
+
+    Args:
+        catering (string): A valid catering
+        stage (str): Build stage
+
+    Returns:
+        bool: True if the artifact exists
+    """
+    if stage == BOW_STAGE:
+        return artifact_server.has_bow_model(catering)
+    if stage == DATASET_STAGE:
+        return has_dataset_docs(catering)
+    return artifact_server.has_prediction_model(catering)
+
+
+def build_stage(catering: str, stage: str) -> Tuple[float, List[Dict]]:
+    """
+    Builds the artifact of a stage
+
+    Args:
+        catering (string): A valid catering
+        stage (str): Build stage
+
+    Returns:
+        float: Time elapsed
+        List[Dict]: Time and rows of every stage of the build
+    """
+    if stage == BOW_STAGE:
+        time_elapsed, _, stages = preprocessor_server.build_menus_bow_model(catering)
+    elif stage == DATASET_STAGE:
+        time_elapsed, stages = dataset_creator_server.build_training_dataset(catering)
+    else:
+        time_elapsed, stages = predictor_server.build_prediction_model(catering)
+    return time_elapsed, stages
+
+
+def get_build_reason(catering: str, stage: str, fingerprint: str, stored_fingerprint: Optional[str],
+                     upstream_built: bool, force: bool) -> Optional[str]:
+    """
+    Gets the reason to build a stage
+
+    Args:
+        catering (string): A valid catering
+        stage (str): Build stage
+        fingerprint (str): Current fingerprint of the stage
+        stored_fingerprint (Optional[str]): Fingerprint of the last build of the stage
+        upstream_built (bool): True if an upstream stage was built on this run
+        force (bool): Build every stage
+
+    Returns:
+        Optional[str]: Reason to build the stage, None if it is up to date
+    """
+    if force:
+        return 'forced'
+    if upstream_built:
+        return 'upstream stage built'
+    if fingerprint != stored_fingerprint:
+        return 'inputs changed'
+    if not is_artifact_present(catering, stage):
+        return 'missing artifact'
+    return None
+
+
+def run_pipeline(force: bool = False, on_stage: Optional[Callable[[str], None]] = None) -> Dict:
+    """
+    Brings the BoW model, training dataset and prediction model of every catering up to date. Only the stages whose
+    inputs changed (or whose artifact is missing) are built, and the caterings are built at the same time
+
+    Args:
+        force (bool): Build every stage even if it is up to date
+        on_stage (Optional[Callable[[str], None]]): Callback notified when every stage of PIPELINE_STAGES starts
+
+    Returns:
+        Dict: Time elapsed and, by catering, the result, reason, time elapsed (and time of every step) or error of
+            every stage
+    """
+    start = time.time()
+    report: Dict[str, Dict[str, Dict]] = {catering: dict() for catering in CATERINGS}
+    with ThreadPoolExecutor(max_workers=len(CATERINGS), thread_name_prefix='pipeline') as executor:
+        notify_stage(on_stage, FINGERPRINT_STAGE)
+        fingerprints: Dict[str, Dict[str, str]] = dict(zip(CATERINGS, executor.map(get_stage_fingerprints,
+                                                                                   CATERINGS)))
+        stored = get_fingerprints([get_stage_key(catering, stage) for catering in CATERINGS for stage in BUILD_STAGES])
+
+        for stage in BUILD_STAGES:
+            notify_stage(on_stage, stage)
+            pending: Dict[str, str] = dict()
+            for catering in CATERINGS:
+                upstream = [report[catering][upstream_stage]['result']
+                            for upstream_stage in BUILD_STAGES[:BUILD_STAGES.index(stage)]]
+                if any(result in (StageResult.FAILED, StageResult.BLOCKED) for result in upstream):
+                    report[catering][stage] = {'result': StageResult.BLOCKED}
+                    continue
+                reason = get_build_reason(catering, stage, fingerprints[catering][stage],
+                                          stored.get(get_stage_key(catering, stage)),
+                                          StageResult.BUILT in upstream, force)
+                if reason is None:
+                    report[catering][stage] = {'result': StageResult.SKIPPED}
+                else:
+                    pending[catering] = reason
+
+            def build(catering: str) -> Dict:
+                cprint(f"Building {stage} of {catering} ({pending[catering]})", COLOR)
+                try:
+                    time_elapsed, stages = build_stage(catering, stage)
+                    save_fingerprints({get_stage_key(catering, stage): fingerprints[catering][stage]})
+                    return {'result': StageResult.BUILT, 'reason': pending[catering],
+                            'time': f"{round(time_elapsed, 4)} sec", 'stages': stages}
+                except Exception as e:
+                    traceback.print_exc()
+                    return {'result': StageResult.FAILED, 'reason': pending[catering], 'error': str(e)}
+
+            for catering, stage_report in zip(pending.keys(), executor.map(build, pending.keys())):
+                report[catering][stage] = stage_report
+
+    return {'time': f"{round(time.time() - start, 4)} sec", 'caterings': report}
+
+
+def is_pipeline_failed(report: Dict) -> bool:
+    """
+    Checks if any stage of a pipeline run failed
+
+    Args:
+        report (Dict): Report returned by `run_pipeline`
+
+    Returns:
+        bool: True if any stage failed
+    """
+    return any(stage_report['result'] == StageResult.FAILED
+               for catering_report in report['caterings'].values() for stage_report in catering_report.values())
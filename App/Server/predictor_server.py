@@ -1,30 +1,23 @@
-import os
 import time
-from typing import List, Dict, Tuple, Callable
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple, Callable
 import pandas
-from sklearn.model_selection import train_test_split
-from App.Database.db_server import get_dataset_docs
-from App.Server.Predictor import build_regression_model, evaluate_models
-from App.Server.Predictor.regression import AbstractRegression
-from App.Util.constants import DatasetFields, PREDICTION_MODEL_FILE_PATH
-from App.Util.helpers import save_object_to_pkl_file, read_object_from_pkl_file
-from config import prediction_config
+from App.Database.db_server import get_dataset_docs, get_dataset_columns
+from App.Database import async_db_server
+from App.Util.constants import DatasetFields
+from App.Util.helpers import notify_stage, count_rows
+from App.Util.metrics import StageTimer, time_stage
+from App.Server.Jobs.single_flight import single_flight
+from App.Server import artifact_server
+from config import prediction_config, BULK_READ_COLUMNAR
+
+if TYPE_CHECKING:
+    from App.Server.Predictor.regression import AbstractRegression
 
 ID = '_id'
 PREDICTION = "prediction"
-
-
-def get_file_name_model(catering: str) -> str:
-    """
-    Gets the proper full path file name of the prediction model
-
-    Args:
-        catering (string): A valid catering
-
-    Returns:
-        str: Full path file name of the prediction model
-    """
-    return f"{PREDICTION_MODEL_FILE_PATH}{catering}.pkl"
+# Stages of the model evaluation and the model build, in order
+EVALUATION_STAGES = ['read_dataset', 'fit_model', 'evaluate_model']
+MODEL_BUILD_STAGES = ['read_dataset', 'fit_model', 'save_model']
 
 
 def get_dataset(catering: str) -> List[Dict]:
@@ -46,35 +39,46 @@ def get_dataset(catering: str) -> List[Dict]:
     return dataset
 
 
-def get_vars_from_dataset(catering: str) -> Tuple[pandas.DataFrame, pandas.DataFrame]:
+def get_vars_from_dataset(catering: str, timer: Optional[StageTimer] = None) \
+        -> Tuple[pandas.DataFrame, pandas.DataFrame]:
     """
     Gets all the attributes (columns) in the training dataset
 
     Args:
         catering (string): A valid catering
+        timer (Optional[StageTimer]): Timer of the build, to time the read and the dataframe construction
 
     Returns:
         pandas.DataFrame: Records of the independent variable from the dataset
         pandas.DataFrame: Records of the dependent variable from the dataset
     """
-    dataset = get_dataset(catering)
-    df = pandas.DataFrame(data=dataset).set_index(ID)
-    df[DatasetFields.DATE] = pandas.to_datetime(df[DatasetFields.DATE])
-    df = df.sort_values(by=[DatasetFields.DATE, DatasetFields.DIET], ascending=True)
-    # Remove rows with missing target, separate target from predictors
-    df.dropna(axis=0, subset=[prediction_config.TARGET_COLUMN], inplace=True)
+    timer = timer if timer is not None else StageTimer('model', catering)
+    with timer.stage('fetch_dataset') as stage:
+        dataset = get_dataset_columns(catering) if BULK_READ_COLUMNAR else get_dataset_docs(catering)
+        stage['rows'] = count_rows(dataset)
+    if len(dataset) == 0:
+        raise Exception("Empty training dataset, you need to build first the training dataset before use it.")
+    with timer.stage('build_dataframe') as stage:
+        df = pandas.DataFrame(data=dataset).set_index(ID)
+        df[DatasetFields.DATE] = pandas.to_datetime(df[DatasetFields.DATE])
+        df = df.sort_values(by=[DatasetFields.DATE, DatasetFields.DIET], ascending=True)
+        # Remove rows with missing target, separate target from predictors
+        df.dropna(axis=0, subset=[prediction_config.TARGET_COLUMN], inplace=True)
+        stage['rows'] = len(df)
 
     y = df[prediction_config.TARGET_COLUMN]
     X = df.drop([prediction_config.TARGET_COLUMN, *prediction_config.EXCLUDE_COLS], axis=1)
     return X, y
 
 
-def evaluate_train_model_performance(catering: str) -> Tuple[float, str, AbstractRegression, float, float, float]:
+def evaluate_train_model_performance(catering: str, on_stage: Optional[Callable[[str], None]] = None) \
+        -> Tuple[float, str, 'AbstractRegression', float, float, float, List[Dict]]:
     """
     Evaluates the training process dividing all the data into two dataset (training and validation)
 
     Args:
         catering (string): A valid catering
+        on_stage (Optional[Callable[[str], None]]): Callback notified when every stage of EVALUATION_STAGES starts
 
     Returns:
         float: Time elapsed
@@ -83,149 +87,192 @@ def evaluate_train_model_performance(catering: str) -> Tuple[float, str, Abstrac
         float: Mean of the cross-validation R2 score from the training data
         float: Standard deviation of the cross-validation R2 score from the training data
         float: R2 score from the validation data
+        List[Dict]: Time and rows of every stage of the evaluation (see `StageTimer`)
     """
+    # The ML stack is imported on the first training, not on the startup of the service
+    from sklearn.model_selection import train_test_split
+    from App.Server.Predictor import build_regression_model, evaluate_models
+
     start: float = time.time()
-    independent_vars, dependent_var = get_vars_from_dataset(catering)
+    timer = StageTimer('evaluation', catering)
+    notify_stage(on_stage, 'read_dataset')
+    independent_vars, dependent_var = get_vars_from_dataset(catering, timer)
+    notify_stage(on_stage, 'fit_model')
     x_train, x_valid, y_train, y_valid = train_test_split(independent_vars, dependent_var,
                                                           test_size=prediction_config.TEST_SIZE_PROPORTION,
                                                           random_state=prediction_config.RANDOM_STATE)
-    models_dict = build_regression_model(x_train=x_train, y_train=y_train,
-                                         model_names=prediction_config.MODELS,
-                                         max_cardinality=prediction_config.MAX_CARDINALITY,
-                                         estimators=prediction_config.ESTIMATORS,
-                                         svr_kernel=prediction_config.SVR_KERNEL,
-                                         poly_degree=prediction_config.POLY_DEGREE,
-                                         max_depth=prediction_config.MAX_DEPTH,
-                                         random_state=prediction_config.RANDOM_STATE)
+    with timer.stage('fit') as stage:
+        models_dict = build_regression_model(x_train=x_train, y_train=y_train,
+                                             model_names=prediction_config.MODELS,
+                                             max_cardinality=prediction_config.MAX_CARDINALITY,
+                                             estimators=prediction_config.ESTIMATORS,
+                                             svr_kernel=prediction_config.SVR_KERNEL,
+                                             poly_degree=prediction_config.POLY_DEGREE,
+                                             max_depth=prediction_config.MAX_DEPTH,
+                                             random_state=prediction_config.RANDOM_STATE)
+        stage['rows'] = len(x_train)
 
     model_name = list(models_dict.keys())[0]
     model = models_dict[model_name]
-    evaluation = evaluate_models(model_name=model_name, model=model, x_train=x_train, y_train=y_train, x_valid=x_valid,
-                                 y_valid=y_valid, predict_samples=prediction_config.PREDICT_SAMPLES,
-                                 num_repeats=prediction_config.NUM_FOLDS, num_folds=prediction_config.NUM_FOLDS,
-                                 scoring=prediction_config.SCORING, random_state=prediction_config.RANDOM_STATE)
+    notify_stage(on_stage, 'evaluate_model')
+    # The validation score only predicts once, the repeated cross-validation fits take most of the evaluation
+    with timer.stage('cross_validation') as stage:
+        evaluation = evaluate_models(model_name=model_name, model=model, x_train=x_train, y_train=y_train,
+                                     x_valid=x_valid, y_valid=y_valid,
+                                     predict_samples=prediction_config.PREDICT_SAMPLES,
+                                     num_repeats=prediction_config.NUM_FOLDS, num_folds=prediction_config.NUM_FOLDS,
+                                     scoring=prediction_config.SCORING, random_state=prediction_config.RANDOM_STATE)
+        stage['rows'] = len(x_train)
     cross_val_r2_mean_train, cross_val_r2_std_train, r2_valid = evaluation
     end: float = time.time()
     time_elapsed = end - start
-    return time_elapsed, model_name, model, cross_val_r2_mean_train, cross_val_r2_std_train, r2_valid
+    return time_elapsed, model_name, model, cross_val_r2_mean_train, cross_val_r2_std_train, r2_valid, timer.log()
 
 
-def remove_prediction_model(catering: str) -> None:
+@single_flight('model')
+def build_prediction_model(catering: str, on_stage: Optional[Callable[[str], None]] = None) \
+        -> Tuple[float, List[Dict]]:
     """
-    Removes the prediction model file in order to avoid unwanted behaviors in the training/prediction process
+    Trains and builds a prediction model given a catering
 
     Args:
         catering (string): A valid catering
+        on_stage (Optional[Callable[[str], None]]): Callback notified when every stage of MODEL_BUILD_STAGES starts
 
     Returns:
-        None
+        float: time elapsed
+        List[Dict]: Time and rows of every stage of the build (see `StageTimer`)
     """
-    regression_model_file_path = get_file_name_model(catering)
-    if os.path.exists(regression_model_file_path):
-        os.remove(regression_model_file_path)
+    from App.Server.Predictor import build_regression_model
 
+    start: float = time.time()
+    timer = StageTimer('model', catering)
+    notify_stage(on_stage, 'read_dataset')
+    independent_vars, dependent_var = get_vars_from_dataset(catering, timer)
+    notify_stage(on_stage, 'fit_model')
+    with timer.stage('fit') as stage:
+        models_dict = build_regression_model(x_train=independent_vars, y_train=dependent_var,
+                                             model_names=prediction_config.MODELS,
+                                             max_cardinality=prediction_config.MAX_CARDINALITY,
+                                             estimators=prediction_config.ESTIMATORS,
+                                             svr_kernel=prediction_config.SVR_KERNEL,
+                                             poly_degree=prediction_config.POLY_DEGREE,
+                                             max_depth=prediction_config.MAX_DEPTH,
+                                             random_state=prediction_config.RANDOM_STATE)
+        stage['rows'] = len(independent_vars)
+
+    model_name: str = list(models_dict.keys())[0]
+    model: 'AbstractRegression' = models_dict[model_name]
+    notify_stage(on_stage, 'save_model')
+    # The fields of the test data are kept with the model, so the served model does not depend on the stored dataset
+    fields = sorted({ID, *independent_vars.columns, *prediction_config.EXCLUDE_COLS})
+    with timer.stage('serialize'):
+        artifact_server.publish_prediction_model(catering, model, {'model_name': model_name, 'fields': fields})
 
-def build_prediction_model(catering: str) -> float:
+    end: float = time.time()
+    time_elapsed = end - start
+    return time_elapsed, timer.log()
+
+
+def read_prediction_model(catering: str) -> 'AbstractRegression':
     """
-    Trains and builds a prediction model given a catering
+    Reads the served prediction model given a catering
 
     Args:
         catering (string): A valid catering
 
     Returns:
-        float: time elapsed
-    """
-    start: float = time.time()
-    remove_prediction_model(catering)
-    independent_vars, dependent_var = get_vars_from_dataset(catering)
-    models_dict = build_regression_model(x_train=independent_vars, y_train=dependent_var,
-                                         model_names=prediction_config.MODELS,
-                                         max_cardinality=prediction_config.MAX_CARDINALITY,
-                                         estimators=prediction_config.ESTIMATORS,
-                                         svr_kernel=prediction_config.SVR_KERNEL,
-                                         poly_degree=prediction_config.POLY_DEGREE,
-                                         max_depth=prediction_config.MAX_DEPTH,
-                                         random_state=prediction_config.RANDOM_STATE)
-
-    model_name: str = list(models_dict.keys())[0]
-    model: AbstractRegression = models_dict[model_name]
-    save_object_to_pkl_file(model, get_file_name_model(catering))
+        AbstractRegression: Pre-built prediction model
 
-    end: float = time.time()
-    time_elapsed = end - start
-    return time_elapsed
+    Raises:
+        Exception: if the pre-built prediction model was not found
+    """
+    return read_serving_model(catering)[0]
 
 
-def read_prediction_model(catering: str) -> AbstractRegression:
+def read_serving_model(catering: str) -> Tuple['AbstractRegression', Optional[List[str]]]:
     """
-    Reads a pre-built prediction model given a catering
+    Reads the served prediction model given a catering and the fields of its test data
 
     Args:
         catering (string): A valid catering
 
     Returns:
         AbstractRegression: Pre-built prediction model
+        Optional[List[str]]: Fields of the test data, None for a model saved before the versioned store
 
     Raises:
         Exception: if the pre-built prediction model was not found
     """
-    file_path = get_file_name_model(catering)
+    file_path, manifest = artifact_server.get_serving_model(catering)
     try:
-        regression_model: AbstractRegression = read_object_from_pkl_file(file_path)
+        regression_model: 'AbstractRegression' = artifact_server.load_artifact(file_path)
     except Exception as e:
         if str(e).find('file does not exist') != -1:
             raise Exception(
                 f"The prediction model file for {catering} does not exist. In order to predict you need to build the "
                 f"model first.")
         raise e
-    return regression_model
+    return regression_model, None if manifest is None else manifest['fields']
 
 
-def validate_raw_test_data(func: Callable) -> Callable:
+def get_test_data_fields(dataset: List[Dict]) -> List[str]:
     """
-    Decorator that validates the attributes of a given raw test data
+    Gets the fields of the test data from the training dataset (all of them except the target), used for the models
+    saved before the versioned store
 
     Args:
-        func (Callable): Function to call after the validation
+        dataset (List[Dict]): Training dataset of the catering
 
     Returns:
-        Callable: Wrapper function
+        List[str]: Fields of the test data
 
     Raises:
-        Exception: if there is missing or extra fields on the raw data
+        Exception: If the training dataset is empty
     """
+    if len(dataset) == 0:
+        raise Exception("Empty training dataset, you need to build first the training dataset before use it.")
+    fields = set(dataset[0].keys())
+    fields.discard(DatasetFields.ATTEND)
+    return sorted(fields)
+
 
-    def decorator(catering: str, raw_test_data: List[Dict]):
-        # Obtaining the fields that must have the test data
-        required_fields = set(get_dataset(catering)[0].keys())
-        required_fields.discard(DatasetFields.ATTEND)
-        for data in raw_test_data:
-            data_fields = set(data.keys())
-            if required_fields != data_fields:
-                missing = required_fields - data_fields
-                no_required = data_fields - required_fields
-                missing_str = f"One or more records not contain {missing} field(s). " if missing else ''
-                no_required_str = f"Fields not required: {no_required}. " if no_required else ''
-                raise Exception(f"{missing_str}{no_required_str}")
-        return func(catering, raw_test_data)
+def validate_test_data_fields(fields: List[str], raw_test_data: List[Dict]) -> None:
+    """
+    Validates that every raw test record has the fields of the test data of the model
 
-    decorator.__name__ = func.__name__
-    return decorator
+    Args:
+        fields (List[str]): Fields of the test data
+        raw_test_data (List[Dict]): List of raw preprocessed test data
 
+    Returns:
+        None
 
-@validate_raw_test_data
-def predict(catering: str, raw_test_data: List[Dict]) -> List[Dict]:
+    Raises:
+        Exception: if there is missing or extra fields on the raw data
     """
-    Predicts the attendance from a list of raw preprocessed test data
+    required_fields = set(fields)
+    for data in raw_test_data:
+        data_fields = set(data.keys())
+        if required_fields != data_fields:
+            missing = required_fields - data_fields
+            no_required = data_fields - required_fields
+            missing_str = f"One or more records not contain {missing} field(s). " if missing else ''
+            no_required_str = f"Fields not required: {no_required}. " if no_required else ''
+            raise Exception(f"{missing_str}{no_required_str}")
+
+
+def get_predictions(model: 'AbstractRegression', raw_test_data: List[Dict]) -> List[Dict]:
+    """
+    Predicts the attendance from a list of raw preprocessed test data with a pre-built model
 
     Args:
-        catering (string): A valid catering
+        model (AbstractRegression): Pre-built prediction model
         raw_test_data (List[Dict]): List of raw preprocessed test data
 
     Returns:
         List[Dict]: List of predictions
     """
-    model: AbstractRegression = read_prediction_model(catering)
     test_data = pandas.DataFrame(data=raw_test_data).set_index(ID)
 
     predictions = list(map(lambda val: round(val, 2), model.predict(test_data)))
@@ -241,3 +288,46 @@ def predict(catering: str, raw_test_data: List[Dict]) -> List[Dict]:
             PREDICTION: prediction
         })
     return predictions_dicts
+
+
+def predict(catering: str, raw_test_data: List[Dict]) -> List[Dict]:
+    """
+    Predicts the attendance from a list of raw preprocessed test data
+
+    Args:
+        catering (string): A valid catering
+        raw_test_data (List[Dict]): List of raw preprocessed test data
+
+    Returns:
+        List[Dict]: List of predictions
+
+    Raises:
+        Exception: If the raw data has missing or extra fields
+    """
+    model, fields = read_serving_model(catering)
+    validate_test_data_fields(fields or get_test_data_fields(get_dataset_docs(catering)), raw_test_data)
+    with time_stage('model_predict', catering):
+        return get_predictions(model, raw_test_data)
+
+
+async def predict_async(catering: str, raw_test_data: List[Dict]) -> List[Dict]:
+    """
+    Predicts the attendance from a list of raw preprocessed test data without blocking the event loop, so the
+    predictions of several caterings can overlap their I/O
+
+    Args:
+        catering (string): A valid catering
+        raw_test_data (List[Dict]): List of raw preprocessed test data
+
+    Returns:
+        List[Dict]: List of predictions
+
+    Raises:
+        Exception: If the raw data has missing or extra fields
+    """
+    model, fields = await async_db_server.run_blocking(read_serving_model, catering)
+    if fields is None:
+        fields = get_test_data_fields(await async_db_server.get_dataset_docs(catering))
+    validate_test_data_fields(fields, raw_test_data)
+    with time_stage('model_predict', catering):
+        return await async_db_server.run_blocking(get_predictions, model, raw_test_data)
@@ -1,80 +1,75 @@
-import os
 import time
 import pandas
-from typing import Dict, List, Set, Tuple
+from typing import Callable, Dict, List, Optional, Set, Tuple
 from App.Database.db_server import get_list_menu_docs, delete_dataset_db
 from App.Server.Preprocessor.BagOfWords import BagOfWords
-from App.Server.predictor_server import remove_prediction_model
-from App.Util.constants import DIETS, BOW_MAX_FEATURES, BOW_FILE_PATH, MenuFields
-from App.Util.helpers import save_object_to_pkl_file, read_object_from_pkl_file
+from App.Server import artifact_server
+from App.Server.Artifacts import Pointers
+from App.Util.constants import DIETS, BOW_MAX_FEATURES, MenuFields
+from App.Util.helpers import notify_stage
+from App.Util.metrics import StageTimer
+from App.Server.Jobs.single_flight import single_flight
 
 ID = '_id'
+# Stages of the BoW model build, in order
+BOW_BUILD_STAGES = ['read_menus', 'build_bow', 'save_bow']
 
 
-def remove_menu_bow_model(catering: str) -> None:
-    """
-    Removes the menu BoW model to avoid issues in the training/prediction process
-
-    Args:
-        catering (string): A valid catering
-
-    Returns:
-        None
-    """
-    bow_file_path = get_file_name_model(catering)
-    if os.path.exists(bow_file_path):
-        os.remove(bow_file_path)
-
-
-def get_file_name_model(catering: str) -> str:
-    """
-    Gets the proper full path file name of the BoW model
-
-    Args:
-        catering (string): A valid catering
-
-    Returns:
-        str: Full path file name of the BoW model
-    """
-    return f"{BOW_FILE_PATH}{catering}_menu.pkl"
-
-
-def build_menus_bow_model(catering: str) -> Tuple[float, List[str]]:
+@single_flight('bow')
+def build_menus_bow_model(catering: str, on_stage: Optional[Callable[[str], None]] = None) \
+        -> Tuple[float, List[str], List[Dict]]:
     """
     Builds BoW model from all the menus data to extract features from each dish
 
     Args:
         catering (string): A valid catering
+        on_stage (Optional[Callable[[str], None]]): Callback notified when every stage of BOW_BUILD_STAGES starts
 
     Returns:
         float: Time elapsed
         List[str]: List of the extracted BoW features
+        List[Dict]: Time and rows of every stage of the build (see `StageTimer`)
     """
     start: float = time.time()
-    # Drop older bow file, dataset and prediction model because the features can change
-    remove_menu_bow_model(catering)
-    delete_dataset_db(catering)
-    remove_prediction_model(catering)
-
-    menus: List[Dict] = get_list_menu_docs(catering)
-    df = pandas.DataFrame(data=menus).set_index(ID).sort_index()
-
+    timer = StageTimer('bow', catering)
+    notify_stage(on_stage, 'read_menus')
+    with timer.stage('fetch_menus') as stage:
+        menus: List[Dict] = get_list_menu_docs(catering)
+        stage['rows'] = len(menus)
+    with timer.stage('build_dataframe') as stage:
+        df = pandas.DataFrame(data=menus).set_index(ID).sort_index()
+        stage['rows'] = len(df)
+
+    notify_stage(on_stage, 'build_bow')
     bow = BagOfWords(DIETS, BOW_MAX_FEATURES)
-    bow.build(df, MenuFields.IS_SERVICE_DAY)
-    save_object_to_pkl_file(bow, get_file_name_model(catering))
+    with timer.stage('clean_text') as stage:
+        stage['rows'] = bow.clean_corpus(df, MenuFields.IS_SERVICE_DAY)
+    with timer.stage('vectorize') as stage:
+        bow.fit_vectorizer()
+        stage['rows'] = len(bow.get_vectors())
+    notify_stage(on_stage, 'save_bow')
     features = bow.get_features()
+    with timer.stage('serialize'):
+        artifact_server.publish_bow_model(catering, bow, features)
+    # Drop the dataset because the features can change, the served models are kept until new ones are published. It
+    # is done on the last stage (a job can't be cancelled after it starts) so the dataset is never removed without
+    # publishing the new BoW model
+    with timer.stage('remove_dataset'):
+        delete_dataset_db(catering)
 
     end: float = time.time()
     time_elapsed = end - start
-    return time_elapsed, features
+    return time_elapsed, features, timer.log()
 
 
-def read_menu_bow_model(catering: str) -> BagOfWords:
+def read_menu_bow_model(catering: str, pointer: str = Pointers.CURRENT) -> BagOfWords:
     """
     Reads a pre-built BoW model given a catering
 
     Args:
         catering (string): A valid catering
+        pointer (str): Version to read, `Pointers.CURRENT` for the BoW model of the served prediction model (the
+            test data must be transformed with it) or `Pointers.LATEST` for the newest BoW model
 
     Returns:
         BagOfWords: BoW model instance
@@ -82,9 +77,9 @@ def read_menu_bow_model(catering: str) -> BagOfWords:
     Raises:
         Exception: if the BoW file was not found
     """
-    bow_file_path = get_file_name_model(catering)
+    bow_file_path = artifact_server.get_bow_path(catering, pointer)
     try:
-        bow: BagOfWords = read_object_from_pkl_file(bow_file_path)
+        bow: BagOfWords = artifact_server.load_artifact(bow_file_path)
     except Exception as e:
         if str(e).find('file does not exist') != -1:
             raise Exception(
@@ -96,7 +91,7 @@ def read_menu_bow_model(catering: str) -> BagOfWords:
 
 def get_bow_features(catering: str) -> Tuple[List[str], Dict[str, Set[str]]]:
     """
-    Reads a pre-built BoW model given a catering and returns the extracted features
+    Reads the newest BoW model given a catering and returns the extracted features
 
     Args:
         catering (string): A valid catering
@@ -105,7 +100,7 @@ def get_bow_features(catering: str) -> Tuple[List[str], Dict[str, Set[str]]]:
         List[str]: List of extracted features (stemmed words)
         Dict[str, Set[str]]: Dictionary of the features (stemmed words) with their raw word
     """
-    bow = read_menu_bow_model(catering)
+    bow = read_menu_bow_model(catering, Pointers.LATEST)
     features = bow.get_features()
     stemmed_words_features = bow.get_stemmed_words_features_dict()
     return features, stemmed_words_features
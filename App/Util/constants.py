@@ -14,6 +14,10 @@ COLOR_LUNCH = 'blue'
 FILE = 'file'
 MENU = 'menu'
 CATERING = 'catering'
+FORCE = 'force'
+KIND = 'kind'
+ASYNC = 'async'
+VERSION = 'version'
 
 
 class MenuFields:
@@ -5,7 +5,7 @@ import random
 import uuid
 import time
 from datetime import datetime
-from typing import Any, Dict, List, Union
+from typing import IO, Any, Callable, Dict, List, Optional, Sequence, Union
 from numpy.random import permutation
 from App.Util.constants import DATE_FORMAT
 
@@ -22,7 +22,7 @@ def read_object_from_pkl_file(full_file_path: str) -> Any:
     """
     if not os.path.exists(full_file_path) or not os.path.isfile(full_file_path):
         raise Exception(f"'{full_file_path}' file does not exist.")
-    with open(full_file_path, 'rb', pickle.HIGHEST_PROTOCOL) as f:
+    with open(full_file_path, 'rb') as f:
         obj: Any = pickle.load(f)
     return obj
 
@@ -52,6 +52,73 @@ def save_object_to_pkl_file(obj: Any, full_file_path: str) -> None:
         pickle.dump(obj, f, pickle.HIGHEST_PROTOCOL)
 
 
+def notify_stage(on_stage: Optional[Callable[[str], None]], stage: str) -> None:
+    """
+    Notifies the start of a stage of a long-running process (i.e. to report the progress of a background job)
+
+    Args:
+        on_stage (Optional[Callable[[str], None]]): Callback receiving the stage name, nothing is done if it is None
+        stage (str): Stage name
+
+    Returns:
+        None
+    """
+    if on_stage is not None:
+        on_stage(stage)
+
+
+def count_rows(data: Union[List[Dict], Dict[str, Sequence]]) -> int:
+    """
+    Counts the records read from the database, as documents or as columns (bulk read mode)
+
+    Args:
+        data (Union[List[Dict], Dict[str, Sequence]]): List of documents or values by column
+
+    Returns:
+        int: Number of records
+    """
+    if isinstance(data, dict):
+        return len(next(iter(data.values()), []))
+    return len(data)
+
+
+def get_file_size(file: Union[str, IO[bytes]]) -> int:
+    """
+    Gets the size of a file
+
+    Args:
+        file (Union[str, IO[bytes]]): Path or seekable binary file object, its position is moved to the start
+
+    Returns:
+        int: Size in bytes
+    """
+    if isinstance(file, str):
+        return os.path.getsize(file)
+    size = file.seek(0, os.SEEK_END)
+    file.seek(0)
+    return size
+
+
+def is_process_alive(pid: int) -> bool:
+    """
+    Checks if a process of the current host is alive
+
+    Args:
+        pid (int): Process identifier
+
+    Returns:
+        bool: False if there is no process with the identifier, True otherwise
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # The process exists but belongs to another user
+        pass
+    return True
+
+
 def str_to_timestamp(date: str) -> int:
     """
     Converts a string to a timestamp integer
@@ -69,7 +136,7 @@ def str_to_timestamp(date: str) -> int:
             return int(time.mktime(dt_object))
         except ValueError:
             pass
-        raise ValueError(f"No valid date format found. Use the next format: '{DATE_FORMAT}'.")
+    raise ValueError(f"No valid date format found. Use the next format: '{DATE_FORMAT}'.")
 
 
 def timestamp_to_str(timestamp: int) -> str:
@@ -114,7 +181,7 @@ def str_to_bool(cad: str) -> bool:
 
 def to_dict(obj: Any) -> Union[Dict, List[Dict]]:
     """
-    Converts an instance to a dictionary
+    Converts an instance to a dictionary, using its `to_dict` method if it has one
 
     Args:
         obj (Any): Object instance
@@ -122,7 +189,7 @@ def to_dict(obj: Any) -> Union[Dict, List[Dict]]:
     Returns:
         Dict: Instance converted to a dictionary
     """
-    return json.loads(json.dumps(obj, default=lambda o: o.__dict__))
+    return json.loads(json.dumps(obj, default=lambda o: o.to_dict() if hasattr(o, 'to_dict') else o.__dict__))
 
 
 def get_random_string(len_str: int = 12) -> str:
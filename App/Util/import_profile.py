@@ -0,0 +1,56 @@
+import re
+import sys
+import time
+import subprocess
+from collections import defaultdict
+from typing import Dict, List
+
+# Stacks only used by the builds and the predictions, imported on their first use and never on the startup
+LAZY_MODULES = ['sklearn', 'scipy', 'nltk', 'autocorrect']
+IMPORT_TIME_REGEX = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def profile_imports(module: str, top: int = 15) -> Dict:
+    """
+    Imports a module on a new interpreter (a cold start) with `-X importtime` and gets the import cost of the modules
+    it loads
+
+    Args:
+        module (str): Module to import, i.e. the module of the app
+        top (int): Number of packages and modules to report
+
+    Returns:
+        Dict: Wall time of the interpreter, import time of the module, most expensive packages (by their own time) and
+            modules (by their cumulative time) in seconds, and the lazy modules imported on the startup
+
+    Raises:
+        Exception: If the module could not be imported
+    """
+    start = time.time()
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], capture_output=True,
+                             text=True)
+    wall_time = time.time() - start
+    if process.returncode != 0:
+        raise Exception(f"Failed to import {module}: {process.stderr.strip().splitlines()[-1]}")
+
+    modules: Dict[str, int] = dict()
+    packages: Dict[str, int] = defaultdict(int)
+    for line in process.stderr.splitlines():
+        match = IMPORT_TIME_REGEX.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, name = int(match[1]), int(match[2]), match[4]
+        modules[name] = cumulative_us
+        packages[name.split('.')[0]] += self_us
+
+    def get_top(costs: Dict[str, int]) -> List[Dict]:
+        return [{'name': name, 'time': round(cost / 1e6, 4)}
+                for name, cost in sorted(costs.items(), key=lambda item: item[1], reverse=True)[:top]]
+
+    return {
+        'wall_time': round(wall_time, 4),
+        'import_time': round(modules.get(module, 0) / 1e6, 4),
+        'packages': get_top(packages),
+        'modules': get_top(modules),
+        'lazy_modules_imported': [name for name in LAZY_MODULES if name in modules]
+    }
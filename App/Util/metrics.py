@@ -0,0 +1,617 @@
+import os
+import json
+import time
+import fcntl
+import atexit
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+from termcolor import cprint
+from App.Util.helpers import is_process_alive
+from config import METRICS_PATH, METRICS_FLUSH_INTERVAL
+
+NAMESPACE = 'food_waste'
+REQUESTS_TOTAL = f'{NAMESPACE}_http_requests_total'
+REQUEST_ERRORS_TOTAL = f'{NAMESPACE}_http_request_errors_total'
+REQUEST_DURATION = f'{NAMESPACE}_http_request_duration_seconds'
+STAGE_DURATION = f'{NAMESPACE}_stage_duration_seconds'
+# Upper bounds of the latency buckets in seconds, from the predictions (ms) to the model builds (minutes)
+BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300]
+
+COUNTER = 'counter'
+HISTOGRAM = 'histogram'
+# Type and description of every metric
+METRICS: Dict[str, Tuple[str, str]] = {
+    REQUESTS_TOTAL: (COUNTER, 'Requests by route, method, catering and status code'),
+    REQUEST_ERRORS_TOTAL: (COUNTER, 'Requests answered with an error status code (4xx or 5xx) by route, method and '
+                                    'catering'),
+    REQUEST_DURATION: (HISTOGRAM, 'Latency of the requests by route, method and catering'),
+    STAGE_DURATION: (HISTOGRAM, 'Latency of the internal stages (db reads, vectorization, predictions, builds) by '
+                                'stage and catering'),
+}
+
+# Files of an instance of the service with the added up snapshots of the processes that ended, and its lock
+ARCHIVE_FILE = 'archive.json'
+ARCHIVE_LOCK_FILE = 'archive.lock'
+# Environment variable with the instance of the service of the process, set by the gunicorn master before forking
+# its workers so all of them share it
+INSTANCE_ENV = 'FOOD_WASTE_METRICS_INSTANCE'
+
+# Metric name and label pairs, sorted by label name
+SeriesKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class MetricsRegistry:
+    """
+    Counters and latency histograms of the process, rendered on the Prometheus text format.
+
+    Every process of the service (i.e. the gunicorn workers) has its own registry. Each one saves a snapshot of its
+    metrics on a file of the metrics folder from a background thread (every `flush_interval` seconds while it records
+    metrics, and before rendering), and the rendered metrics add up the snapshots of all the processes of the service,
+    so a scrape gets the same totals whatever the worker that answers it. The snapshots of the processes that ended
+    are added to an archive of the service instead of being dropped, so the counters never decrease.
+
+    The snapshots are grouped by instance of the service (see `get_instance`): a folder of the metrics folder per
+    gunicorn master, removed when the master exits
+
+    Args:
+        path (str): Folder of the snapshots of the processes
+        flush_interval (float): Seconds between two snapshots of the process, 0 saves one on every record
+
+    Attributes:
+        path (str): Folder of the snapshots of the processes
+        flush_interval (float): Seconds between two snapshots of the process, 0 saves one on every record
+        __counters (Dict[SeriesKey, float]): Value of every counter series
+        __histograms (Dict[SeriesKey, List[float]]): Count by bucket, sum and count of every histogram series
+        __pid (int): Process of the series, a forked process starts with empty series
+        __pending (bool): There are records not saved on the snapshot of the process yet
+        __removed (bool): The instance of the process was removed, its snapshots are not saved anymore
+        __flusher (Optional[threading.Thread]): Thread saving the snapshots of the process
+        __lock (threading.Lock): Lock for the series
+    """
+
+    def __init__(self, path: str, flush_interval: float):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.__counters: Dict[SeriesKey, float] = dict()
+        self.__histograms: Dict[SeriesKey, List[float]] = dict()
+        self.__pid = os.getpid()
+        self.__pending = False
+        self.__removed = False
+        self.__flusher: Optional[threading.Thread] = None
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def get_series_key(name: str, labels: Dict[str, str]) -> SeriesKey:
+        return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+    def inc(self, name: str, labels: Dict[str, str], value: float = 1) -> None:
+        """
+        Increases a counter
+
+        Args:
+            name (str): Metric name
+            labels (Dict[str, str]): Labels of the series
+            value (float): Amount to add
+
+        Returns:
+            None
+        """
+        key = self.get_series_key(name, labels)
+        with self.__lock:
+            self.__prepare_record()
+            self.__counters[key] = self.__counters.get(key, 0) + value
+        if self.flush_interval <= 0:
+            self.flush()
+
+    def observe(self, name: str, labels: Dict[str, str], value: float) -> None:
+        """
+        Records a latency on a histogram
+
+        Args:
+            name (str): Metric name
+            labels (Dict[str, str]): Labels of the series
+            value (float): Seconds
+
+        Returns:
+            None
+        """
+        key = self.get_series_key(name, labels)
+        with self.__lock:
+            self.__prepare_record()
+            histogram = self.__histograms.setdefault(key, [0] * (len(BUCKETS) + 2))
+            for idx, upper_bound in enumerate(BUCKETS):
+                if value <= upper_bound:
+                    histogram[idx] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+        if self.flush_interval <= 0:
+            self.flush()
+
+    def __prepare_record(self) -> None:
+        """
+        Marks the series as pending to save and starts the flusher thread of the process if it is not running. A
+        forked process (i.e. a gunicorn worker) drops the series inherited from its parent, they are on the snapshot of
+        the parent. Called holding the lock
+
+        Returns:
+            None
+        """
+        pid = os.getpid()
+        if pid != self.__pid:
+            self.__counters.clear()
+            self.__histograms.clear()
+            self.__pid = pid
+            self.__flusher = None
+        self.__pending = True
+        if self.__flusher is None and self.flush_interval > 0:
+            self.__flusher = threading.Thread(target=self.__run_flusher, args=(pid,), name='metrics-flush',
+                                              daemon=True)
+            self.__flusher.start()
+            # The last records of a process that exits normally are saved too
+            atexit.register(self.flush)
+
+    def __run_flusher(self, pid: int) -> None:
+        """
+        Saves the snapshot of the process every flush interval if there are records pending to save
+
+        Args:
+            pid (int): Process of the thread
+
+        Returns:
+            None
+        """
+        while pid == os.getpid():
+            time.sleep(self.flush_interval)
+            if not self.__pending:
+                continue
+            try:
+                self.flush()
+            except OSError as e:
+                cprint(f"Failed to save the metrics snapshot of the process {pid}: {e}", 'red')
+
+    def get_snapshot(self) -> Dict:
+        """
+        Gets the series of the process
+
+        Returns:
+            Dict: Counter and histogram series as lists of [name, labels, values]
+        """
+        with self.__lock:
+            return series_to_snapshot(self.__counters, self.__histograms)
+
+    def __get_instance_path(self, instance: Optional[str] = None) -> str:
+        return os.path.join(self.path, get_instance() if instance is None else instance)
+
+    def flush(self) -> None:
+        """
+        Saves the snapshot of the process
+
+        Returns:
+            None
+        """
+        with self.__lock:
+            if self.__removed:
+                return
+            snapshot = series_to_snapshot(self.__counters, self.__histograms)
+            self.__pending = False
+        instance_path = self.__get_instance_path()
+        os.makedirs(instance_path, exist_ok=True)
+        write_snapshot(os.path.join(instance_path, f'{os.getpid()}.json'), snapshot)
+
+    @contextmanager
+    def __lock_instance(self, instance_path: str) -> Iterator[None]:
+        """
+        Locks the archive of an instance of the service, across the processes
+
+        Args:
+            instance_path (str): Folder of the snapshots of the instance
+
+        Returns:
+            Iterator[None]: Context manager holding the lock
+        """
+        os.makedirs(instance_path, exist_ok=True)
+        with open(os.path.join(instance_path, ARCHIVE_LOCK_FILE), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def __archive_locked(self, instance_path: str, snapshot_paths: List[str]) -> Dict:
+        """
+        Adds the snapshots of processes that ended to the archive of their instance and removes them. Called holding
+        the lock of the instance
+
+        Args:
+            instance_path (str): Folder of the snapshots of the instance
+            snapshot_paths (List[str]): Snapshots of the processes that ended
+
+        Returns:
+            Dict: Archive of the instance
+        """
+        archive_path = os.path.join(instance_path, ARCHIVE_FILE)
+        archive = read_snapshot(archive_path) or series_to_snapshot(dict(), dict())
+        ended = [snapshot for snapshot in map(read_snapshot, snapshot_paths) if snapshot is not None]
+        if len(ended) == 0:
+            return archive
+        archive = series_to_snapshot(*merge_snapshots([archive, *ended]))
+        write_snapshot(archive_path, archive)
+        # Removed once they are on the archive, a process that fails in between never counts them twice
+        for snapshot_path in snapshot_paths:
+            try:
+                os.remove(snapshot_path)
+            except FileNotFoundError:
+                pass
+        return archive
+
+    def archive_process(self, pid: int, instance: Optional[str] = None) -> None:
+        """
+        Adds the snapshot of a process that ended to the archive of its instance, i.e. called by the gunicorn master
+        when a worker exits (before its pid can be reused by a new worker)
+
+        Args:
+            pid (int): Process that ended
+            instance (Optional[str]): Instance of the process, the instance of the current process if it is None
+
+        Returns:
+            None
+        """
+        instance_path = self.__get_instance_path(instance)
+        with self.__lock_instance(instance_path):
+            self.__archive_locked(instance_path, [os.path.join(instance_path, f'{pid}.json')])
+
+    def remove_instance(self) -> None:
+        """
+        Removes the snapshots and the archive of the instance of the current process, i.e. called by the gunicorn
+        master when it exits. The process does not save its snapshot anymore
+
+        Returns:
+            None
+        """
+        with self.__lock:
+            self.__removed = True
+        shutil.rmtree(self.__get_instance_path(), ignore_errors=True)
+
+    def remove_ended_instances(self) -> List[str]:
+        """
+        Removes the snapshots and the archive of the instances whose process ended without removing them (i.e. a
+        master that was killed)
+
+        Returns:
+            List[str]: Instances removed
+        """
+        if not os.path.isdir(self.path):
+            return []
+        removed: List[str] = list()
+        for instance in os.listdir(self.path):
+            pid = instance.split('-')[0]
+            if instance == get_instance() or not pid.isdigit() or is_process_alive(int(pid)):
+                continue
+            shutil.rmtree(os.path.join(self.path, instance), ignore_errors=True)
+            removed.append(instance)
+        return removed
+
+    def __read_snapshots(self) -> List[Dict]:
+        """
+        Reads the archive and the snapshots of the processes of the service that are alive, the snapshots of the
+        processes that ended are added to the archive
+
+        Returns:
+            List[Dict]: Snapshots
+        """
+        self.flush()
+        instance_path = self.__get_instance_path()
+        snapshots: List[Dict] = list()
+        ended_paths: List[str] = list()
+        with self.__lock_instance(instance_path):
+            for file_name in sorted(os.listdir(instance_path)):
+                pid, extension = os.path.splitext(file_name)
+                if extension != '.json' or not pid.isdigit():
+                    continue
+                if not is_process_alive(int(pid)):
+                    ended_paths.append(os.path.join(instance_path, file_name))
+                    continue
+                snapshot = read_snapshot(os.path.join(instance_path, file_name))
+                if snapshot is not None:
+                    snapshots.append(snapshot)
+            snapshots.append(self.__archive_locked(instance_path, ended_paths))
+        return snapshots
+
+    def render(self) -> str:
+        """
+        Renders the metrics of all the processes of the service on the Prometheus text format
+
+        Returns:
+            str: Metrics
+        """
+        counters, histograms = merge_snapshots(self.__read_snapshots())
+
+        lines: List[str] = list()
+        for name, (metric_type, description) in METRICS.items():
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            if metric_type == COUNTER:
+                for (series_name, labels), value in sorted(counters.items()):
+                    if series_name == name:
+                        lines.append(f'{name}{format_labels(labels)} {value}')
+                continue
+            for (series_name, labels), values in sorted(histograms.items()):
+                if series_name != name:
+                    continue
+                for upper_bound, count in zip([*BUCKETS, '+Inf'], [*values[:len(BUCKETS)], values[-1]]):
+                    lines.append(f'{name}_bucket{format_labels((*labels, ("le", str(upper_bound))))} {count}')
+                lines.append(f'{name}_sum{format_labels(labels)} {values[-2]}')
+                lines.append(f'{name}_count{format_labels(labels)} {values[-1]}')
+        return '\n'.join(lines) + '\n'
+
+
+def create_instance_id() -> str:
+    """
+    Creates the identifier of a new instance of the service: the process creating it and its start time in
+    milliseconds, so a new process reusing the pid of an old one never gets its snapshots
+
+    Returns:
+        str: Instance identifier
+    """
+    return f'{os.getpid()}-{int(time.time() * 1000)}'
+
+
+def get_instance() -> str:
+    """
+    Gets the instance of the service of the process. It is created by the first process that needs it unless it was
+    started by the gunicorn master (see `start_instance`), and it is inherited by the processes it creates
+
+    Returns:
+        str: Instance identifier
+    """
+    instance = os.environ.get(INSTANCE_ENV)
+    if instance is None:
+        instance = os.environ.setdefault(INSTANCE_ENV, create_instance_id())
+    return instance
+
+
+def start_instance() -> str:
+    """
+    Starts a new instance of the service on the current process, i.e. called by the gunicorn master before forking
+    its workers. The environment inherited from a previous master is never reused
+
+    Returns:
+        str: Instance identifier
+    """
+    instance = create_instance_id()
+    os.environ[INSTANCE_ENV] = instance
+    return instance
+
+
+def series_to_snapshot(counters: Dict[SeriesKey, float], histograms: Dict[SeriesKey, List[float]]) -> Dict:
+    """
+    Converts counter and histogram series to a JSON serializable snapshot
+
+    Args:
+        counters (Dict[SeriesKey, float]): Value of every counter series
+        histograms (Dict[SeriesKey, List[float]]): Count by bucket, sum and count of every histogram series
+
+    Returns:
+        Dict: Counter and histogram series as lists of [name, labels, values]
+    """
+    return {
+        COUNTER: [[name, labels, value] for (name, labels), value in counters.items()],
+        HISTOGRAM: [[name, labels, list(values)] for (name, labels), values in histograms.items()]
+    }
+
+
+def merge_snapshots(snapshots: List[Dict]) -> Tuple[Dict[SeriesKey, float], Dict[SeriesKey, List[float]]]:
+    """
+    Adds up the series of some snapshots
+
+    Args:
+        snapshots (List[Dict]): Snapshots (see `series_to_snapshot`)
+
+    Returns:
+        Tuple[Dict[SeriesKey, float], Dict[SeriesKey, List[float]]]: Counter and histogram series
+    """
+    counters: Dict[SeriesKey, float] = dict()
+    histograms: Dict[SeriesKey, List[float]] = dict()
+    for snapshot in snapshots:
+        for name, labels, value in snapshot[COUNTER]:
+            key = (name, tuple(tuple(label) for label in labels))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, values in snapshot[HISTOGRAM]:
+            key = (name, tuple(tuple(label) for label in labels))
+            merged = histograms.setdefault(key, [0] * len(values))
+            histograms[key] = [total + value for total, value in zip(merged, values)]
+    return counters, histograms
+
+
+def read_snapshot(snapshot_path: str) -> Optional[Dict]:
+    """
+    Reads a snapshot file
+
+    Args:
+        snapshot_path (str): Snapshot file
+
+    Returns:
+        Optional[Dict]: Snapshot, None if it does not exist or is not valid
+    """
+    try:
+        with open(snapshot_path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def write_snapshot(snapshot_path: str, snapshot: Dict) -> None:
+    """
+    Writes a snapshot file, on a temporary file replaced at once so a reader never sees a partial snapshot
+
+    Args:
+        snapshot_path (str): Snapshot file
+        snapshot (Dict): Snapshot
+
+    Returns:
+        None
+    """
+    temp_path = f'{snapshot_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(snapshot, f)
+    os.replace(temp_path, snapshot_path)
+
+
+def format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    """
+    Formats the labels of a series on the Prometheus text format
+
+    Args:
+        labels (Tuple[Tuple[str, str], ...]): Label name and value pairs
+
+    Returns:
+        str: Labels between braces, empty if there are none
+    """
+    if len(labels) == 0:
+        return ''
+    escaped = [(label, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+               for label, value in labels]
+    return '{' + ','.join(f'{label}="{value}"' for label, value in escaped) + '}'
+
+
+_metrics_registry: Optional[MetricsRegistry] = None
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """
+    Gets the metrics registry shared by the process
+
+    Returns:
+        MetricsRegistry: Metrics registry
+    """
+    global _metrics_registry
+    if _metrics_registry is None:
+        _metrics_registry = MetricsRegistry(METRICS_PATH, METRICS_FLUSH_INTERVAL)
+    return _metrics_registry
+
+
+def observe_request(route: str, method: str, catering: str, status_code: int, duration: float) -> None:
+    """
+    Records a request answered by the service
+
+    Args:
+        route (str): Route rule (i.e. '/jobs/<job_id>')
+        method (str): HTTP method
+        catering (str): Caterings of the request
+        status_code (int): Status code of the response
+        duration (float): Seconds
+
+    Returns:
+        None
+    """
+    registry = get_metrics_registry()
+    labels = {'route': route, 'method': method, 'catering': catering}
+    registry.inc(REQUESTS_TOTAL, {**labels, 'status': str(status_code)})
+    if status_code >= 400:
+        registry.inc(REQUEST_ERRORS_TOTAL, labels)
+    registry.observe(REQUEST_DURATION, labels, duration)
+
+
+@contextmanager
+def time_stage(stage: str, catering: str = '') -> Iterator[None]:
+    """
+    Records the latency of an internal stage (the failed runs too)
+
+    Args:
+        stage (str): Stage name
+        catering (str): Catering processed by the stage, if any
+
+    Returns:
+        Iterator[None]: Context manager timing its block
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        get_metrics_registry().observe(STAGE_DURATION, {'stage': stage, 'catering': catering},
+                                       time.perf_counter() - start)
+
+
+class StageTimer:
+    """
+    Breakdown of the time spent by the stages of a build (i.e. the database reads, the text cleaning or the model fit)
+    and the rows processed by each one. Every stage is recorded on the stage latency histogram too, as
+    `<build>.<stage>`
+
+    Args:
+        build (str): Kind of build
+        catering (str): Catering processed by the build
+
+    Attributes:
+        build (str): Kind of build
+        catering (str): Catering processed by the build
+        stages (List[Dict]): Name, seconds and rows (None if it does not apply) of every finished stage, in order
+    """
+
+    def __init__(self, build: str, catering: str):
+        self.build = build
+        self.catering = catering
+        self.stages: List[Dict] = list()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Dict]:
+        """
+        Times a stage (the failed runs too). The rows processed by the stage are set on the `rows` key of the yielded
+        record
+
+        Args:
+            name (str): Stage name
+
+        Returns:
+            Iterator[Dict]: Context manager timing its block, it yields the record of the stage
+        """
+        record: Dict = {'rows': None}
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            self.add(name, time.perf_counter() - start, record['rows'])
+
+    def add(self, name: str, duration: float, rows: Optional[int] = None) -> None:
+        """
+        Records a stage timed by the caller (i.e. a stage interleaved with another one)
+
+        Args:
+            name (str): Stage name
+            duration (float): Seconds
+            rows (Optional[int]): Rows processed by the stage
+
+        Returns:
+            None
+        """
+        self.stages.append({'stage': name, 'time': duration, 'rows': rows})
+        get_metrics_registry().observe(STAGE_DURATION, {'stage': f'{self.build}.{name}', 'catering': self.catering},
+                                       duration)
+
+    def get_report(self) -> List[Dict]:
+        """
+        Gets the breakdown of the stages, in the format of the build responses
+
+        Returns:
+            List[Dict]: Name, time, share of the total time and rows of every stage, in order
+        """
+        total = sum(stage['time'] for stage in self.stages)
+        return [{'stage': stage['stage'], 'time': f"{round(stage['time'], 4)} sec",
+                 'share': f"{round(100 * stage['time'] / total, 1) if total > 0 else 0.0} %", 'rows': stage['rows']}
+                for stage in self.stages]
+
+    def log(self) -> List[Dict]:
+        """
+        Prints the breakdown of the stages
+
+        Returns:
+            List[Dict]: Breakdown of the stages (see `get_report`)
+        """
+        report = self.get_report()
+        cprint(f"Stages of the {self.build} build of {self.catering}:", 'cyan')
+        for stage in report:
+            rows = '' if stage['rows'] is None else f", {stage['rows']} rows"
+            cprint(f"\t{stage['stage']}: {stage['time']} ({stage['share']}{rows})", 'cyan')
+        return report
@@ -0,0 +1,208 @@
+import io
+import os
+import re
+import time
+import uuid
+import pstats
+import cProfile
+import functools
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from termcolor import cprint
+from config import PROFILE_PATH, PROFILE_MEMORY_FRAMES
+
+COLOR = 'yellow'
+# Functions and allocation lines printed on the summary of a profile
+SUMMARY_TOP = 30
+
+# Profile of the request handled by the current context, None for the requests that are not profiled
+_active_profile: ContextVar[Optional['RequestProfile']] = ContextVar('active_profile', default=None)
+# tracemalloc is global to the process, it is traced while any profiled request asked for the memory snapshots
+_memory_users = 0
+_memory_started = False
+_memory_lock = threading.Lock()
+
+
+class RequestProfile:
+    """
+    Deterministic profile (cProfile) of a request, optionally with the memory allocated by the request (tracemalloc).
+
+    cProfile only profiles the thread that enables it, so every thread working for the request (the request thread,
+    the event loop of an async view and the storage threads of `run_blocking`) is profiled on its own profiler and
+    the profilers are merged when the profile is saved
+
+    Args:
+        name (str): Name of the profiled request (i.e. its endpoint)
+        memory (bool): Take memory snapshots at the start and at the end of the request
+        path (str): Folder of the saved profiles
+
+    Attributes:
+        name (str): Name of the profiled request
+        memory (bool): Take memory snapshots at the start and at the end of the request
+        path (str): Folder of the saved profiles
+        profile_id (str): Identifier of the profile, prefix of its files
+        __profilers (List[cProfile.Profile]): Profiler of every thread that worked for the request
+        __memory_start (Optional[tracemalloc.Snapshot]): Memory snapshot at the start of the request
+        __start (float): Start time of the request
+        __lock (threading.Lock): Lock for the profilers
+    """
+
+    def __init__(self, name: str, memory: bool = False, path: str = PROFILE_PATH):
+        self.name = name
+        self.memory = memory
+        self.path = path
+        self.profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{re.sub(r'[^A-Za-z0-9_-]', '_', name)}-" \
+                          f"{uuid.uuid4().hex[:8]}"
+        self.__profilers: List[cProfile.Profile] = list()
+        self.__memory_start: Optional[tracemalloc.Snapshot] = None
+        self.__start = 0.0
+        self.__lock = threading.Lock()
+
+    @contextmanager
+    def activate(self) -> Iterator['RequestProfile']:
+        """
+        Makes the profile the active one of the current context while the request is handled, and takes the first
+        memory snapshot
+
+        Returns:
+            Iterator[RequestProfile]: Context manager yielding the profile
+        """
+        if self.memory:
+            start_memory_tracing()
+            self.__memory_start = tracemalloc.take_snapshot()
+        token = _active_profile.set(self)
+        self.__start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            _active_profile.reset(token)
+
+    @contextmanager
+    def profile_thread(self) -> Iterator[None]:
+        """
+        Profiles the current thread
+
+        Returns:
+            Iterator[None]: Context manager profiling its block
+        """
+        profiler = cProfile.Profile()
+        with self.__lock:
+            self.__profilers.append(profiler)
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+
+    def wrap(self, func: Callable) -> Callable:
+        """
+        Wraps a function run by another thread (i.e. a thread pool), so the thread is profiled while it runs it
+
+        Args:
+            func (Callable): Function to profile
+
+        Returns:
+            Callable: Wrapped function
+        """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs) -> Any:
+            with self.profile_thread():
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def wrap_async(self, func: Callable) -> Callable:
+        """
+        Wraps a coroutine function (i.e. an async view), so the thread of its event loop is profiled while it runs
+
+        Args:
+            func (Callable): Coroutine function to profile
+
+        Returns:
+            Callable: Wrapped coroutine function
+        """
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs) -> Any:
+            with self.profile_thread():
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    def save(self) -> Dict:
+        """
+        Saves the merged profile of the threads (`<id>.prof`, readable with pstats or snakeviz), the memory snapshot at
+        the end of the request (`<id>.tracemalloc`) and a text summary of both (`<id>.txt`)
+
+        Returns:
+            Dict: Profile id, time of the request and saved files
+        """
+        duration = time.perf_counter() - self.__start
+        os.makedirs(self.path, exist_ok=True)
+        base_path = os.path.join(self.path, self.profile_id)
+        files: List[str] = list()
+        summary = io.StringIO()
+        summary.write(f"{self.name}: {round(duration, 4)} sec on {len(self.__profilers)} thread(s)\n\n")
+
+        stats = pstats.Stats(*self.__profilers, stream=summary)
+        stats.dump_stats(f'{base_path}.prof')
+        files.append(f'{self.profile_id}.prof')
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(SUMMARY_TOP)
+
+        if self.memory:
+            memory_end = tracemalloc.take_snapshot()
+            stop_memory_tracing()
+            memory_end.dump(f'{base_path}.tracemalloc')
+            files.append(f'{self.profile_id}.tracemalloc')
+            summary.write(f"Memory allocated by the request (top {SUMMARY_TOP} lines):\n")
+            for diff in memory_end.compare_to(self.__memory_start, 'lineno')[:SUMMARY_TOP]:
+                summary.write(f"{diff}\n")
+
+        with open(f'{base_path}.txt', 'w') as f:
+            f.write(summary.getvalue())
+        files.append(f'{self.profile_id}.txt')
+        cprint(f"Saved the profile {self.profile_id} of {self.name} ({round(duration, 4)} sec) on {self.path}", COLOR)
+        return {'id': self.profile_id, 'time': f"{round(duration, 4)} sec", 'files': files}
+
+
+def get_active_profile() -> Optional[RequestProfile]:
+    """
+    Gets the profile of the request handled by the current context
+
+    Returns:
+        Optional[RequestProfile]: Profile of the request, None if it is not profiled
+    """
+    return _active_profile.get()
+
+
+def start_memory_tracing() -> None:
+    """
+    Starts tracing the memory allocations, if no other profiled request is tracing them
+
+    Returns:
+        None
+    """
+    global _memory_users, _memory_started
+    with _memory_lock:
+        if _memory_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(PROFILE_MEMORY_FRAMES)
+            _memory_started = True
+        _memory_users += 1
+
+
+def stop_memory_tracing() -> None:
+    """
+    Stops tracing the memory allocations when the last profiled request tracing them ends (unless they were already
+    traced, i.e. with PYTHONTRACEMALLOC)
+
+    Returns:
+        None
+    """
+    global _memory_users, _memory_started
+    with _memory_lock:
+        _memory_users -= 1
+        if _memory_users == 0 and _memory_started:
+            tracemalloc.stop()
+            _memory_started = False
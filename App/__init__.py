@@ -1,16 +1,69 @@
 import os
+import sys
+import click
 from flask import Flask
 from flask_cors import CORS
-from App.Controllers import app_info_blueprint, data_collector_blueprint, preprocessing_blueprint, predictor_blueprint
+from werkzeug.exceptions import RequestEntityTooLarge
+from App.Controllers import app_info_blueprint, data_collector_blueprint, preprocessing_blueprint, predictor_blueprint, \
+    jobs_blueprint, pipeline_blueprint, metrics_blueprint
+from App.Controllers.request_validators import UploadRequest, handle_request_entity_too_large
+from App.Server.Preprocessor.TextCleaner import nlp_resources
+from App.Util.import_profile import profile_imports
+from config import STARTUP_IMPORT_BUDGET
+
+
+@click.command('prepare-resources')
+def prepare_resources_command():
+    """
+    Downloads the NLP data used to build the BoW models, i.e. while building an image:
+    `FLASK_APP=main_app flask prepare-resources`
+    """
+    result = nlp_resources.prepare_nlp_resources()
+    click.echo(f"NLP data on {nlp_resources.NLP_DATA_PATH}: {result}")
+    if len(result['failed']) > 0:
+        sys.exit(1)
+
+
+@click.command('profile-startup')
+@click.option('--module', default='main_app', help='Module of the app')
+@click.option('--top', default=15, help='Number of packages and modules to report')
+@click.option('--budget', default=STARTUP_IMPORT_BUDGET, help='Maximum seconds to import the app')
+def profile_startup_command(module: str, top: int, budget: float):
+    """
+    Reports the import cost of the app on a cold start and fails if it is over the budget or if it imports the ML and
+    NLP stacks (they must be imported on their first use): `FLASK_APP=main_app flask profile-startup`
+    """
+    profile = profile_imports(module, top)
+    click.echo(f"Import time of {module}: {profile['import_time']} sec (interpreter: {profile['wall_time']} sec, "
+               f"budget: {budget} sec)")
+    for title, key in (('Packages (own time)', 'packages'), ('Modules (cumulative time)', 'modules')):
+        click.echo(f"{title}:")
+        for cost in profile[key]:
+            click.echo(f"  {cost['time']:>8.4f} sec  {cost['name']}")
+    errors = list()
+    if profile['import_time'] > budget:
+        errors.append(f"the import time is over the budget of {budget} sec")
+    if len(profile['lazy_modules_imported']) > 0:
+        errors.append(f"{profile['lazy_modules_imported']} imported on the startup")
+    if len(errors) > 0:
+        click.echo(f"Startup check failed: {'; '.join(errors)}", err=True)
+        sys.exit(1)
 
 
 def create_app():
     app = Flask(__name__)
     app.secret_key = os.urandom(24)
+    app.request_class = UploadRequest
+    app.register_error_handler(RequestEntityTooLarge, handle_request_entity_too_large)
     CORS(app)
     app.register_blueprint(app_info_blueprint)
     app.register_blueprint(data_collector_blueprint)
     app.register_blueprint(preprocessing_blueprint)
     app.register_blueprint(predictor_blueprint)
+    app.register_blueprint(jobs_blueprint)
+    app.register_blueprint(pipeline_blueprint)
+    app.register_blueprint(metrics_blueprint)
+    app.cli.add_command(prepare_resources_command)
+    app.cli.add_command(profile_startup_command)
     return app
 
@@ -0,0 +1,5 @@
+from asgiref.wsgi import WsgiToAsgi
+from main_app import app
+
+# ASGI entry point, i.e. `uvicorn asgi_app:asgi_app --port 5050`
+asgi_app = WsgiToAsgi(app)
@@ -4,7 +4,7 @@ GIT_REVISION='release'
 BACKEND_PORT=5050
 
 # Creating list of dependencies file to install (Python)
-pipenv lock -r > requirements.txt
+pipenv requirements > requirements.txt
 
 docker build -t \
     ${APP_DIR}:${GIT_REVISION} \
@@ -1,2 +1,12 @@
 import config.uploading_config
 from .mongo_config import MONGO_STR_CONNECTION, MONGO_DB_NAME, MongoCollections
+from .storage_config import STORAGE_BACKEND, SQLITE_DB_PATH, StorageBackendNames, DB_IO_WORKERS, \
+    BULK_READ_COLUMNAR, BULK_READ_BATCH_SIZE, MENU_CACHE_MAX_DATES, MENU_CACHE_TTL
+from .jobs_config import JOB_WORKERS, BUILD_LOCK_PATH
+from .artifacts_config import ARTIFACTS_PATH, ARTIFACT_VERSIONS_KEPT
+from .serving_config import SERVER_BIND, SERVER_WORKERS, SERVER_THREADS, SERVER_TIMEOUT, PRELOAD_MODELS, \
+    STARTUP_IMPORT_BUDGET
+from .nlp_config import NLP_DATA_PATH, NLP_AUTO_DOWNLOAD
+from .health_config import HEALTH_CHECK_INTERVAL, HEALTH_CHECK_MAX_AGE, HEALTH_CHECK_STARTUP_WAIT
+from .metrics_config import METRICS_PATH, METRICS_FLUSH_INTERVAL
+from .profiling_config import PROFILE_ADMIN_TOKEN, PROFILE_PATH, PROFILE_MEMORY_FRAMES
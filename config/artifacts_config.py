@@ -0,0 +1,6 @@
+import os
+
+# Folder of the versioned BoW and prediction models of every catering
+ARTIFACTS_PATH = os.environ.get('ARTIFACTS_PATH', './artifacts/')
+# Number of versions with a prediction model kept for rollbacks
+ARTIFACT_VERSIONS_KEPT = int(os.environ.get('ARTIFACT_VERSIONS_KEPT', 5))
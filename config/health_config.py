@@ -0,0 +1,8 @@
+import os
+
+# Seconds between two rounds of the background health checks
+HEALTH_CHECK_INTERVAL = float(os.environ.get('HEALTH_CHECK_INTERVAL', 15))
+# Seconds after which the result of a health check is stale (the service is not ready if a required check is stale)
+HEALTH_CHECK_MAX_AGE = float(os.environ.get('HEALTH_CHECK_MAX_AGE', 60))
+# Seconds a probe waits for the first round of checks of a new process, instead of answering that they are pending
+HEALTH_CHECK_STARTUP_WAIT = float(os.environ.get('HEALTH_CHECK_STARTUP_WAIT', 5))
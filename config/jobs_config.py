@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# Number of threads of the process running the background jobs (pipeline builds)
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 1))
+# Folder of the per-catering build lock files, shared by all the processes of the host
+BUILD_LOCK_PATH = os.environ.get('BUILD_LOCK_PATH', os.path.join(tempfile.gettempdir(), 'food_waste_prediction_locks'))
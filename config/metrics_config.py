@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# Folder of the metrics snapshots of the processes of the service, added up on every scrape of `/metrics`
+METRICS_PATH = os.environ.get('METRICS_PATH', os.path.join(tempfile.gettempdir(), 'food_waste_prediction_metrics'))
+# Seconds between two snapshots of the metrics of a process while it records metrics (0 saves one on every record)
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))
@@ -0,0 +1,6 @@
+import os
+
+# Folder of the NLTK data (tokenizers and stop words), prepared with `flask prepare-resources`
+NLP_DATA_PATH = os.environ.get('NLP_DATA_PATH', './nlp_data/')
+# Download the missing NLTK data on its first use instead of failing (it needs network access)
+NLP_AUTO_DOWNLOAD = os.environ.get('NLP_AUTO_DOWNLOAD', 'false').lower() in ['true', '1']
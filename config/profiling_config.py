@@ -0,0 +1,9 @@
+import os
+import tempfile
+
+# Token of the admins allowed to profile a request (`X-Profile-Token` header), the profiling is disabled without it
+PROFILE_ADMIN_TOKEN = os.environ.get('PROFILE_ADMIN_TOKEN')
+# Folder of the saved request profiles
+PROFILE_PATH = os.environ.get('PROFILE_PATH', os.path.join(tempfile.gettempdir(), 'food_waste_prediction_profiles'))
+# Frames kept by tracemalloc for every allocation on the memory snapshots of the profiled requests
+PROFILE_MEMORY_FRAMES = int(os.environ.get('PROFILE_MEMORY_FRAMES', 10))
@@ -0,0 +1,11 @@
+import os
+
+# Production serving profile (gunicorn.conf.py)
+SERVER_BIND = os.environ.get('SERVER_BIND', f"0.0.0.0:{os.environ.get('PORT', 5050)}")
+SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS', os.environ.get('WEB_CONCURRENCY', 2)))
+SERVER_THREADS = int(os.environ.get('SERVER_THREADS', 4))
+SERVER_TIMEOUT = int(os.environ.get('SERVER_TIMEOUT', 120))
+# Load the served models of every catering before forking the workers, so they are shared instead of duplicated
+PRELOAD_MODELS = os.environ.get('PRELOAD_MODELS', 'true').lower() in ['true', '1']
+# Maximum seconds to import the app on a cold start, checked by `flask profile-startup`
+STARTUP_IMPORT_BUDGET = float(os.environ.get('STARTUP_IMPORT_BUDGET', 1.0))
@@ -0,0 +1,17 @@
+import os
+
+
+class StorageBackendNames:
+    MONGO = 'mongo'
+    SQLITE = 'sqlite'
+
+
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', StorageBackendNames.MONGO).lower()
+SQLITE_DB_PATH = os.environ.get('SQLITE_DB_PATH', './local_db/FoodWastePrediction.sqlite3')
+DB_IO_WORKERS = int(os.environ.get('DB_IO_WORKERS', 8))
+# Bulk read mode: the dataset and registers are loaded as NumPy columns instead of one dictionary per document
+BULK_READ_COLUMNAR = os.environ.get('BULK_READ_COLUMNAR', 'false').lower() in ['true', '1']
+BULK_READ_BATCH_SIZE = int(os.environ.get('BULK_READ_BATCH_SIZE', 1000))
+# In-process menu cache used to transform the test data
+MENU_CACHE_MAX_DATES = int(os.environ.get('MENU_CACHE_MAX_DATES', 1024))
+MENU_CACHE_TTL = float(os.environ.get('MENU_CACHE_TTL', 300))
@@ -1,4 +1,12 @@
-UPLOAD_FOLDER = './temp'
+import os
+
 MENUS_ALLOWED_EXTENSIONS = {'tsv', 'csv'}
 REGISTERS_ALLOWED_EXTENSIONS = {'xlsx'}
 MAX_FILE_LENGTH = 16 * 1024 * 1024
+# Uploaded files bigger than this size are spilled to a temporary file instead of being kept in memory
+UPLOAD_SPOOL_MAX_SIZE = int(os.environ.get('UPLOAD_SPOOL_MAX_SIZE', 4 * 1024 * 1024))
+# Register workbooks bigger than this size are read with the streaming read-only parser
+REGISTERS_STREAMING_MIN_SIZE = int(os.environ.get('REGISTERS_STREAMING_MIN_SIZE', 8 * 1024 * 1024))
+# Processes of the pool that extracts the sheets of the register workbooks (each one parses its own sheet). The
+# default 1 extracts them on the request process, the pool only pays off with idle cores (it uses more CPU in total)
+REGISTERS_SHEET_WORKERS = int(os.environ.get('REGISTERS_SHEET_WORKERS', 1))
@@ -0,0 +1,49 @@
+import gc
+from config import SERVER_BIND, SERVER_WORKERS, SERVER_THREADS, SERVER_TIMEOUT, PRELOAD_MODELS
+
+# Production serving profile: `gunicorn -c gunicorn.conf.py main_app:app`
+bind = SERVER_BIND
+workers = SERVER_WORKERS
+threads = SERVER_THREADS
+timeout = SERVER_TIMEOUT
+accesslog = '-'
+errorlog = '-'
+# The app is loaded once on the master process and the workers are forked from it, so the models loaded by
+# `when_ready` are shared copy-on-write by all the workers
+preload_app = True
+
+# The garbage collector of the master is disabled until the fork: collecting would move the loaded objects around the
+# generations and it is not needed while loading
+gc.disable()
+
+
+def when_ready(server):
+    # A new instance of the metrics for the workers of this master, the instances left by the masters that were killed
+    # are removed
+    from App.Util.metrics import get_metrics_registry, start_instance
+    start_instance()
+    get_metrics_registry().remove_ended_instances()
+    if PRELOAD_MODELS:
+        from App.Server.artifact_server import preload_artifacts
+        preload_artifacts()
+    # Moves every object loaded so far to the permanent generation, so the garbage collector of the workers never
+    # writes on their memory pages (which would copy them on every worker)
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    gc.enable()
+    # The health checks of the worker start before its first request, so a new worker is ready without a probe
+    from App.Server.app_info_server import start_health_monitor
+    start_health_monitor()
+
+
+def child_exit(server, worker):
+    # The metrics of the worker are added to the archive of the service before a new worker can reuse its pid
+    from App.Util.metrics import get_metrics_registry
+    get_metrics_registry().archive_process(worker.pid)
+
+
+def on_exit(server):
+    from App.Util.metrics import get_metrics_registry
+    get_metrics_registry().remove_instance()
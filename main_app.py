@@ -1,8 +1,10 @@
 from App import create_app
+from App.Server.app_info_server import start_health_monitor
 
 PORT = 5050
 HOST = "0.0.0.0"
 app = create_app()
 
 if __name__ == '__main__':
+    start_health_monitor()
     app.run(debug=True, port=PORT, host=HOST)
@@ -0,0 +1,102 @@
+import os
+import importlib
+import threading
+import pytest
+from typing import List
+from App.Server import artifact_server
+from App.Server.Artifacts import ArtifactStore, ArtifactNames, Pointers
+from App.Server.Artifacts.artifact_store import MANIFEST_FILE
+from App.Server.Jobs import SingleFlight
+
+CATERING = 'lunch'
+VERSIONS_KEPT = 2
+# The module, its name is shadowed on the package by the decorator
+single_flight = importlib.import_module('App.Server.Jobs.single_flight')
+
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch) -> ArtifactStore:
+    store = ArtifactStore(str(tmp_path / 'artifacts'), VERSIONS_KEPT)
+    monkeypatch.setattr(artifact_server, '_artifact_store', store)
+    monkeypatch.setattr(single_flight, '_single_flight', SingleFlight(str(tmp_path / 'locks')))
+    return store
+
+
+def publish_versions(count: int) -> List[str]:
+    """
+    Publishes a BoW model and the prediction model trained with it `count` times, as the builds do
+    """
+    versions = []
+    for idx in range(count):
+        bow_version = artifact_server.publish_bow_model(CATERING, {'bow': idx}, [f'feature_{idx}'])
+        artifact_server.set_dataset_bow_version(CATERING, bow_version)
+        versions.append(artifact_server.publish_prediction_model(CATERING, {'model': idx}, {'model_name': 'test'}))
+    return versions
+
+
+def get_pointers(store: ArtifactStore):
+    return {pointer: store.read_pointer(CATERING, pointer)
+            for pointer in (Pointers.CURRENT, Pointers.LATEST, Pointers.DATASET)}
+
+
+def test_publish_and_prune_keep_the_newest_complete_versions(store):
+    versions = publish_versions(4)
+    listed = [manifest['version'] for manifest in store.list_versions(CATERING)]
+    assert listed == versions[:-VERSIONS_KEPT - 1:-1]
+    assert get_pointers(store) == {pointer: versions[-1] for pointer in get_pointers(store)}
+    manifest = store.read_manifest(CATERING, versions[-1])
+    assert manifest['artifacts'] == [ArtifactNames.BOW, ArtifactNames.MODEL]
+    assert manifest['features'] == ['feature_3']
+
+
+def test_rollback_to_the_previous_version(store):
+    versions = publish_versions(3)
+    assert artifact_server.rollback_models(CATERING) == versions[-2]
+    assert store.read_pointer(CATERING, Pointers.CURRENT) == versions[-2]
+    assert artifact_server.get_serving_model(CATERING)[0] == \
+        store.get_artifact_path(CATERING, versions[-2], ArtifactNames.MODEL)
+    # Only the versions kept by the prune can be served
+    with pytest.raises(Exception, match='no previous version'):
+        artifact_server.rollback_models(CATERING)
+
+
+def test_prune_keeps_the_version_rolled_back_to(store):
+    versions = publish_versions(2)
+    assert artifact_server.rollback_models(CATERING, versions[0]) == versions[0]
+    first_bow_version = artifact_server.publish_bow_model(CATERING, {'bow': 'new'}, ['feature'])
+    second_bow_version = artifact_server.publish_bow_model(CATERING, {'bow': 'newer'}, ['feature'])
+    assert get_pointers(store) == {Pointers.CURRENT: versions[0], Pointers.LATEST: second_bow_version,
+                                   Pointers.DATASET: versions[1]}
+    listed = [manifest['version'] for manifest in store.list_versions(CATERING)]
+    assert listed == [second_bow_version, versions[1], versions[0]]
+    assert first_bow_version not in listed
+
+
+def test_rollback_to_an_invalid_version(store):
+    publish_versions(1)
+    bow_version = artifact_server.publish_bow_model(CATERING, {'bow': 'new'}, ['feature'])
+    with pytest.raises(Exception, match='has no prediction model'):
+        artifact_server.rollback_models(CATERING, bow_version)
+    with pytest.raises(Exception, match='does not exist'):
+        artifact_server.rollback_models(CATERING, 'missing')
+
+
+def test_list_versions_skips_the_versions_without_manifest(store):
+    versions = publish_versions(2)
+    os.remove(store.get_artifact_path(CATERING, versions[0], MANIFEST_FILE))
+    assert [manifest['version'] for manifest in store.list_versions(CATERING)] == [versions[1]]
+    with pytest.raises(Exception, match='no previous version'):
+        artifact_server.rollback_models(CATERING)
+
+
+def test_rollback_waits_for_the_build_lock(store):
+    versions = publish_versions(2)
+    rolled_back = threading.Event()
+    thread = threading.Thread(target=lambda: artifact_server.rollback_models(CATERING) and rolled_back.set())
+    with single_flight.get_single_flight().lock(CATERING):
+        thread.start()
+        assert not rolled_back.wait(0.2)
+        assert store.read_pointer(CATERING, Pointers.CURRENT) == versions[1]
+    thread.join(10)
+    assert rolled_back.is_set()
+    assert store.read_pointer(CATERING, Pointers.CURRENT) == versions[0]
@@ -0,0 +1,52 @@
+import time
+import threading
+from App.Server.Health import HealthMonitor, HealthStatus
+
+
+def create_monitor(check, startup_wait: float) -> HealthMonitor:
+    return HealthMonitor({'storage': check, 'artifacts': lambda: (HealthStatus.WARN, dict())}, ['storage'],
+                         interval=60, max_age=60, startup_wait=startup_wait)
+
+
+def slow_check():
+    time.sleep(0.1)
+    return HealthStatus.PASS, {'version': '1'}
+
+
+def test_first_probe_waits_for_the_first_round():
+    health = create_monitor(slow_check, startup_wait=5).get_health()
+    assert health['ready']
+    assert health['status'] == HealthStatus.WARN
+    assert health['checks']['storage']['details'] == {'version': '1'}
+
+
+def test_monitor_started_before_the_first_probe():
+    monitor = create_monitor(slow_check, startup_wait=0)
+    monitor.start()
+    time.sleep(0.5)
+    assert monitor.get_health()['ready']
+
+
+def test_first_probe_does_not_wait_for_a_hanging_check():
+    release = threading.Event()
+
+    def hanging_check():
+        release.wait(10)
+        return HealthStatus.PASS, dict()
+
+    start = time.time()
+    health = create_monitor(hanging_check, startup_wait=0.2).get_health()
+    release.set()
+    assert time.time() - start < 2
+    assert not health['ready']
+    assert health['checks']['storage'] == {'status': HealthStatus.FAIL, 'error': 'pending'}
+
+
+def test_failed_required_check_is_not_ready():
+    def failed_check():
+        raise Exception('unreachable')
+
+    health = create_monitor(failed_check, startup_wait=5).get_health()
+    assert not health['ready']
+    assert health['status'] == HealthStatus.FAIL
+    assert health['checks']['storage']['error'] == 'unreachable'
@@ -0,0 +1,62 @@
+import os
+import asyncio
+import pytest
+from typing import Iterator
+from App.Database import db_server
+from App.Database.db import StorageManager
+from App.Database.StorageBackends.sqlite_backend import SQLiteBackend
+from App.Server import data_collector_server
+from App.Util.constants import LUNCH
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MENUS_FILE = os.path.join(ROOT_PATH, 'sample_data', 'menus', '2020-01-13_17.tsv')
+DATE = '2020-01-13'
+
+
+@pytest.fixture(autouse=True)
+def sqlite_backend(tmp_path) -> Iterator[SQLiteBackend]:
+    backend = SQLiteBackend(str(tmp_path / 'test.sqlite3'))
+    StorageManager.set_backend(backend)
+    yield backend
+    StorageManager.set_backend(None)
+
+
+def get_lunch_menu(date: str):
+    return next(menu for menu in db_server.get_list_menu_docs(LUNCH) if menu['date'] == date)
+
+
+def get_inserted_menus():
+    menu = {key: value for key, value in get_lunch_menu(DATE).items() if key != '_id'}
+    return [dict(menu, regular='inserted menu')]
+
+
+def test_ingest_skips_the_unchanged_dates():
+    asyncio.run(data_collector_server.ingest_menus_async(MENUS_FILE))
+    response = asyncio.run(data_collector_server.ingest_menus_async(MENUS_FILE))
+    assert response['skipped']['file']
+    assert response['counts'] == {'breakfast': 0, 'lunch': 0}
+
+
+@pytest.mark.parametrize('use_async', [False, True])
+def test_ingest_after_insert_restores_the_dates(use_async):
+    asyncio.run(data_collector_server.ingest_menus_async(MENUS_FILE))
+    ingested_menu = get_lunch_menu(DATE)
+    if use_async:
+        asyncio.run(data_collector_server.insert_menus_async(LUNCH, get_inserted_menus()))
+    else:
+        data_collector_server.insert_menus(LUNCH, get_inserted_menus())
+    assert get_lunch_menu(DATE)['regular'] == 'inserted menu'
+
+    response = asyncio.run(data_collector_server.ingest_menus_async(MENUS_FILE))
+    assert response['counts'] == {'breakfast': 0, 'lunch': 1}
+    assert DATE not in response['skipped']['dates'][LUNCH]
+    assert get_lunch_menu(DATE) == ingested_menu
+
+
+def test_ingest_after_insert_of_the_same_content_is_skipped():
+    asyncio.run(data_collector_server.ingest_menus_async(MENUS_FILE))
+    menu = {key: value for key, value in get_lunch_menu(DATE).items() if key != '_id'}
+    data_collector_server.insert_menus(LUNCH, [menu])
+
+    response = asyncio.run(data_collector_server.ingest_menus_async(MENUS_FILE))
+    assert response['skipped']['file']
@@ -0,0 +1,196 @@
+import os
+import time
+import socket
+import subprocess
+import sys
+import threading
+import pytest
+from typing import Dict, Iterator
+from App import create_app
+from App.Database import db_server
+from App.Database.db import StorageManager
+from App.Database.StorageBackends.sqlite_backend import SQLiteBackend
+from App.Server import job_server
+from App.Server.job_server import JobKinds
+from App.Server.Jobs import JobManager, JobStatus, JobFields
+from App.Server.Jobs.job_manager import StageStatus
+
+TIMEOUT = 10
+STAGES = ['first', 'second']
+
+
+@pytest.fixture(autouse=True)
+def sqlite_backend(tmp_path) -> Iterator[SQLiteBackend]:
+    backend = SQLiteBackend(str(tmp_path / 'test.sqlite3'))
+    StorageManager.set_backend(backend)
+    yield backend
+    StorageManager.set_backend(None)
+
+
+class BlockingTask:
+    """
+    Task with two stages that waits for the test before each one
+    """
+
+    def __init__(self):
+        self.started = {stage: threading.Event() for stage in STAGES}
+        self.release = {stage: threading.Event() for stage in STAGES}
+        self.finished = False
+
+    def __call__(self, on_stage) -> Dict:
+        for stage in STAGES:
+            on_stage(stage)
+            self.started[stage].set()
+            assert self.release[stage].wait(TIMEOUT)
+        self.finished = True
+        return {'stages': STAGES}
+
+    def release_all(self) -> None:
+        for event in self.release.values():
+            event.set()
+
+
+def wait_for_status(manager: JobManager, job_id: str, statuses) -> Dict:
+    deadline = time.time() + TIMEOUT
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job[JobFields.STATUS] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not reach {statuses}")
+
+
+def test_submit_runs_the_task_and_records_the_result():
+    manager = JobManager()
+    job = manager.submit('test', 'lunch', lambda on_stage: [on_stage(stage) for stage in STAGES] and {'ok': 1},
+                         STAGES)
+    assert job[JobFields.STATUS] == JobStatus.QUEUED
+    job = wait_for_status(manager, job[JobFields.ID], JobStatus.FINISHED)
+    assert job[JobFields.STATUS] == JobStatus.SUCCEEDED
+    assert job[JobFields.RESULT] == {'ok': 1}
+    assert job[JobFields.PROGRESS] == 1.0
+    assert [stage['status'] for stage in job[JobFields.STAGES]] == [StageStatus.DONE, StageStatus.DONE]
+
+
+def test_failed_task_records_the_error():
+    def task(on_stage):
+        on_stage('first')
+        raise Exception('boom')
+
+    manager = JobManager()
+    job = wait_for_status(manager, manager.submit('test', None, task, STAGES)[JobFields.ID], JobStatus.FINISHED)
+    assert job[JobFields.STATUS] == JobStatus.FAILED
+    assert job[JobFields.ERROR] == 'boom'
+    assert job[JobFields.STAGES][0]['status'] == StageStatus.RUNNING
+
+
+def test_progress_by_stage():
+    manager = JobManager()
+    task = BlockingTask()
+    job_id = manager.submit('test', 'lunch', task, STAGES)[JobFields.ID]
+    assert task.started['first'].wait(TIMEOUT)
+    job = manager.get(job_id)
+    assert (job[JobFields.STATUS], job[JobFields.STAGE], job[JobFields.PROGRESS]) == (JobStatus.RUNNING, 'first', 0.0)
+    task.release['first'].set()
+    assert task.started['second'].wait(TIMEOUT)
+    job = manager.get(job_id)
+    assert (job[JobFields.STAGE], job[JobFields.PROGRESS]) == ('second', 0.5)
+    assert [stage['status'] for stage in job[JobFields.STAGES]] == [StageStatus.DONE, StageStatus.RUNNING]
+    task.release['second'].set()
+    assert wait_for_status(manager, job_id, JobStatus.FINISHED)[JobFields.STATUS] == JobStatus.SUCCEEDED
+
+
+def test_cancel_running_job_stops_on_its_next_stage():
+    manager = JobManager()
+    task = BlockingTask()
+    job_id = manager.submit('test', 'lunch', task, STAGES)[JobFields.ID]
+    assert task.started['first'].wait(TIMEOUT)
+    job = manager.cancel(job_id)
+    assert job[JobFields.CANCEL_REQUESTED]
+    assert job[JobFields.STATUS] == JobStatus.RUNNING
+    task.release_all()
+    job = wait_for_status(manager, job_id, JobStatus.FINISHED)
+    assert job[JobFields.STATUS] == JobStatus.CANCELLED
+    assert job[JobFields.STAGE] == 'first'
+    assert not task.started['second'].is_set() and not task.finished
+
+
+def test_cancel_queued_job_of_this_process():
+    manager = JobManager(workers=1)
+    blocking_task = BlockingTask()
+    running_id = manager.submit('test', 'lunch', blocking_task, STAGES)[JobFields.ID]
+    queued_task = BlockingTask()
+    queued_id = manager.submit('test', 'lunch', queued_task, STAGES)[JobFields.ID]
+    job = manager.cancel(queued_id)
+    assert job[JobFields.STATUS] == JobStatus.CANCELLED
+    blocking_task.release_all()
+    wait_for_status(manager, running_id, JobStatus.FINISHED)
+    assert manager.get(queued_id)[JobFields.STATUS] == JobStatus.CANCELLED
+    assert not queued_task.started['first'].is_set()
+
+
+def test_cancel_queued_job_of_another_process_is_cancelled_when_it_starts():
+    manager = JobManager(workers=1)
+    blocking_task = BlockingTask()
+    manager.submit('test', 'lunch', blocking_task, STAGES)
+    queued_task = BlockingTask()
+    queued_id = manager.submit('test', 'lunch', queued_task, STAGES)[JobFields.ID]
+    # Another process only records the request, the process running the job decides
+    job = JobManager().cancel(queued_id)
+    assert job[JobFields.CANCEL_REQUESTED]
+    assert job[JobFields.STATUS] == JobStatus.QUEUED
+    blocking_task.release_all()
+    job = wait_for_status(manager, queued_id, JobStatus.FINISHED)
+    assert job[JobFields.STATUS] == JobStatus.CANCELLED
+    assert not queued_task.started['first'].is_set()
+
+
+def test_cancel_finished_job_does_not_change_it():
+    manager = JobManager()
+    job_id = manager.submit('test', 'lunch', lambda on_stage: {'ok': 1}, STAGES)[JobFields.ID]
+    wait_for_status(manager, job_id, JobStatus.FINISHED)
+    job = manager.cancel(job_id)
+    assert job[JobFields.STATUS] == JobStatus.SUCCEEDED
+    assert not job[JobFields.CANCEL_REQUESTED]
+    assert manager.cancel('missing') is None
+
+
+def save_job_record(job_id: str, status: str, pid: int, host: str) -> None:
+    db_server.save_job({JobFields.ID: job_id, JobFields.KIND: 'test', JobFields.CATERING: 'lunch',
+                        JobFields.STATUS: status, JobFields.CANCEL_REQUESTED: False, JobFields.ERROR: None,
+                        JobFields.ENDED_AT: None, JobFields.PID: pid, JobFields.HOST: host})
+
+
+def test_orphan_job_is_failed():
+    process = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'], capture_output=True, text=True)
+    ended_pid = int(process.stdout)
+    save_job_record('orphan', JobStatus.RUNNING, ended_pid, socket.gethostname())
+    save_job_record('remote', JobStatus.RUNNING, ended_pid, 'another-host')
+    save_job_record('alive', JobStatus.QUEUED, os.getpid(), socket.gethostname())
+
+    job = JobManager.get('orphan')
+    assert job[JobFields.STATUS] == JobStatus.FAILED
+    assert str(ended_pid) in job[JobFields.ERROR]
+    assert db_server.get_job('orphan')[JobFields.STATUS] == JobStatus.FAILED
+    assert JobManager.get('remote')[JobFields.STATUS] == JobStatus.RUNNING
+    assert JobManager.get('alive')[JobFields.STATUS] == JobStatus.QUEUED
+
+
+@pytest.mark.parametrize('url, kind', [
+    ('/preprocessing/menu/bow/build', JobKinds.MENU_BOW),
+    ('/prediction/build/train-dataset', JobKinds.TRAIN_DATASET),
+    ('/prediction/build/prediction-model', JobKinds.PREDICTION_MODEL),
+    ('/prediction/train-performance', JobKinds.TRAIN_PERFORMANCE),
+])
+def test_build_endpoints_submit_a_job_when_async(monkeypatch, url, kind):
+    def build(catering, on_stage=None):
+        on_stage('build')
+        return {'catering': catering}
+
+    monkeypatch.setitem(job_server.JOBS, kind, (build, ['build']))
+    response = create_app().test_client().post(url, json={'catering': 'lunch', 'async': True})
+    assert response.status_code == 202
+    status = response.get_json()
+    assert (status[JobFields.KIND], status[JobFields.CATERING]) == (kind, 'lunch')
+    job = wait_for_status(job_server.get_job_manager(), status['id'], JobStatus.FINISHED)
+    assert job[JobFields.RESULT] == {'catering': 'lunch'}
@@ -0,0 +1,130 @@
+import os
+import sys
+import subprocess
+import pytest
+from typing import Dict, Iterator
+from App.Util import metrics
+from App.Util.metrics import MetricsRegistry, REQUESTS_TOTAL, REQUEST_DURATION, ARCHIVE_FILE, INSTANCE_ENV
+
+LABELS = {'route': '/predict', 'method': 'POST', 'catering': 'lunch', 'status': '200'}
+COUNTER_LINE = 'food_waste_http_requests_total{catering="lunch",method="POST",route="/predict",status="200"}'
+DURATION_COUNT_LINE = 'food_waste_http_request_duration_seconds_count{catering="lunch",method="POST",route="/predict"}'
+
+
+@pytest.fixture(autouse=True)
+def instance(monkeypatch) -> str:
+    monkeypatch.setenv(INSTANCE_ENV, 'test-instance')
+    return 'test-instance'
+
+
+@pytest.fixture
+def registry(tmp_path) -> MetricsRegistry:
+    return MetricsRegistry(str(tmp_path / 'metrics'), 0)
+
+
+@pytest.fixture
+def live_process() -> Iterator[subprocess.Popen]:
+    process = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])
+    yield process
+    process.kill()
+    process.wait()
+
+
+def get_ended_pid() -> int:
+    process = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'], capture_output=True, text=True)
+    return int(process.stdout)
+
+
+def get_values(registry: MetricsRegistry) -> Dict[str, float]:
+    values = dict()
+    for line in registry.render().splitlines():
+        series, _, value = line.rpartition(' ')
+        if series in (COUNTER_LINE, DURATION_COUNT_LINE):
+            values[series] = float(value)
+    return values
+
+
+def write_process_snapshot(registry: MetricsRegistry, instance: str, pid: int, requests: int) -> None:
+    other = MetricsRegistry(registry.path, 60)
+    other.inc(REQUESTS_TOTAL, LABELS, requests)
+    instance_path = os.path.join(registry.path, instance)
+    os.makedirs(instance_path, exist_ok=True)
+    metrics.write_snapshot(os.path.join(instance_path, f'{pid}.json'), other.get_snapshot())
+
+
+def test_render_adds_up_live_and_ended_processes(registry, instance, live_process):
+    registry.inc(REQUESTS_TOTAL, LABELS)
+    registry.observe(REQUEST_DURATION, {key: LABELS[key] for key in ('route', 'method', 'catering')}, 0.2)
+    ended_pid = get_ended_pid()
+    write_process_snapshot(registry, instance, live_process.pid, 5)
+    write_process_snapshot(registry, instance, ended_pid, 10)
+
+    assert get_values(registry) == {COUNTER_LINE: 16, DURATION_COUNT_LINE: 1}
+    # The snapshot of the process that ended is on the archive now
+    instance_path = os.path.join(registry.path, instance)
+    assert not os.path.exists(os.path.join(instance_path, f'{ended_pid}.json'))
+    assert metrics.merge_snapshots([metrics.read_snapshot(os.path.join(instance_path, ARCHIVE_FILE))])[0] == \
+        {MetricsRegistry.get_series_key(REQUESTS_TOTAL, LABELS): 10}
+
+
+def test_counters_never_decrease_when_processes_end(registry, instance, live_process):
+    registry.inc(REQUESTS_TOTAL, LABELS)
+    write_process_snapshot(registry, instance, live_process.pid, 5)
+    totals = [get_values(registry)[COUNTER_LINE]]
+
+    # The live process ends (archived by the master) and then a scrape runs before and after the next records
+    live_process.kill()
+    live_process.wait()
+    registry.archive_process(live_process.pid)
+    totals.append(get_values(registry)[COUNTER_LINE])
+    registry.inc(REQUESTS_TOTAL, LABELS, 2)
+    write_process_snapshot(registry, instance, get_ended_pid(), 3)
+    totals.append(get_values(registry)[COUNTER_LINE])
+    totals.append(get_values(registry)[COUNTER_LINE])
+    assert totals == [6, 6, 11, 11]
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs fork')
+def test_forked_processes_drop_the_inherited_series(registry):
+    registry.inc(REQUESTS_TOTAL, LABELS)
+    pids = []
+    for requests in (2, 3):
+        pid = os.fork()
+        if pid == 0:
+            registry.inc(REQUESTS_TOTAL, LABELS, requests)
+            os._exit(0)
+        pids.append(pid)
+    for pid in pids:
+        os.waitpid(pid, 0)
+        registry.archive_process(pid)
+    assert get_values(registry)[COUNTER_LINE] == 6
+
+
+def test_instances_are_not_merged(registry, monkeypatch, live_process):
+    registry.inc(REQUESTS_TOTAL, LABELS)
+    write_process_snapshot(registry, 'other-instance', live_process.pid, 5)
+    write_process_snapshot(registry, 'other-instance', get_ended_pid(), 7)
+    assert get_values(registry)[COUNTER_LINE] == 1
+    monkeypatch.setenv(INSTANCE_ENV, 'other-instance')
+    assert get_values(MetricsRegistry(registry.path, 0))[COUNTER_LINE] == 12
+
+
+def test_start_instance_never_reuses_the_inherited_one(instance):
+    new_instance = metrics.start_instance()
+    assert new_instance != instance
+    assert new_instance.startswith(f'{os.getpid()}-')
+    assert metrics.get_instance() == new_instance
+
+
+def test_remove_instances(registry, instance):
+    registry.inc(REQUESTS_TOTAL, LABELS)
+    ended_instance = f'{get_ended_pid()}-1'
+    live_instance = f'{os.getppid()}-1'
+    for other in (ended_instance, live_instance):
+        write_process_snapshot(registry, other, 1, 1)
+    assert registry.remove_ended_instances() == [ended_instance]
+    assert sorted(os.listdir(registry.path)) == sorted([instance, live_instance])
+
+    registry.remove_instance()
+    registry.inc(REQUESTS_TOTAL, LABELS)
+    assert sorted(os.listdir(registry.path)) == [live_instance]
@@ -0,0 +1,70 @@
+import json
+import pandas
+import pytest
+from App.Models import RegisterBatch
+from App.Models import register_batch
+from App.Models.register_batch import iter_batches_json
+from App.Util.helpers import str_to_timestamp
+
+ROWS = [
+    {'person': 'Ann Lee', 'date': '2020-01-02', 'request': True, 'attend': True, 'diet': 'regular', 'extra': True},
+    {'person': 'Bob', 'date': '2020-01-02', 'request': False, 'attend': False, 'diet': None, 'extra': False},
+    {'person': 'Ann Lee', 'date': '2020-01-03', 'request': True, 'attend': False, 'diet': 'vegan', 'extra': False},
+    {'person': 'Carl', 'date': '2020-01-03', 'request': True, 'attend': True, 'diet': 'light', 'extra': True},
+    {'person': 'Bob', 'date': '2020-01-06', 'request': True, 'attend': True, 'diet': 'vegetarian', 'extra': False},
+]
+
+
+def get_expected_documents(with_extra: bool):
+    documents = []
+    for row in ROWS:
+        document = {'_id': f"{str_to_timestamp(row['date'])}-{row['person'].replace(' ', '_')}",
+                    'person': row['person'], 'date': row['date'], 'request': row['request'], 'attend': row['attend'],
+                    'diet': row['diet']}
+        if with_extra:
+            document['extra'] = row['extra']
+        documents.append(document)
+    return documents
+
+
+def build_batch(with_extra: bool) -> RegisterBatch:
+    return RegisterBatch.from_frame(pandas.DataFrame(ROWS), with_extra)
+
+
+@pytest.mark.parametrize('with_extra', [False, True])
+def test_iter_documents_round_trip(with_extra):
+    batch = build_batch(with_extra)
+    assert len(batch) == len(ROWS)
+    assert list(batch.iter_documents()) == get_expected_documents(with_extra)
+    assert batch.get_dates() == ['2020-01-02', '2020-01-03', '2020-01-06']
+    assert batch.count_by_date() == {'2020-01-02': 2, '2020-01-03': 2, '2020-01-06': 1}
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 1000])
+def test_iter_json_round_trip(monkeypatch, chunk_size):
+    monkeypatch.setattr(register_batch, 'JSON_CHUNK_SIZE', chunk_size)
+    batch = build_batch(True)
+    assert json.loads(''.join(batch.iter_json())) == get_expected_documents(True)
+
+
+def test_iter_batches_json_round_trip():
+    batches = {'breakfast': build_batch(False), 'lunch': build_batch(True)}
+    report = [{'sheet': 'Monday', 'catering': None, 'level': 'skipped', 'message': 'Skip'}]
+    result = json.loads(''.join(iter_batches_json(batches, {'report': report})))
+    assert list(result) == ['breakfast', 'lunch', 'report']
+    assert result['breakfast'] == get_expected_documents(False)
+    assert result['lunch'] == get_expected_documents(True)
+    assert result['report'] == report
+
+
+def test_empty_batches_json():
+    empty = RegisterBatch.from_frame(pandas.DataFrame(columns=list(ROWS[0])), True)
+    assert json.loads(''.join(empty.iter_json())) == []
+    assert json.loads(''.join(iter_batches_json({}))) == {}
+    assert json.loads(''.join(iter_batches_json({'lunch': empty}))) == {'lunch': []}
+
+
+def test_invalid_diet():
+    rows = [dict(ROWS[0], diet='keto')]
+    with pytest.raises(Exception, match="'keto' is an invalid diet"):
+        RegisterBatch.from_frame(pandas.DataFrame(rows), True)
@@ -0,0 +1,24 @@
+import os
+import sys
+import subprocess
+from App.Util.import_profile import profile_imports
+from config import STARTUP_IMPORT_BUDGET
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# ML and NLP stacks imported on the first build or prediction, never on the startup
+HEAVY_MODULES = ['sklearn', 'nltk', 'autocorrect']
+
+
+def test_import_time_is_under_budget(monkeypatch):
+    monkeypatch.chdir(ROOT_PATH)
+    profile = profile_imports('App')
+    assert profile['import_time'] < STARTUP_IMPORT_BUDGET, profile['packages']
+    assert profile['lazy_modules_imported'] == []
+
+
+def test_heavy_stacks_are_not_imported_on_startup():
+    # On a new interpreter, the sys.modules of this one has the modules imported by other tests
+    code = 'import sys, App; print(" ".join(sorted(sys.modules)))'
+    process = subprocess.run([sys.executable, '-c', code], cwd=ROOT_PATH, capture_output=True, text=True, check=True)
+    imported = {name.split('.')[0] for name in process.stdout.split()}
+    assert [name for name in HEAVY_MODULES if name in imported] == []
@@ -0,0 +1,173 @@
+import numpy
+import pytest
+from typing import Dict, Iterator, List
+from App.Database import db
+from App.Database.db import StorageManager
+from App.Database.StorageBackends.mongo_backend import MongoBackend
+from App.Database.StorageBackends.sqlite_backend import SQLiteBackend
+
+COLLECTION = 'test_documents'
+DOCUMENTS = [
+    {'_id': '2020-01-02_a', 'date': '2020-01-02', 'person': 'a', 'diet': 'regular', 'attend': True, 'count': 3,
+     'score': 0.5, 'nested': {'value': 1}},
+    {'_id': '2020-01-02_b', 'date': '2020-01-02', 'person': 'b', 'diet': 'vegan', 'attend': False, 'count': 1,
+     'score': 1.5, 'nested': {'value': 2}},
+    {'_id': '2020-01-03_a', 'date': '2020-01-03', 'person': 'a', 'diet': 'regular', 'attend': True, 'count': 2,
+     'score': 2.0, 'nested': {'value': 3}},
+    {'_id': '2020-01-03_c', 'date': '2020-01-03', 'person': 'c', 'diet': 'light', 'attend': True, 'count': 5,
+     'score': None, 'nested': {'value': 4}},
+    {'_id': '2020-01-04_a', 'date': '2020-01-04', 'person': 'a', 'diet': 'vegan', 'attend': False, 'count': 4,
+     'score': 3.5, 'nested': {'value': 5}},
+]
+QUERIES = [
+    {},
+    {'date': '2020-01-03'},
+    {'date': {'$in': ['2020-01-02', '2020-01-04']}},
+    {'_id': '2020-01-03_c'},
+    {'_id': {'$in': ['2020-01-02_b', '2020-01-04_a', 'missing']}},
+    {'date': {'$in': ['2020-01-02', '2020-01-03']}, 'attend': True},
+    {'count': {'$gte': 3}},
+    {'$or': [{'person': 'c'}, {'diet': 'vegan'}]},
+    {'score': None},
+    {'nested.value': {'$lt': 3}},
+]
+PIPELINES = [
+    [{'$match': {'date': {'$in': ['2020-01-02', '2020-01-03']}}},
+     {'$group': {'_id': '$date', 'total': {'$sum': '$count'}, 'mean': {'$avg': '$count'}, 'max': {'$max': '$count'},
+                 'people': {'$push': '$person'}}},
+     {'$sort': {'_id': 1}}],
+    [{'$group': {'_id': '$diet', 'attendees': {'$sum': 1}, 'dates': {'$addToSet': '$date'}}}, {'$sort': {'_id': -1}}],
+    [{'$project': {'date': 1, 'count': 1}}, {'$sort': {'count': -1}}, {'$limit': 3}],
+    [{'$project': {'_id': 0, 'person': 1, 'score': 1}}, {'$sort': {'score': 1, 'person': 1}}],
+    [{'$project': {'nested': 0, 'score': 0}}, {'$sort': {'date': -1, 'person': 1}}, {'$skip': 1}],
+    [{'$match': {'attend': True}}, {'$count': 'attendees'}],
+]
+
+
+class RawBatchesCollection:
+    """
+    mongomock collection with the `find_raw_batches` of pymongo (not implemented by mongomock), so the bulk read mode
+    decodes real BSON batches
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def __getattr__(self, name: str):
+        return getattr(self.collection, name)
+
+    def find_raw_batches(self, query: Dict, batch_size: int) -> Iterator[bytes]:
+        import bson
+
+        documents = list(self.collection.find(query))
+        for start in range(0, len(documents), batch_size):
+            yield b''.join(bson.encode(document) for document in documents[start:start + batch_size])
+
+
+def create_mongo_backend() -> MongoBackend:
+    mongomock = pytest.importorskip('mongomock')
+    database = mongomock.MongoClient()['test']
+    backend = MongoBackend('mongodb://localhost', 'test', raw_batch_size=2)
+    backend.get_collection = lambda collection_name: RawBatchesCollection(database[collection_name])
+    return backend
+
+
+@pytest.fixture(autouse=True)
+def reset_backend() -> Iterator[None]:
+    # The data access layer creates the configured backend again on its next use
+    yield
+    StorageManager.set_backend(None)
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path) -> SQLiteBackend:
+    return SQLiteBackend(str(tmp_path / 'test.sqlite3'))
+
+
+@pytest.fixture
+def backends(sqlite_backend):
+    """
+    SQLite backend and reference Mongo backend (on mongomock) with the same documents
+    """
+    mongo_backend = create_mongo_backend()
+    for backend in (sqlite_backend, mongo_backend):
+        backend.insert_many(COLLECTION, [dict(document, nested=dict(document['nested'])) for document in DOCUMENTS])
+    return sqlite_backend, mongo_backend
+
+
+def run_on(backend, func, *args):
+    StorageManager.set_backend(backend)
+    return func(*args)
+
+
+def sort_by_id(documents) -> List[Dict]:
+    return sorted(documents, key=lambda document: document['_id'])
+
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_find_many_matches_mongo(backends, query):
+    sqlite_backend, mongo_backend = backends
+    result = sort_by_id(run_on(sqlite_backend, db.find_many, query, COLLECTION))
+    expected = sort_by_id(run_on(mongo_backend, db.find_many, query, COLLECTION))
+    assert result == expected
+    assert result == sort_by_id(document for document in DOCUMENTS if document in expected)
+
+
+def test_find_many_by_indexed_fields(sqlite_backend):
+    sqlite_backend.insert_many(COLLECTION, DOCUMENTS)
+    StorageManager.set_backend(sqlite_backend)
+    assert [document['_id'] for document in db.find_many({'date': {'$in': ['2020-01-04', '2020-01-02']}},
+                                                         COLLECTION)] == ['2020-01-02_a', '2020-01-02_b',
+                                                                          '2020-01-04_a']
+    assert sqlite_backend.find_one(COLLECTION, {'date': '2020-01-03'})['_id'] == '2020-01-03_a'
+    assert sqlite_backend.find_one(COLLECTION, {'date': '2020-01-05'}) is None
+
+
+@pytest.mark.parametrize('pipeline', PIPELINES)
+def test_aggregate_matches_mongo(backends, pipeline):
+    sqlite_backend, mongo_backend = backends
+    result = list(run_on(sqlite_backend, db.aggregate, pipeline, COLLECTION))
+    expected = list(run_on(mongo_backend, db.aggregate, pipeline, COLLECTION))
+    assert result == expected
+
+
+def test_aggregate_group_values(sqlite_backend):
+    sqlite_backend.insert_many(COLLECTION, DOCUMENTS)
+    result = list(sqlite_backend.aggregate(COLLECTION, PIPELINES[0]))
+    assert result == [
+        {'_id': '2020-01-02', 'total': 4, 'mean': 2.0, 'max': 3, 'people': ['a', 'b']},
+        {'_id': '2020-01-03', 'total': 7, 'mean': 3.5, 'max': 5, 'people': ['a', 'c']},
+    ]
+
+
+def test_replace_many_matches_mongo(backends):
+    sqlite_backend, mongo_backend = backends
+    query = {'date': {'$in': ['2020-01-03', '2020-01-05']}}
+    new_documents = [
+        {'_id': '2020-01-03_d', 'date': '2020-01-03', 'person': 'd', 'diet': 'regular', 'attend': True, 'count': 7,
+         'score': 0.0, 'nested': {'value': 6}},
+        {'_id': '2020-01-05_a', 'date': '2020-01-05', 'person': 'a', 'diet': 'light', 'attend': False, 'count': 0,
+         'score': 1.0, 'nested': {'value': 7}},
+    ]
+    results = list()
+    for backend in (sqlite_backend, mongo_backend):
+        run_on(backend, db.replace_many, query, [dict(document) for document in new_documents], COLLECTION)
+        results.append(sort_by_id(run_on(backend, db.find_all, COLLECTION)))
+    assert results[0] == results[1]
+    assert [document['_id'] for document in results[0]] == ['2020-01-02_a', '2020-01-02_b', '2020-01-03_d',
+                                                            '2020-01-04_a', '2020-01-05_a']
+
+
+def test_find_all_columns_matches_mongo(backends):
+    sqlite_backend, mongo_backend = backends
+    result = run_on(sqlite_backend, db.find_all_columns, COLLECTION)
+    expected = run_on(mongo_backend, db.find_all_columns, COLLECTION)
+    assert list(result.keys()) == list(expected.keys())
+    for field, column in expected.items():
+        assert result[field].dtype == column.dtype, field
+        assert result[field].tolist() == column.tolist(), field
+    assert result['count'].dtype == numpy.int64
+    assert result['attend'].dtype == numpy.bool_
+    # A missing value keeps the column as objects
+    assert result['score'].dtype == object
+    assert result['score'].tolist() == [0.5, 1.5, 2.0, None, 3.5]
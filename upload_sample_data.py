@@ -1,49 +1,251 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from os import listdir
 from os.path import isfile, join, splitext
-from typing import List
+from typing import Dict, List, Optional, Tuple
 import requests
+from requests.adapters import HTTPAdapter
 
-UPLOAD_MENUS_FLAG = True
-UPLOAD_REGISTERS_FLAG = False
-TRANSFORM_MENUS_FILES_URL = "http://0.0.0.0:5050/data_collector/menu/transform_file"
-UPLOAD_MENUS_URL = "http://0.0.0.0:5050/data_collector/menu/insert"
-TRANSFORM_REGISTERS_FILES_URL = "http://0.0.0.0:5050/data_collector/register/transform_file"
-UPLOAD_REGISTERS_URL = "http://0.0.0.0:5050/data_collector/register/insert"
+SERVER_URL = "http://0.0.0.0:5050"
+INGEST_MENUS_URL = "/data_collector/menu/ingest"
+INGEST_REGISTERS_URL = "/data_collector/register/ingest"
 MENUS_PATH = './sample_data/menus/'
 MENUS_EXTENSION = ['.csv', '.tsv']
 REGISTERS_PATH = './sample_data/registers/'
 REGISTERS_EXTENSION = ['.xlsx']
+CHECKPOINT_PATH = './upload_checkpoint.json'
+# Status codes worth retrying (the server may be overloaded or restarting)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
 
 
-def get_list_of_files(path: str, extensions: List[str] = []):
+def get_list_of_files(path: str, extensions: List[str] = []) -> List[str]:
+    """
+    Gets the files of a folder with the given extensions, sorted by name
+
+    Args:
+        path (str): Folder path
+        extensions (List[str]): Valid extensions, all the files are returned if it is empty
+
+    Returns:
+        List[str]: File names
+    """
     files = [f for f in listdir(path) if isfile(join(path, f))]
     if len(extensions) > 0:
-        return [file for file in files if splitext(file.lower())[1] in extensions]
-    return files
+        files = [file for file in files if splitext(file.lower())[1] in extensions]
+    return sorted(files)
 
 
-# Main
-if UPLOAD_MENUS_FLAG:
-    print("Uploading Menus...")
-    menu_files = get_list_of_files(MENUS_PATH, MENUS_EXTENSION)
-    num_files = len(menu_files)
-    for idx, file in enumerate(menu_files):
-        with open(f"{MENUS_PATH}{file}", "rb") as a_file:
-            print(f"{idx}/{num_files} -> File: {file}", end=' ')
-            file_dict = {"file": a_file}
-            transform_response = requests.post(TRANSFORM_MENUS_FILES_URL, files=file_dict)
-            response = requests.post(UPLOAD_MENUS_URL, json=transform_response.json())
-            print(response)
-
-if UPLOAD_REGISTERS_FLAG:
-    print("Uploading Registers...")
-    register_files = get_list_of_files(REGISTERS_PATH, REGISTERS_EXTENSION)
-    num_files = len(register_files)
-    for idx, file in enumerate(register_files):
-        with open(f"{REGISTERS_PATH}{file}", "rb") as a_file:
-            print(f"{idx+1}/{num_files} -> File: {file}", end=' ')
-            file_dict = {"file": a_file}
-            transform_response = requests.post(TRANSFORM_REGISTERS_FILES_URL, files=file_dict)
-            response = requests.post(UPLOAD_REGISTERS_URL, json=transform_response.json())
-            print(response)
+class Checkpoint:
+    """
+    Record of the files already uploaded, saved after every upload so an interrupted backfill can be resumed. A file
+    is uploaded again if its size or modification time changed
+
+    Args:
+        path (str): Checkpoint file path
+
+    Attributes:
+        path (str): Checkpoint file path
+        files (Dict[str, Dict]): Upload record by file path
+        __lock (threading.Lock): Lock for the records and the checkpoint file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.files: Dict[str, Dict] = dict()
+        self.__lock = threading.Lock()
+        if os.path.isfile(path):
+            with open(path) as f:
+                self.files = json.load(f).get('files', dict())
+
+    @staticmethod
+    def get_file_key(full_path_file: str) -> Tuple[int, float]:
+        """
+        Gets the size and modification time of a file
+
+        Args:
+            full_path_file (str): File path
+
+        Returns:
+            Tuple[int, float]: Size and modification time
+        """
+        stat = os.stat(full_path_file)
+        return stat.st_size, stat.st_mtime
+
+    def is_done(self, full_path_file: str) -> bool:
+        """
+        Checks if a file was already uploaded without changes
+
+        Args:
+            full_path_file (str): File path
+
+        Returns:
+            bool: True if the file is on the checkpoint with the same size and modification time
+        """
+        record = self.files.get(full_path_file)
+        size, mtime = self.get_file_key(full_path_file)
+        return record is not None and record['size'] == size and record['mtime'] == mtime
+
+    def mark_done(self, full_path_file: str, response: Dict) -> None:
+        """
+        Records a file as uploaded and saves the checkpoint
+
+        Args:
+            full_path_file (str): File path
+            response (Dict): Server response
+
+        Returns:
+            None
+        """
+        size, mtime = self.get_file_key(full_path_file)
+        with self.__lock:
+            self.files[full_path_file] = {'size': size, 'mtime': mtime, 'response': response}
+            # Written to a temporary file and then replaced, so an interruption never leaves a corrupted checkpoint
+            temp_path = f'{self.path}.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump({'files': self.files}, f, indent=2)
+            os.replace(temp_path, self.path)
+
+
+def create_session(workers: int) -> requests.Session:
+    """
+    Creates the HTTP session shared by all the uploads, with a connection pool for every worker
+
+    Args:
+        workers (int): Number of concurrent uploads
 
+    Returns:
+        requests.Session: HTTP session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def upload_file(session: requests.Session, url: str, full_path_file: str, retries: int, backoff: float,
+                timeout: float, force: bool = False) -> Dict:
+    """
+    Uploads a file to an ingest endpoint, retrying the connection errors and server errors with exponential backoff
+
+    Args:
+        session (requests.Session): HTTP session
+        url (str): Ingest endpoint URL
+        full_path_file (str): File to upload
+        retries (int): Number of retries after the first attempt
+        backoff (float): Seconds to wait before the first retry, doubled on every retry
+        timeout (float): Seconds to wait for the server response
+        force (bool): Save the content on the server even if it was already ingested
+
+    Returns:
+        Dict: Server response
+
+    Raises:
+        Exception: If the upload failed after all the retries or the server rejected the file
+    """
+    error: Optional[str] = None
+    for attempt in range(retries + 1):
+        if attempt > 0:
+            time.sleep(backoff * 2 ** (attempt - 1))
+        try:
+            with open(full_path_file, 'rb') as a_file:
+                response = session.post(url, files={'file': a_file}, data={'force': str(force).lower()},
+                                        timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = str(e)
+            continue
+        if response.status_code in RETRY_STATUS_CODES:
+            error = f'{response.status_code}: {response.text[:200].strip()}'
+            continue
+        if response.status_code != 200:
+            raise Exception(f'{response.status_code}: {response.text[:200].strip()}')
+        return response.json()
+    raise Exception(f'Failed after {retries + 1} attempts. Last error: {error}')
+
+
+def run(args: argparse.Namespace) -> int:
+    """
+    Discovers and uploads the files concurrently
+
+    Args:
+        args (argparse.Namespace): Command line arguments
+
+    Returns:
+        int: Number of failed uploads
+    """
+    jobs: List[Tuple[str, str]] = []
+    if args.menus:
+        jobs += [(join(args.menus_path, file), args.url + INGEST_MENUS_URL)
+                 for file in get_list_of_files(args.menus_path, MENUS_EXTENSION)]
+    if args.registers:
+        jobs += [(join(args.registers_path, file), args.url + INGEST_REGISTERS_URL)
+                 for file in get_list_of_files(args.registers_path, REGISTERS_EXTENSION)]
+
+    checkpoint = Checkpoint(args.checkpoint)
+    pending = [(file, url) for file, url in jobs if args.no_resume or not checkpoint.is_done(file)]
+    print(f"Uploading {len(pending)} files ({len(jobs) - len(pending)} already uploaded) with {args.workers} workers")
+
+    session = create_session(args.workers)
+    num_files = len(pending)
+    num_done, num_failed, num_bytes = 0, 0, 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(upload_file, session, url, file, args.retries, args.backoff, args.timeout,
+                                   args.force): file
+                   for file, url in pending}
+        for future in as_completed(futures):
+            file = futures[future]
+            num_done += 1
+            try:
+                response = future.result()
+                checkpoint.mark_done(file, response)
+                num_bytes += os.path.getsize(file)
+                skipped = response.get('skipped', dict())
+                status = 'skipped (already ingested)' if skipped.get('file') else \
+                    f"ok {response.get('counts', response)} unchanged dates: {skipped.get('dates')}"
+            except Exception as e:
+                num_failed += 1
+                status = f"error {e}"
+            elapsed = time.perf_counter() - start
+            print(f"{num_done}/{num_files} -> File: {file} {status} "
+                  f"[{num_done / elapsed:.2f} files/s, {num_bytes / elapsed / 1024 / 1024:.2f} MB/s]")
+
+    elapsed = time.perf_counter() - start
+    print(f"Uploaded {num_done - num_failed}/{num_files} files in {elapsed:.1f}s ({num_failed} failed)")
+    return num_failed
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parses the command line arguments, both menus and registers are uploaded if none of them is selected
+
+    Returns:
+        argparse.Namespace: Command line arguments
+    """
+    parser = argparse.ArgumentParser(description='Uploads the menu and register files to the ingest endpoints')
+    parser.add_argument('--url', default=SERVER_URL, help='Server URL')
+    parser.add_argument('--menus', action='store_true', help='Upload the menu files')
+    parser.add_argument('--registers', action='store_true', help='Upload the register files')
+    parser.add_argument('--menus-path', default=MENUS_PATH, help='Folder of the menu files')
+    parser.add_argument('--registers-path', default=REGISTERS_PATH, help='Folder of the register files')
+    parser.add_argument('--workers', type=int, default=4, help='Number of concurrent uploads')
+    parser.add_argument('--retries', type=int, default=3, help='Retries of every upload')
+    parser.add_argument('--backoff', type=float, default=1.0, help='Seconds before the first retry (doubled later)')
+    parser.add_argument('--timeout', type=float, default=300.0, help='Seconds to wait for every response')
+    parser.add_argument('--checkpoint', default=CHECKPOINT_PATH, help='Checkpoint file of the uploaded files')
+    parser.add_argument('--no-resume', action='store_true', help='Upload again the files on the checkpoint')
+    parser.add_argument('--force', action='store_true', help='Save the content even if the server already has it')
+    args = parser.parse_args()
+    if not args.menus and not args.registers:
+        args.menus = args.registers = True
+    return args
+
+
+# Main
+if __name__ == '__main__':
+    sys.exit(1 if run(parse_args()) > 0 else 0)